@@ -38,7 +38,7 @@ LOGGER = getLogger(__name__)
 cpu_no = cpu_count()
 
 DOWNLOAD_DIR = "/app/downloads/"
-intervals = {"status": {}, "qb": "", "jd": "", "nzb": "", "stopAll": False}
+intervals = {"status": {}, "qb": "", "jd": "", "nzb": "", "seed": "", "stopAll": False}
 qb_torrents = {}
 jd_downloads = {}
 nzb_jobs = {}
@@ -50,6 +50,7 @@ queued_dl = {}
 queued_up = {}
 status_dict = {}
 task_dict = {}
+seed_dict = {}
 rss_dict = {}
 auth_chats = {}
 excluded_extensions = ["aria2", "!qB"]
@@ -61,6 +62,7 @@ non_queued_dl = set()
 non_queued_up = set()
 multi_tags = set()
 task_dict_lock = Lock()
+seed_dict_lock = Lock()
 queue_dict_lock = Lock()
 qb_listener_lock = Lock()
 nzb_listener_lock = Lock()
@@ -33,6 +33,7 @@ async def main():
     from .helper.ext_utils.files_utils import clean_all
     from .core.jdownloader_booter import jdownloader
     from .helper.ext_utils.telegraph_helper import telegraph
+    from .helper.mirror_leech_utils.rclone_utils.rcd import rclone_rcd
     from .helper.mirror_leech_utils.rclone_utils.serve import rclone_serve_booter
     from .modules import (
         initiate_search_tools,
@@ -49,6 +50,7 @@ async def main():
         restart_notification(),
         telegraph.create_account(),
         rclone_serve_booter(),
+        rclone_rcd.boot(),
     )
 
 
@@ -57,10 +59,12 @@ bot_loop.run_until_complete(main())
 from .helper.ext_utils.bot_utils import create_help_buttons
 from .helper.listeners.aria2_listener import add_aria2_callbacks
 from .core.handlers import add_handlers
+from .modules import resume_uploads
 
 add_aria2_callbacks()
 create_help_buttons()
 add_handlers()
+bot_loop.create_task(resume_uploads())
 
 LOGGER.info("Bot Started!")
 bot_loop.run_forever()
@@ -6,6 +6,8 @@ from bot import LOGGER
 
 
 class Config:
+    ARIA2_HOST_OPTIONS = {}
+    ARIA2_HOST_TUNING = False
     AS_DOCUMENT = False
     AUTHORIZED_CHATS = ""
     BASE_URL = ""
@@ -14,16 +16,24 @@ class Config:
     CMD_SUFFIX = ""
     DATABASE_URL = ""
     DEFAULT_UPLOAD = "rc"
+    DIRECT_HOST_WORKERS = {}
+    DIRECT_WORKERS = 1
+    DOWNLOAD_CACHE_LIMIT = 0
     EQUAL_SPLITS = False
     EXCLUDED_EXTENSIONS = ""
     FFMPEG_CMDS = {}
     FILELION_API = ""
     GDRIVE_ID = ""
+    GDRIVE_WORKERS = 1
+    GDRIVE_CACHE_TTL = 300
+    GDRIVE_SEARCH_TIMEOUT = 30
+    GDRIVE_CHUNK_MEMORY = 1024
     INCOMPLETE_TASK_NOTIFIER = False
     INDEX_URL = ""
     IS_TEAM_DRIVE = False
     JD_EMAIL = ""
     JD_PASS = ""
+    LEECH_CACHE_LIMIT = 0
     LEECH_DUMP_CHAT = ""
     LEECH_FILENAME_PREFIX = ""
     LEECH_SPLIT_SIZE = 2097152000
@@ -33,9 +43,11 @@ class Config:
     HYDRA_API_KEY = ""
     NAME_SUBSTITUTE = ""
     OWNER_ID = 0
+    PROGRESSIVE_UPLOAD = False
     QUEUE_ALL = 0
     QUEUE_DOWNLOAD = 0
     QUEUE_UPLOAD = 0
+    RCLONE_CACHE_TTL = 300
     RCLONE_FLAGS = ""
     RCLONE_PATH = ""
     RCLONE_SERVE_URL = ""
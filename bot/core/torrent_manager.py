@@ -1,7 +1,9 @@
 from aioaria2 import Aria2WebsocketClient
+from aioaria2.exceptions import Aria2rpcException
 from aioqbt.client import create_client
-from asyncio import gather, TimeoutError
+from asyncio import create_task, gather, get_running_loop, sleep, TimeoutError
 from aiohttp import ClientError
+from functools import partial
 from pathlib import Path
 from inspect import iscoroutinefunction
 from tenacity import (
@@ -13,6 +15,37 @@ from tenacity import (
 
 from .. import LOGGER, aria2_options
 
+BATCH_DELAY = 0.01
+BATCH_METHODS = {
+    "tellStatus",
+    "getFiles",
+    "getOption",
+    "changeOption",
+    "pause",
+    "forcePause",
+    "unpause",
+    "remove",
+    "forceRemove",
+    "removeDownloadResult",
+}
+STATUS_KEYS = [
+    "gid",
+    "status",
+    "totalLength",
+    "completedLength",
+    "uploadLength",
+    "downloadSpeed",
+    "uploadSpeed",
+    "connections",
+    "numSeeders",
+    "seeder",
+    "followedBy",
+    "errorMessage",
+    "dir",
+    "files",
+    "bittorrent",
+]
+
 
 def wrap_with_retry(obj, max_retries=3):
     for attr_name in dir(obj):
@@ -33,6 +66,57 @@ def wrap_with_retry(obj, max_retries=3):
     return obj
 
 
+class Aria2Batcher:
+    def __init__(self, client):
+        self._client = client
+        self._pending = []
+        self._flush_task = None
+
+    def __getattr__(self, name):
+        if name in BATCH_METHODS:
+            return partial(self._call, f"aria2.{name}")
+        return getattr(self._client, name)
+
+    async def _call(self, method, *params):
+        future = get_running_loop().create_future()
+        self._pending.append(
+            (method, [param for param in params if param is not None], future)
+        )
+        if self._flush_task is None:
+            self._flush_task = create_task(self._flush())
+        return await future
+
+    async def _flush(self):
+        await sleep(BATCH_DELAY)
+        batch, self._pending = self._pending, []
+        self._flush_task = None
+        try:
+            if len(batch) == 1:
+                method, params, future = batch[0]
+                results = [
+                    [await self._client.jsonrpc(method.split(".", 1)[1], params)]
+                ]
+            else:
+                results = await self._client.multicall(
+                    [
+                        {"methodName": method, "params": params}
+                        for method, params, _ in batch
+                    ]
+                )
+        except Exception as e:
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, _, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, list):
+                future.set_result(result[0])
+            else:
+                future.set_exception(Aria2rpcException(str(result)))
+
+
 class TorrentManager:
     aria2 = None
     qbittorrent = None
@@ -43,6 +127,7 @@ class TorrentManager:
             Aria2WebsocketClient.new("http://localhost:6800/jsonrpc"),
             create_client("http://localhost:8090/api/v2/"),
         )
+        cls.aria2 = Aria2Batcher(cls.aria2)
         cls.qbittorrent = wrap_with_retry(cls.qbittorrent)
 
     @classmethod
@@ -67,7 +152,9 @@ class TorrentManager:
             cls.aria2.purgeDownloadResult(),
         )
         downloads = []
-        results = await gather(cls.aria2.tellActive(), cls.aria2.tellWaiting(0, 1000))
+        results = await gather(
+            cls.aria2.tellActive(["gid"]), cls.aria2.tellWaiting(0, 1000, ["gid"])
+        )
         for res in results:
             downloads.extend(res)
         tasks = []
@@ -95,7 +182,10 @@ class TorrentManager:
     @classmethod
     async def change_aria2_option(cls, key, value):
         downloads = []
-        results = await gather(cls.aria2.tellActive(), cls.aria2.tellWaiting(0, 1000))
+        results = await gather(
+            cls.aria2.tellActive(["gid", "status"]),
+            cls.aria2.tellWaiting(0, 1000, ["gid", "status"]),
+        )
         for res in results:
             downloads.extend(res)
             tasks = []
@@ -1,15 +1,18 @@
 from aiofiles.os import path as aiopath, remove, makedirs, listdir
-from asyncio import sleep, gather
+from asyncio import gather, sleep
 from os import walk, path as ospath
 from secrets import token_urlsafe
 from aioshutil import move, rmtree
 from pyrogram.enums import ChatAction
+from pyrogram.types import Message
 from re import sub, I, findall
 from shlex import split
 from collections import Counter
-from copy import deepcopy
+from copy import copy, deepcopy
+from itertools import count
 
 from .. import (
+    bot_loop,
     user_data,
     multi_tags,
     LOGGER,
@@ -52,11 +55,32 @@ from .ext_utils.media_utils import (
 )
 from .telegram_helper.message_utils import (
     send_message,
-    send_status_message,
     get_tg_link_message,
+    get_tg_messages,
+    prefetch_tg_links,
     temp_download,
 )
 
+UPLOAD_DEST_ATTRS = [
+    "up_dest",
+    "is_leech",
+    "stop_duplicate",
+    "private_link",
+    "user_transmission",
+    "hybrid_leech",
+    "chat_thread_id",
+    "split_size",
+    "equal_splits",
+    "max_split_size",
+    "as_doc",
+    "thumbnail_layout",
+    "thumb",
+]
+
+
+# message ids are positive, so bulk children can never clash with a command
+bulk_mids = count(-1, -1)
+
 
 class TaskConfig:
     def __init__(self):
@@ -67,7 +91,13 @@ class TaskConfig:
         self.dir = f"{DOWNLOAD_DIR}{self.mid}"
         self.up_dir = ""
         self.link = ""
+        self.cache_key = ""
+        self.tg_session = ""
         self.up_dest = ""
+        self.extra_dests = ""
+        self.dests = []
+        self.main_task = None
+        self.is_uploaded = False
         self.rc_flags = ""
         self.tag = ""
         self.name = ""
@@ -94,6 +124,9 @@ class TaskConfig:
         self.compress = False
         self.select = False
         self.seed = False
+        self.seed_ratio = None
+        self.seed_time = None
+        self.progressive = False
         self.compress = False
         self.extract = False
         self.join = False
@@ -250,6 +283,25 @@ class TaskConfig:
                                 cmds.append(vl)
             self.ffmpeg_cmds = cmds
 
+        if self.extra_dests:
+            self.dests = []
+            for dest in self.extra_dests.split(","):
+                if not (dest := dest.strip()):
+                    continue
+                listener = copy(self)
+                listener.is_leech = dest == "leech" or dest.startswith("leech:")
+                listener.up_dest = (
+                    dest.split(":", 1)[1]
+                    if dest.startswith("leech:")
+                    else ("" if dest == "leech" else dest)
+                )
+                await listener.set_up_dest()
+                self.dests.append(
+                    {attr: getattr(listener, attr) for attr in UPLOAD_DEST_ATTRS}
+                )
+        await self.set_up_dest()
+
+    async def set_up_dest(self):
         if not self.is_leech:
             self.stop_duplicate = (
                 self.user_dict.get("STOP_DUPLICATE")
@@ -493,107 +545,136 @@ class TaskConfig:
 
     @new_task
     async def run_multi(self, input_list, obj):
-        await sleep(7)
-        if not self.multi_tag and self.multi > 1:
-            self.multi_tag = token_urlsafe(3)
-            multi_tags.add(self.multi_tag)
-        elif self.multi <= 1:
-            if self.multi_tag in multi_tags:
-                multi_tags.discard(self.multi_tag)
+        if self.multi <= 1 or self.multi_tag:
             return
-        if self.multi_tag and self.multi_tag not in multi_tags:
-            await send_message(
-                self.message, f"{self.tag} Multi Task has been cancelled!"
-            )
-            await send_status_message(self.message)
-            async with task_dict_lock:
-                for fd_name in self.same_dir:
-                    self.same_dir[fd_name]["total"] -= self.multi
+        if not (reply_id := self.message.reply_to_message_id):
             return
-        if len(self.bulk) != 0:
-            msg = input_list[:1]
-            msg.append(f"{self.bulk[0]} -i {self.multi - 1} {self.options}")
-            msgts = " ".join(msg)
-            if self.multi > 2:
-                msgts += f"\nCancel Multi: <code>/{BotCommands.CancelTaskCommand[1]} {self.multi_tag}</code>"
-            nextmsg = await send_message(self.message, msgts)
-        else:
-            msg = [s.strip() for s in input_list]
-            index = msg.index("-i")
-            msg[index + 1] = f"{self.multi - 1}"
-            nextmsg = await self.client.get_messages(
-                chat_id=self.message.chat.id,
-                message_ids=self.message.reply_to_message_id + 1,
-            )
-            msgts = " ".join(msg)
-            if self.multi > 2:
-                msgts += f"\nCancel Multi: <code>/{BotCommands.CancelTaskCommand[1]} {self.multi_tag}</code>"
-            nextmsg = await send_message(nextmsg, msgts)
-        nextmsg = await self.client.get_messages(
-            chat_id=self.message.chat.id, message_ids=nextmsg.id
-        )
-        if self.message.from_user:
-            nextmsg.from_user = self.user
-        else:
-            nextmsg.sender_chat = self.user
-        if intervals["stopAll"]:
+        msg_ids = list(range(reply_id + 1, reply_id + self.multi))
+        try:
+            messages = await get_tg_messages(self.client, self.message.chat.id, msg_ids)
+        except Exception as e:
+            await send_message(self.message, f"{self.tag} Multi Task failed! {e}")
             return
-        await obj(
+        msg = [s.strip() for s in input_list]
+        index = msg.index("-i")
+        del msg[index : index + 2]
+        text = " ".join(msg)
+        items = [
+            (text, message, "")
+            for message in messages
+            if message is not None and not message.empty
+        ]
+        if self.folder_name and (missing := len(msg_ids) - len(items)):
+            async with task_dict_lock:
+                self.same_dir[self.folder_name]["total"] -= missing
+        await self.run_bulk(items, obj)
+
+    def _new_bulk_task(self, obj, text, reply_to, session, remaining):
+        message = Message(
+            id=self.message.id,
+            chat=self.message.chat,
+            from_user=self.user if self.message.from_user else None,
+            sender_chat=None if self.message.from_user else self.user,
+            date=self.message.date,
+            text=text,
+            reply_to_message_id=reply_to.id if reply_to else None,
+            reply_to_message=reply_to,
+            message_thread_id=self.message.message_thread_id,
+            topic_message=self.message.topic_message,
+            client=self.client,
+        )
+        task = obj(
             self.client,
-            nextmsg,
+            message,
             self.is_qbit,
             self.is_leech,
             self.is_jd,
             self.is_nzb,
             self.same_dir,
-            self.bulk,
+            [],
             self.multi_tag,
             self.options,
-        ).new_event()
+        )
+        # children reply to the bulk command, so they need their own task id
+        task.mid = next(bulk_mids)
+        task.dir = f"{DOWNLOAD_DIR}{task.mid}"
+        task.multi = remaining
+        task.tg_session = session
+        return task
+
+    async def run_bulk(self, items, obj):
+        if not items or intervals["stopAll"]:
+            return
+        if not self.tag:
+            await self.get_tag(self.message.text.split("\n"))
+        self.multi_tag = token_urlsafe(3)
+        multi_tags.add(self.multi_tag)
+        if self.folder_name and self.folder_name not in self.same_dir:
+            async with task_dict_lock:
+                self.same_dir[self.folder_name] = {
+                    "total": len(items),
+                    "tasks": set(),
+                }
+        await send_message(
+            self.message,
+            f"{self.tag} {len(items)} tasks added.\nCancel Multi: <code>/{BotCommands.CancelTaskCommand[1]} {self.multi_tag}</code>",
+        )
+        children = []
+        for index, (text, reply_to, session) in enumerate(items, start=1):
+            if self.multi_tag not in multi_tags or intervals["stopAll"]:
+                LOGGER.info(f"Multi {self.multi_tag} stopped at {index}/{len(items)}")
+                break
+            task = self._new_bulk_task(
+                obj, text, reply_to, session, len(items) - index + 1
+            )
+            child = bot_loop.create_task(task.new_event())
+            children.append((task, child))
+            # start the next one after this task reached the queue manager, so
+            # prompts and link generation run one at a time
+            while not child.done() and task.mid not in task_dict:
+                await sleep(1)
+        results = await gather(*(child for _, child in children), return_exceptions=True)
+        for (task, _), result in zip(children, results):
+            if isinstance(result, Exception):
+                LOGGER.error(f"Multi {self.multi_tag} task {task.mid} failed: {result}")
+        multi_tags.discard(self.multi_tag)
+
+    async def _get_bulk_item(self, command, link):
+        if not is_telegram_link(link) or self.is_ytdlp or self.is_clone:
+            return f"{command} {link} {self.options}", None, ""
+        try:
+            reply_to, session = await get_tg_link_message(link)
+        except Exception as e:
+            LOGGER.error(f"Unable to get {link}. {e}")
+            reply_to = None
+        if reply_to is None or isinstance(reply_to, list):
+            return f"{command} {link} {self.options}", None, ""
+        return f"{command} {self.options}", reply_to, session
 
     async def init_bulk(self, input_list, bulk_start, bulk_end, obj):
         try:
             self.bulk = await extract_bulk_links(self.message, bulk_start, bulk_end)
             if len(self.bulk) == 0:
                 raise ValueError("Bulk Empty!")
-            b_msg = input_list[:1]
+            await prefetch_tg_links(
+                [link for link in self.bulk if is_telegram_link(link)]
+            )
             self.options = input_list[1:]
             index = self.options.index("-b")
             del self.options[index]
             if bulk_start or bulk_end:
                 del self.options[index]
             self.options = " ".join(self.options)
-            b_msg.append(f"{self.bulk[0]} -i {len(self.bulk)} {self.options}")
-            msg = " ".join(b_msg)
-            if len(self.bulk) > 2:
-                self.multi_tag = token_urlsafe(3)
-                multi_tags.add(self.multi_tag)
-                msg += f"\nCancel Multi: <code>/{BotCommands.CancelTaskCommand[1]} {self.multi_tag}</code>"
-            nextmsg = await send_message(self.message, msg)
-            nextmsg = await self.client.get_messages(
-                chat_id=self.message.chat.id, message_ids=nextmsg.id
-            )
-            if self.message.from_user:
-                nextmsg.from_user = self.user
-            else:
-                nextmsg.sender_chat = self.user
-            await obj(
-                self.client,
-                nextmsg,
-                self.is_qbit,
-                self.is_leech,
-                self.is_jd,
-                self.is_nzb,
-                self.same_dir,
-                self.bulk,
-                self.multi_tag,
-                self.options,
-            ).new_event()
         except Exception as e:
             await send_message(
                 self.message,
                 f"Reply to text file or to telegram message that have links separated by new line! {e}",
             )
+            return
+        await self.run_bulk(
+            [await self._get_bulk_item(input_list[0], link) for link in self.bulk],
+            obj,
+        )
 
     async def proceed_extract(self, dl_path, gid):
         pswd = self.extract if isinstance(self.extract, str) else ""
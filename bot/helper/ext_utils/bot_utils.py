@@ -196,11 +196,11 @@ def get_size_bytes(size):
     return size
 
 
-async def get_content_type(url):
+async def get_link_headers(url):
     try:
-        async with AsyncClient() as client:
-            response = await client.get(url, allow_redirects=True, verify=False)
-            return response.headers.get("Content-Type")
+        async with AsyncClient(follow_redirects=True) as client:
+            async with client.stream("GET", url) as response:
+                return response.headers
     except:
         return None
 
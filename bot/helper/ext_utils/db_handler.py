@@ -4,6 +4,7 @@ from importlib import import_module
 from pymongo import AsyncMongoClient
 from pymongo.server_api import ServerApi
 from pymongo.errors import PyMongoError
+from time import time
 
 from ... import LOGGER, user_data, rss_dict, qbit_options
 from ...core.telegram_manager import TgClient
@@ -179,17 +180,19 @@ class DbManager:
             return
         await self.db.rss[TgClient.ID].delete_one({"_id": user_id})
 
-    async def add_incomplete_task(self, cid, link, tag):
+    async def add_incomplete_task(self, cid, link, tag, mid):
         if self._return:
             return
-        await self.db.tasks[TgClient.ID].insert_one(
-            {"_id": link, "cid": cid, "tag": tag}
+        await self.db.tasks[TgClient.ID].replace_one(
+            {"_id": f"{link}|{mid}"},
+            {"cid": cid, "link": link, "tag": tag},
+            upsert=True,
         )
 
-    async def rm_complete_task(self, link):
+    async def rm_complete_task(self, link, mid):
         if self._return:
             return
-        await self.db.tasks[TgClient.ID].delete_one({"_id": link})
+        await self.db.tasks[TgClient.ID].delete_one({"_id": f"{link}|{mid}"})
 
     async def get_incomplete_tasks(self):
         notifier_dict = {}
@@ -198,16 +201,119 @@ class DbManager:
         if await self.db.tasks[TgClient.ID].find_one():
             rows = self.db.tasks[TgClient.ID].find({})
             async for row in rows:
+                link = row.get("link", row["_id"])
                 if row["cid"] in list(notifier_dict.keys()):
                     if row["tag"] in list(notifier_dict[row["cid"]]):
-                        notifier_dict[row["cid"]][row["tag"]].append(row["_id"])
+                        if link not in notifier_dict[row["cid"]][row["tag"]]:
+                            notifier_dict[row["cid"]][row["tag"]].append(link)
                     else:
-                        notifier_dict[row["cid"]][row["tag"]] = [row["_id"]]
+                        notifier_dict[row["cid"]][row["tag"]] = [link]
                 else:
-                    notifier_dict[row["cid"]] = {row["tag"]: [row["_id"]]}
+                    notifier_dict[row["cid"]] = {row["tag"]: [link]}
         await self.db.tasks[TgClient.ID].drop()
         return notifier_dict
 
+    async def get_leech_cache(self, key):
+        if self._return:
+            return None
+        return await self.db.leech_cache[TgClient.ID].find_one_and_update(
+            {"_id": key}, {"$set": {"time": time()}}
+        )
+
+    async def add_leech_cache(self, key, chat_id, msg_id, file_id):
+        if self._return:
+            return
+        await self.db.leech_cache[TgClient.ID].replace_one(
+            {"_id": key},
+            {
+                "chat_id": chat_id,
+                "msg_id": msg_id,
+                "file_id": file_id,
+                "time": time(),
+            },
+            upsert=True,
+        )
+        if limit := Config.LEECH_CACHE_LIMIT:
+            excess = await self.db.leech_cache[TgClient.ID].count_documents({}) - limit
+            if excess > 0:
+                rows = (
+                    self.db.leech_cache[TgClient.ID]
+                    .find({}, {"_id": 1})
+                    .sort("time", 1)
+                    .limit(excess)
+                )
+                keys = [row["_id"] async for row in rows]
+                await self.db.leech_cache[TgClient.ID].delete_many(
+                    {"_id": {"$in": keys}}
+                )
+
+    async def rm_leech_cache(self, key):
+        if self._return:
+            return
+        await self.db.leech_cache[TgClient.ID].delete_one({"_id": key})
+
+    async def set_task_upload(self, link, mid, job, flags):
+        if self._return:
+            return
+        await self.db.tasks[TgClient.ID].update_one(
+            {"_id": f"{link}|{mid}"},
+            {"$set": {"mid": mid, "upload": job, "flags": flags}},
+        )
+
+    async def get_resumable_uploads(self):
+        if self._return:
+            return []
+        return [
+            row
+            async for row in self.db.tasks[TgClient.ID].find(
+                {"upload": {"$exists": True}}
+            )
+        ]
+
+    async def get_upload_job(self, job):
+        if self._return:
+            return []
+        return [
+            row async for row in self.db.upload_jobs[TgClient.ID].find({"job": job})
+        ]
+
+    async def add_upload_job_entry(self, job, kind, rel, id_):
+        if self._return:
+            return
+        await self.db.upload_jobs[TgClient.ID].replace_one(
+            {"_id": f"{job}|{kind}|{rel}"},
+            {"job": job, "kind": kind, "rel": rel, "id": id_, "time": time()},
+            upsert=True,
+        )
+
+    async def rm_upload_job(self, job):
+        if self._return:
+            return
+        await self.db.upload_jobs[TgClient.ID].delete_many({"job": job})
+        await self.db.upload_sessions[TgClient.ID].delete_many({"job": job})
+
+    async def get_upload_session(self, key):
+        if self._return:
+            return None
+        return await self.db.upload_sessions[TgClient.ID].find_one({"_id": key})
+
+    async def save_upload_session(self, key, job, uri, offset):
+        if self._return:
+            return
+        await self.db.upload_sessions[TgClient.ID].update_one(
+            {"_id": key},
+            {
+                "$set": {"job": job, "uri": uri, "offset": offset},
+                "$setOnInsert": {"time": time()},
+            },
+            upsert=True,
+        )
+
+    async def rm_upload_session(self, key):
+        if self._return:
+            return
+        await self.db.upload_sessions[TgClient.ID].delete_one({"_id": key})
+
     async def trunc_table(self, name):
         if self._return:
             return
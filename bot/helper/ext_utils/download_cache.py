@@ -0,0 +1,154 @@
+from aiofiles import open as aiopen
+from aiofiles.os import makedirs, path as aiopath, replace
+from asyncio import Lock
+from hashlib import sha1
+from json import dumps, loads
+from secrets import token_urlsafe
+from time import time
+from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
+
+from ... import DOWNLOAD_DIR, LOGGER, task_dict, task_dict_lock
+from ...core.config_manager import Config
+from ..mirror_leech_utils.status_utils.queue_status import QueueStatus
+from .files_utils import clean_target, create_recursive_hardlink, get_path_size
+from .task_manager import stop_duplicate_check
+
+CACHE_DIR = f"{DOWNLOAD_DIR}.download_cache"
+INDEX_FILE = f"{CACHE_DIR}/index.json"
+
+
+def _normalize_url(url):
+    parsed = urlparse(url)
+    query = urlencode(sorted(parse_qsl(parsed.query, keep_blank_values=True)))
+    return urlunparse(
+        (
+            parsed.scheme.lower(),
+            parsed.netloc.lower(),
+            parsed.path or "/",
+            "",
+            query,
+            "",
+        )
+    )
+
+
+def get_url_cache_key(url, headers):
+    if not Config.DOWNLOAD_CACHE_LIMIT:
+        return ""
+    if etag := headers.get("ETag"):
+        version = etag
+    elif (modified := headers.get("Last-Modified")) and (
+        length := headers.get("Content-Length")
+    ):
+        version = f"{modified}|{length}"
+    else:
+        return ""
+    return f"url:{_normalize_url(url)}|{version}"
+
+
+class DownloadCache:
+    def __init__(self):
+        self._lock = Lock()
+        self._entries = {}
+        self._loaded = False
+
+    @staticmethod
+    def _path(key):
+        return f"{CACHE_DIR}/{sha1(key.encode()).hexdigest()}"
+
+    async def _load(self):
+        if self._loaded:
+            return
+        self._loaded = True
+        if not await aiopath.exists(INDEX_FILE):
+            return
+        try:
+            async with aiopen(INDEX_FILE) as f:
+                self._entries = loads(await f.read())
+        except Exception as e:
+            LOGGER.error(f"Failed to load download cache index: {e}")
+        for key, entry in list(self._entries.items()):
+            if not await aiopath.exists(f"{self._path(key)}/{entry['name']}"):
+                del self._entries[key]
+
+    async def _save(self):
+        try:
+            async with aiopen(f"{INDEX_FILE}.tmp", "w") as f:
+                await f.write(dumps(self._entries))
+            await replace(f"{INDEX_FILE}.tmp", INDEX_FILE)
+        except Exception as e:
+            LOGGER.error(f"Failed to save download cache index: {e}")
+
+    @staticmethod
+    def _usable(listener):
+        return (
+            Config.DOWNLOAD_CACHE_LIMIT
+            and listener.cache_key
+            and not listener.select
+            and not listener.folder_name
+            and not listener.progressive
+        )
+
+    async def restore(self, listener, dup_checked=False):
+        if not self._usable(listener):
+            return False
+        if not dup_checked:
+            async with self._lock:
+                await self._load()
+                entry = self._entries.get(listener.cache_key)
+            if entry is None:
+                return False
+            listener.name = listener.name or entry["name"]
+            msg, button = await stop_duplicate_check(listener)
+            if msg:
+                await listener.on_download_error(msg, button)
+                return True
+        async with self._lock:
+            await self._load()
+            if not (entry := self._entries.get(listener.cache_key)):
+                return False
+            source = f"{self._path(listener.cache_key)}/{entry['name']}"
+            if not await aiopath.exists(source):
+                del self._entries[listener.cache_key]
+                await self._save()
+                return False
+            listener.name = listener.name or entry["name"]
+            listener.size = entry["size"]
+            await create_recursive_hardlink(source, f"{listener.dir}/{listener.name}")
+            entry["used"] = time()
+            await self._save()
+        LOGGER.info(f"Restored from download cache: {listener.name}")
+        async with task_dict_lock:
+            task_dict[listener.mid] = QueueStatus(listener, token_urlsafe(10), "dl")
+        await listener.on_download_start()
+        await listener.on_download_complete()
+        return True
+
+    async def store(self, listener, dl_path):
+        if not self._usable(listener):
+            return
+        limit = Config.DOWNLOAD_CACHE_LIMIT * 1024**3
+        async with self._lock:
+            await self._load()
+            if listener.cache_key in self._entries or listener.size > limit:
+                return
+            name = dl_path.rsplit("/", 1)[-1]
+            path = self._path(listener.cache_key)
+            await makedirs(path, exist_ok=True)
+            await create_recursive_hardlink(dl_path, f"{path}/{name}")
+            self._entries[listener.cache_key] = {
+                "name": name,
+                "size": await get_path_size(f"{path}/{name}"),
+                "used": time(),
+            }
+            total = sum(entry["size"] for entry in self._entries.values())
+            for key in sorted(self._entries, key=lambda k: self._entries[k]["used"]):
+                if total <= limit:
+                    break
+                total -= self._entries.pop(key)["size"]
+                await clean_target(self._path(key))
+            await self._save()
+        LOGGER.info(f"Added to download cache: {name}")
+
+
+download_cache = DownloadCache()
@@ -20,3 +20,9 @@ class TgLinkException(Exception):
     """No Access granted for this chat"""
 
     pass
+
+
+class RcloneRcException(Exception):
+    """Rclone remote control request failed"""
+
+    pass
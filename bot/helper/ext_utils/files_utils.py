@@ -1,6 +1,7 @@
-from aioshutil import rmtree as aiormtree, move
+from aioshutil import rmtree as aiormtree, move, copy2
 from asyncio import create_subprocess_exec, wait_for
 from asyncio.subprocess import PIPE
+from hashlib import sha256
 from magic import Magic
 from os import walk, path as ospath, readlink
 from re import split as re_split, I, search as re_search, escape
@@ -11,6 +12,7 @@ from aiofiles.os import (
     rmdir,
     readlink as aioreadlink,
     symlink,
+    link,
     makedirs as aiomakedirs,
 )
 
@@ -130,7 +132,25 @@ async def clean_download(opath):
 async def clean_all():
     await TorrentManager.remove_all()
     LOGGER.info("Cleaning Download Directory")
-    await (await create_subprocess_exec("rm", "-rf", DOWNLOAD_DIR)).wait()
+    # the download cache is kept across restarts
+    await (
+        await create_subprocess_exec(
+            "find",
+            DOWNLOAD_DIR,
+            "-mindepth",
+            "1",
+            "-maxdepth",
+            "1",
+            "!",
+            "-name",
+            ".download_cache",
+            "-exec",
+            "rm",
+            "-rf",
+            "{}",
+            "+",
+        )
+    ).wait()
     await aiomakedirs(DOWNLOAD_DIR, exist_ok=True)
 
 
@@ -172,6 +192,20 @@ async def count_files_and_folders(opath):
     return total_folders, total_files
 
 
+def get_file_fingerprint(file_path, sample_size=1048576):
+    file_path = ospath.realpath(file_path)
+    size = ospath.getsize(file_path)
+    hasher = sha256(str(size).encode())
+    with open(file_path, "rb") as f:
+        if size <= sample_size * 3:
+            hasher.update(f.read())
+        else:
+            for offset in (0, (size - sample_size) // 2, size - sample_size):
+                f.seek(offset)
+                hasher.update(f.read(sample_size))
+    return f"{size}-{hasher.hexdigest()}"
+
+
 def get_base_name(orig_path):
     extension = next(
         (ext for ext in ARCH_EXT if orig_path.strip().lower().endswith(ext)), ""
@@ -198,6 +232,23 @@ async def create_recursive_symlink(source, destination):
             LOGGER.error(f"Error creating shortcut for {source}: {e}")
 
 
+async def create_recursive_hardlink(source, destination):
+    if ospath.isdir(source):
+        await aiomakedirs(destination, exist_ok=True)
+        for item in await listdir(source):
+            item_source = ospath.join(source, item)
+            item_dest = ospath.join(destination, item)
+            await create_recursive_hardlink(item_source, item_dest)
+    elif ospath.isfile(source):
+        await aiomakedirs(ospath.dirname(destination), exist_ok=True)
+        try:
+            await link(source, destination)
+        except FileExistsError:
+            LOGGER.error(f"Hardlink already exists: {destination}")
+        except OSError:
+            await copy2(source, destination)
+
+
 def get_mime_type(file_path):
     if ospath.islink(file_path):
         file_path = readlink(file_path)
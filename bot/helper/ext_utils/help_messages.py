@@ -84,6 +84,11 @@ upload = """<b>مقصد آپلود</b>: -up
 
 در صورتی که می‌خواهید مشخص کنید از token.pickle استفاده شود یا service accounts، می‌توانید tp:gdrive_id (استفاده از token.pickle) یا sa:gdrive_id (استفاده از سرویس اکانت) یا mtp:gdrive_id (استفاده از token.pickle آپلود شده از تنظیمات کاربر) را اضافه کنید.
 DEFAULT_UPLOAD روی دستورات لیچ تأثیری ندارد.
+
+<b>آپلود همزمان به چند مقصد</b>: -ups
+/cmd link -ups gd,leech,remote:dir
+مقصدهای اضافه را با کاما و بدون فاصله جدا کنید. فایل فقط یک بار دانلود می‌شود و همزمان به مقصد -up و همه مقصدهای -ups آپلود می‌شود.
+برای لیچ از leech (مقصد لیچ پیش‌فرض) یا leech:id/@username/pm استفاده کنید. بقیه مقادیر مانند -up هستند (gd، rc، Gdrive_id، remote:path، mtp: و mrcc:).
 """
 
 user_download = """<b>دانلود کاربر (User Download)</b>: link
@@ -518,6 +523,7 @@ help_string = f"""
 /{BotCommands.ListCommand} [query]: جستجو در گوگل درایو(ها).
 /{BotCommands.SearchCommand} [query]: جستجو برای تورنت‌ها با API.
 /{BotCommands.StatusCommand}: نمایش وضعیت تمام دانلودها.
+/{BotCommands.StatusCommand} seeds: نمایش تورنت‌های در حال سید.
 /{BotCommands.StatsCommand}: نمایش آمار سروری که ربات روی آن میزبانی شده است.
 /{BotCommands.PingCommand}: بررسی مدت زمان پینگ ربات (فقط مالک و سودو).
 /{BotCommands.AuthorizeCommand}: مجاز کردن یک چت یا کاربر برای استفاده از ربات (فقط مالک و سودو).
@@ -0,0 +1,124 @@
+from json import dump, load
+from logging import getLogger
+from os import path as ospath, replace
+from random import choice, random
+from time import time
+from urllib.parse import urlparse
+
+from ...core.config_manager import Config
+
+LOGGER = getLogger(__name__)
+
+STATE_FILE = "host_profiles.json"
+SAVE_INTERVAL = 60
+MIN_SAMPLES = 2
+MAX_SAMPLES = 20
+EXPLORE_RATE = 0.1
+MIN_SAMPLE_SIZE = 1024**2
+PROFILES = {
+    "default": {},
+    "multi": {
+        "split": "16",
+        "max-connection-per-server": "16",
+        "min-split-size": "1M",
+    },
+    "single": {"split": "1", "max-connection-per-server": "1"},
+}
+
+
+def get_host(url):
+    return (urlparse(url).hostname or "").lower()
+
+
+def match_host(host, settings):
+    for key, value in settings.items():
+        if host == key or host.endswith(f".{key}"):
+            return value
+    return None
+
+
+class HostProfiles:
+    def __init__(self):
+        self._hosts = {}
+        self._pending = {}
+        self._last_save = 0
+        self._loaded = False
+
+    def _load(self):
+        if self._loaded:
+            return
+        self._loaded = True
+        if not ospath.exists(STATE_FILE):
+            return
+        try:
+            with open(STATE_FILE) as f:
+                self._hosts = load(f)
+        except Exception as e:
+            LOGGER.error(f"Failed to load host profiles: {e}")
+
+    def _save(self):
+        if time() - self._last_save < SAVE_INTERVAL:
+            return
+        self._last_save = time()
+        try:
+            with open(f"{STATE_FILE}.tmp", "w") as f:
+                dump(self._hosts, f)
+            replace(f"{STATE_FILE}.tmp", STATE_FILE)
+        except Exception as e:
+            LOGGER.error(f"Failed to save host profiles: {e}")
+
+    def _stats(self, host, profile):
+        return self._hosts.setdefault(host, {}).setdefault(
+            profile, {"runs": 0, "errors": 0, "bytes": 0, "seconds": 0}
+        )
+
+    @staticmethod
+    def _score(stats):
+        if not stats["seconds"]:
+            return 0
+        return stats["bytes"] / stats["seconds"] * (1 - stats["errors"] / stats["runs"])
+
+    def select(self, url):
+        host = get_host(url)
+        if (options := match_host(host, Config.ARIA2_HOST_OPTIONS)) is not None:
+            return host, None, {key: str(value) for key, value in options.items()}
+        if not Config.ARIA2_HOST_TUNING or not host:
+            return host, None, {}
+        self._load()
+        stats = {name: self._stats(host, name) for name in PROFILES}
+        if untried := [name for name in PROFILES if stats[name]["runs"] < MIN_SAMPLES]:
+            profile = untried[0]
+        elif random() < EXPLORE_RATE:
+            profile = choice(list(PROFILES))
+        else:
+            profile = max(PROFILES, key=lambda name: self._score(stats[name]))
+        return host, profile, PROFILES[profile].copy()
+
+    def track(self, gid, host, profile):
+        if profile:
+            self._pending[gid] = (host, profile, time())
+
+    def discard(self, gid):
+        self._pending.pop(gid, None)
+
+    def record(self, gid, download):
+        if not (pending := self._pending.pop(gid, None)):
+            return
+        status = download.get("status", "")
+        if status not in ["complete", "error"]:
+            return
+        host, profile, start = pending
+        stats = self._stats(host, profile)
+        if stats["runs"] >= MAX_SAMPLES:
+            for key in stats:
+                stats[key] = stats[key] / 2
+        stats["runs"] += 1
+        if status == "error":
+            stats["errors"] += 1
+        elif (size := int(download.get("totalLength", "0"))) >= MIN_SAMPLE_SIZE:
+            stats["bytes"] += size
+            stats["seconds"] += max(time() - start, 1)
+        self._save()
+
+
+host_profiles = HostProfiles()
@@ -0,0 +1,134 @@
+from datetime import datetime, timedelta, timezone
+from json import dump, load
+from logging import getLogger
+from os import listdir, path as ospath, replace
+from threading import Lock
+from time import time
+
+LOGGER = getLogger(__name__)
+
+SA_DIR = "accounts"
+STATE_FILE = f"{SA_DIR}/.pool_state"
+SAVE_INTERVAL = 30
+DAILY_UPLOAD_LIMIT = 750 * 1024**3
+ERROR_WINDOW = 3600
+RATE_LIMIT_COOLDOWN = 600
+DAILY_LIMIT_REASONS = [
+    "dailyLimitExceeded",
+    "downloadQuotaExceeded",
+    "storageQuotaExceeded",
+]
+
+
+def _next_day():
+    now = datetime.now(timezone.utc)
+    tomorrow = (now + timedelta(days=1)).replace(
+        hour=0, minute=0, second=0, microsecond=0
+    )
+    return tomorrow.timestamp()
+
+
+class ServiceAccountPool:
+    def __init__(self):
+        self._lock = Lock()
+        self._accounts = {}
+        self._leases = {}
+        self._last_save = 0
+        self._loaded = False
+
+    def _load(self):
+        if self._loaded:
+            return
+        self._loaded = True
+        if not ospath.exists(STATE_FILE):
+            return
+        try:
+            with open(STATE_FILE) as f:
+                self._accounts = load(f)
+        except Exception as e:
+            LOGGER.error(f"Failed to load service accounts state: {e}")
+
+    def _save(self, force=False):
+        if not force and time() - self._last_save < SAVE_INTERVAL:
+            return
+        self._last_save = time()
+        try:
+            with open(f"{STATE_FILE}.tmp", "w") as f:
+                dump(self._accounts, f)
+            replace(f"{STATE_FILE}.tmp", STATE_FILE)
+        except Exception as e:
+            LOGGER.error(f"Failed to save service accounts state: {e}")
+
+    def _state(self, name):
+        today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+        state = self._accounts.setdefault(
+            name, {"day": today, "uploaded": 0, "errors": [], "cooldown": 0}
+        )
+        if state["day"] != today:
+            state["day"] = today
+            state["uploaded"] = 0
+        state["errors"] = [t for t in state["errors"] if time() - t < ERROR_WINDOW]
+        return state
+
+    def _score(self, name):
+        state = self._state(name)
+        return (
+            state["cooldown"] > time(),
+            state["uploaded"] >= DAILY_UPLOAD_LIMIT,
+            self._leases.get(name, 0),
+            len(state["errors"]),
+            state["uploaded"],
+        )
+
+    def files(self):
+        return [name for name in listdir(SA_DIR) if name.endswith(".json")]
+
+    def lease(self, exclude=()):
+        files = self.files()
+        with self._lock:
+            self._load()
+            candidates = [name for name in files if name not in exclude] or files
+            name = min(candidates, key=self._score)
+            if self._state(name)["cooldown"] > time():
+                name = min(
+                    candidates, key=lambda n: max(self._state(n)["errors"], default=0)
+                )
+                LOGGER.warning(
+                    f"All service accounts are cooling down, using the least recently failed {name}"
+                )
+            self._leases[name] = self._leases.get(name, 0) + 1
+        return name
+
+    def release(self, name):
+        with self._lock:
+            if self._leases.get(name, 0) > 1:
+                self._leases[name] -= 1
+            else:
+                self._leases.pop(name, None)
+
+    def add_usage(self, name, size):
+        with self._lock:
+            self._load()
+            self._state(name)["uploaded"] += size
+            self._save()
+
+    def report_error(self, name, reason):
+        with self._lock:
+            self._load()
+            state = self._state(name)
+            state["errors"].append(time())
+            if reason in DAILY_LIMIT_REASONS:
+                cooldown = _next_day()
+            else:
+                cooldown = min(
+                    time() + RATE_LIMIT_COOLDOWN * 2 ** (len(state["errors"]) - 1),
+                    _next_day(),
+                )
+            state["cooldown"] = max(state["cooldown"], cooldown)
+            LOGGER.info(
+                f"Service account {name} cooling down until {datetime.fromtimestamp(state['cooldown'])}: {reason}"
+            )
+            self._save(True)
+
+
+sa_pool = ServiceAccountPool()
@@ -3,7 +3,14 @@ from psutil import virtual_memory, cpu_percent, disk_usage
 from time import time
 from asyncio import iscoroutinefunction, gather
 
-from ... import task_dict, task_dict_lock, bot_start_time, status_dict, DOWNLOAD_DIR
+from ... import (
+    task_dict,
+    task_dict_lock,
+    seed_dict,
+    bot_start_time,
+    status_dict,
+    DOWNLOAD_DIR,
+)
 from ...core.config_manager import Config
 from ..telegram_helper.button_build import ButtonMaker
 
@@ -156,10 +163,30 @@ def get_progress_bar_string(pct):
     return f"[{p_str}]"
 
 
+def get_readable_seed(entry, index):
+    LRM = "\u200E"
+    msg = f"<b>{index}.</b> <code>{escape(entry['name'])}</code>\n"
+    msg += f"<b>{LRM}╭ <a href='{entry['message'].link}'>{MirrorStatus.STATUS_SEED}</a> {LRM}← وضعیت</b>\n"
+    msg += f"<b>{LRM}├ {get_readable_file_size(entry['size'])} {LRM}← حجم</b>\n"
+    msg += f"<b>{LRM}├ {get_readable_file_size(entry['speed'])}/s {LRM}← سرعت آپلود</b>\n"
+    msg += f"<b>{LRM}├ {get_readable_file_size(entry['uploaded'])} {LRM}← آپلود شده</b>\n"
+    msg += f"<b>{LRM}├ {round(entry['ratio'], 3)} {LRM}← ضریب</b>\n"
+    msg += f"<b>{LRM}├ {get_readable_time(entry['seeding_time'])} {LRM}← زمان</b>\n"
+    msg += f"<b>{LRM}╰ /c_{entry['gid']} {LRM}← توقف</b>\n\n"
+    return msg
+
+
 async def get_readable_message(sid, is_user, page_no=1, status="All", page_step=1):
     msg = ""
     button = None
-    tasks = await get_specific_tasks(status, sid if is_user else None)
+    if status == MirrorStatus.STATUS_SEED:
+        tasks = [
+            entry
+            for entry in seed_dict.values()
+            if not is_user or entry["user_id"] == sid
+        ]
+    else:
+        tasks = await get_specific_tasks(status, sid if is_user else None)
     STATUS_LIMIT = Config.STATUS_LIMIT
     tasks_no = len(tasks)
     pages = (max(tasks_no, 1) + STATUS_LIMIT - 1) // STATUS_LIMIT
@@ -174,6 +201,9 @@ async def get_readable_message(sid, is_user, page_no=1, status="All", page_step=
     for index, task in enumerate(
         tasks[start_position : STATUS_LIMIT + start_position], start=1
     ):
+        if status == MirrorStatus.STATUS_SEED:
+            msg += get_readable_seed(task, index + start_position)
+            continue
         tstatus = await task.status() if iscoroutinefunction(task.status) else task.status()
         
         # Safe Attribute Access
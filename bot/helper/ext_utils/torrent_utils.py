@@ -0,0 +1,152 @@
+from aiofiles import open as aiopen
+from aiofiles.os import listdir, makedirs, path as aiopath, remove, stat
+from base64 import b16encode, b32decode
+from hashlib import sha1, sha256
+from urllib.parse import parse_qs, urlparse
+
+from ... import LOGGER
+
+METADATA_DIR = "metadata"
+METADATA_LIMIT = 500
+
+
+def _bdecode(data, i):
+    c = data[i : i + 1]
+    if c == b"i":
+        end = data.index(b"e", i)
+        return int(data[i + 1 : end]), end + 1
+    if c == b"l":
+        i += 1
+        items = []
+        while data[i : i + 1] != b"e":
+            item, i = _bdecode(data, i)
+            items.append(item)
+        return items, i + 1
+    if c == b"d":
+        i += 1
+        items = {}
+        while data[i : i + 1] != b"e":
+            key, i = _bdecode(data, i)
+            items[key], i = _bdecode(data, i)
+        return items, i + 1
+    if c.isdigit():
+        colon = data.index(b":", i)
+        start = colon + 1
+        end = start + int(data[i:colon])
+        if end > len(data):
+            raise ValueError("Truncated bencoded string")
+        return data[start:end], end
+    raise ValueError(f"Invalid bencoded data at {i}")
+
+
+def _text(value):
+    return value.decode("utf-8", "replace")
+
+
+def _file_tree(tree, parents=()):
+    for key, node in tree.items():
+        if key == b"":
+            yield "/".join(parents), node[b"length"]
+        else:
+            yield from _file_tree(node, (*parents, _text(key)))
+
+
+def parse_torrent(data):
+    if data[:1] != b"d":
+        raise ValueError("Not a torrent file")
+    i = 1
+    info = span = None
+    while data[i : i + 1] != b"e":
+        key, i = _bdecode(data, i)
+        start = i
+        value, i = _bdecode(data, i)
+        if key == b"info":
+            info, span = value, (start, i)
+    if not isinstance(info, dict):
+        raise ValueError("Torrent has no info dictionary")
+    raw_info = data[span[0] : span[1]]
+    if b"pieces" in info:
+        hash_ = sha1(raw_info).hexdigest()
+    else:
+        hash_ = sha256(raw_info).hexdigest()[:40]
+    name = _text(info.get(b"name.utf-8", info[b"name"]))
+    if b"files" in info:
+        files = [
+            (
+                "/".join(map(_text, file.get(b"path.utf-8", file[b"path"]))),
+                file[b"length"],
+            )
+            for file in info[b"files"]
+        ]
+    elif b"file tree" in info:
+        files = list(_file_tree(info[b"file tree"]))
+    else:
+        files = [(name, info[b"length"])]
+    return {
+        "hash": hash_,
+        "name": name,
+        "size": sum(size for _, size in files),
+        "files": files,
+    }
+
+
+def parse_magnet(link):
+    query = parse_qs(urlparse(link).query)
+    name = query.get("dn", [""])[0]
+    for xt in query.get("xt", []):
+        if xt.startswith("urn:btih:"):
+            hash_ = xt[9:]
+            if len(hash_) == 32:
+                hash_ = b16encode(b32decode(hash_.upper())).decode()
+            return hash_.lower(), name
+        if xt.startswith("urn:btmh:1220"):
+            return xt[13:53].lower(), name
+    return None, name
+
+
+async def get_cached_metadata(hash_):
+    metadata = f"{METADATA_DIR}/{hash_}.torrent"
+    if not await aiopath.exists(metadata):
+        return None
+    async with aiopen(metadata, "rb") as f:
+        return await f.read()
+
+
+async def cache_metadata(hash_, data):
+    metadata = f"{METADATA_DIR}/{hash_}.torrent"
+    if await aiopath.exists(metadata):
+        return
+    await makedirs(METADATA_DIR, exist_ok=True)
+    async with aiopen(metadata, "wb") as f:
+        await f.write(data)
+    files = await listdir(METADATA_DIR)
+    if len(files) > METADATA_LIMIT:
+        files = [f"{METADATA_DIR}/{file}" for file in files]
+        ages = {file: (await stat(file)).st_mtime for file in files}
+        for file in sorted(files, key=ages.get)[: len(files) - METADATA_LIMIT]:
+            await remove(file)
+
+
+async def get_torrent_info(link, data=None):
+    try:
+        if data is None:
+            if not link.startswith("magnet:"):
+                return None
+            hash_, name = parse_magnet(link)
+            if not hash_:
+                return None
+            if (data := await get_cached_metadata(hash_)) is None:
+                return {
+                    "hash": hash_,
+                    "name": name,
+                    "size": 0,
+                    "files": [],
+                    "metadata": None,
+                }
+        torrent = parse_torrent(data)
+        torrent["metadata"] = data
+        await cache_metadata(torrent["hash"], data)
+        return torrent
+    except Exception as e:
+        LOGGER.warning(f"Unable to parse torrent: {e}")
+        return None
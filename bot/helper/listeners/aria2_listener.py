@@ -1,20 +1,22 @@
+from aiofiles import open as aiopen
 from aiofiles.os import remove, path as aiopath
 from asyncio import sleep, TimeoutError
-from time import time
 from aiohttp.client_exceptions import ClientError
 
-from ... import task_dict_lock, task_dict, LOGGER, intervals
+from ... import LOGGER, intervals
 from ...core.config_manager import Config
 from ...core.torrent_manager import TorrentManager, is_metadata, aria2_name
 from ..ext_utils.bot_utils import bt_selection_buttons
 from ..ext_utils.files_utils import clean_unwanted
+from ..ext_utils.host_profiles import host_profiles
+from ..ext_utils.torrent_utils import cache_metadata
 from ..ext_utils.status_utils import get_task_by_gid
 from ..ext_utils.task_manager import stop_duplicate_check
-from ..mirror_leech_utils.status_utils.aria2_status import Aria2Status
+from .direct_listener import notify_aria2_event
+from .seed_listener import add_seed, stop_seed
 from ..telegram_helper.message_utils import (
     send_message,
     delete_message,
-    update_status_message,
 )
 
 
@@ -57,7 +59,21 @@ async def _on_download_started(api, data):
             await task.listener.on_download_error(msg, button)
 
 
+async def _save_metadata(path, info_hash):
+    if not await aiopath.exists(path):
+        return
+    try:
+        async with aiopen(path, "rb") as f:
+            await cache_metadata(info_hash, await f.read())
+    except Exception as e:
+        LOGGER.error(f"Failed to save metadata of {info_hash}: {e}")
+    finally:
+        await remove(path)
+
+
 async def _on_download_complete(api, data):
+    if notify_aria2_event(data["params"][0]["gid"]):
+        return
     try:
         gid = data["params"][0]["gid"]
         download = await api.tellStatus(gid)
@@ -65,11 +81,14 @@ async def _on_download_complete(api, data):
     except (TimeoutError, ClientError, Exception) as e:
         LOGGER.error(f"onDownloadComplete: {e}")
         return
+    host_profiles.record(gid, download)
     if options.get("follow-torrent", "") == "false":
         return
     if download.get("followedBy", []):
         new_gid = download.get("followedBy", [])[0]
         LOGGER.info(f"Gid changed from {gid} to {new_gid}")
+        if info_hash := download.get("infoHash"):
+            await _save_metadata(f"{download['dir']}/{info_hash}.torrent", info_hash)
         if task := await get_task_by_gid(new_gid):
             task.listener.is_torrent = True
             if Config.BASE_URL and task.listener.select:
@@ -89,6 +108,8 @@ async def _on_download_complete(api, data):
                 await task.listener.on_upload_error(
                     f"Seeding stopped with Ratio: {task.ratio()} and Time: {task.seeding_time()}"
                 )
+        else:
+            await stop_seed(gid)
     else:
         LOGGER.info(f"onDownloadComplete: {aria2_name(download)} - Gid: {gid}")
         if task := await get_task_by_gid(gid):
@@ -150,20 +171,19 @@ async def _on_bt_download_complete(api, data):
         ):
             pass
         elif task.listener.seed and not task.listener.is_cancelled:
-            async with task_dict_lock:
-                if task.listener.mid not in task_dict:
-                    await TorrentManager.aria2_remove(download)
-                    return
-                task_dict[task.listener.mid] = Aria2Status(task.listener, gid, True)
-                task_dict[task.listener.mid].start_time = time()
+            if not await add_seed(task.listener, "aria2", gid):
+                await TorrentManager.aria2_remove(download)
+                return
             LOGGER.info(f"Seeding started: {aria2_name(download)} - Gid: {gid}")
-            await update_status_message(task.listener.message.chat.id)
         else:
             await TorrentManager.aria2_remove(download)
 
 
 async def _on_download_stopped(_, data):
     gid = data["params"][0]["gid"]
+    if notify_aria2_event(gid):
+        return
+    host_profiles.discard(gid)
     await sleep(4)
     if task := await get_task_by_gid(gid):
         await task.listener.on_download_error("Dead torrent!")
@@ -171,12 +191,15 @@ async def _on_download_stopped(_, data):
 
 async def _on_download_error(api, data):
     gid = data["params"][0]["gid"]
+    if notify_aria2_event(gid):
+        return
     await sleep(1)
     LOGGER.info(f"onDownloadError: {gid}")
     error = "None"
     try:
         download = await api.tellStatus(gid)
         options = await api.getOption(gid)
+        host_profiles.record(gid, download)
         error = download.get("errorMessage", "")
         LOGGER.info(f"Download Error: {error}")
         if options.get("follow-torrent", "") == "false":
@@ -1,8 +1,33 @@
-from asyncio import sleep, TimeoutError
+from aiofiles.os import remove, path as aiopath
+from asyncio import Semaphore, TimeoutError, gather, get_running_loop, wait_for
 from aiohttp.client_exceptions import ClientError
+from time import time
 
 from ... import LOGGER
-from ...core.torrent_manager import TorrentManager, aria2_name
+from ...core.config_manager import Config
+from ...core.torrent_manager import TorrentManager, STATUS_KEYS
+from ..ext_utils.host_profiles import get_host, host_profiles, match_host
+
+EVENT_TIMEOUT = 30
+SNAPSHOT_INTERVAL = 1
+MAX_RETRIES = 2
+FINISHED_STATES = ["complete", "error", "removed"]
+
+aria2_waiters = {}
+
+
+def notify_aria2_event(gid):
+    if future := aria2_waiters.pop(gid, None):
+        if not future.done():
+            future.set_result(None)
+        return True
+    return False
+
+
+def get_host_workers(host):
+    if (workers := match_host(host, Config.DIRECT_HOST_WORKERS)) is not None:
+        return max(int(workers), 1)
+    return max(Config.DIRECT_WORKERS, 1)
 
 
 class DirectListener:
@@ -12,75 +37,132 @@ class DirectListener:
         self._a2c_opt = a2c_opt
         self._proc_bytes = 0
         self._failed = 0
-        self.download_task = None
+        self._downloads = {}
+        self._last_snapshot = 0
         self.name = self.listener.name
 
     @property
     def processed_bytes(self):
-        if self.download_task:
-            return self._proc_bytes + int(
-                self.download_task.get("completedLength", "0")
-            )
-        return self._proc_bytes
+        return self._proc_bytes + sum(
+            int(download.get("completedLength", "0"))
+            for download in self._downloads.values()
+        )
 
     @property
     def speed(self):
-        return (
-            int(self.download_task.get("downloadSpeed", "0"))
-            if self.download_task
-            else 0
+        return sum(
+            int(download.get("downloadSpeed", "0"))
+            for download in self._downloads.values()
+        )
+
+    @property
+    def queued(self):
+        return bool(self._downloads) and all(
+            download.get("status", "") == "waiting"
+            for download in self._downloads.values()
         )
 
     async def download(self, contents):
         self.is_downloading = True
+        limiters = {}
+        files = []
         for content in contents:
-            if self.listener.is_cancelled:
-                break
-            if content["path"]:
-                self._a2c_opt["dir"] = f"{self._path}/{content['path']}"
-            else:
-                self._a2c_opt["dir"] = self._path
-            filename = content["filename"]
-            self._a2c_opt["out"] = filename
-            try:
-                gid = await TorrentManager.aria2.addUri(
-                    uris=[content["url"]], options=self._a2c_opt, position=0
-                )
-            except (TimeoutError, ClientError, Exception) as e:
-                self._failed += 1
-                LOGGER.error(f"Unable to download {filename} due to: {e}")
-                continue
-            self.download_task = await TorrentManager.aria2.tellStatus(gid)
-            while True:
-                if self.listener.is_cancelled:
-                    if self.download_task:
-                        await TorrentManager.aria2_remove(self.download_task)
-                    break
-                self.download_task = await TorrentManager.aria2.tellStatus(gid)
-                if error_message := self.download_task.get("errorMessage"):
-                    self._failed += 1
-                    LOGGER.error(
-                        f"Unable to download {aria2_name(self.download_task)} due to: {error_message}"
-                    )
-                    await TorrentManager.aria2_remove(self.download_task)
-                    break
-                elif self.download_task.get("status", "") == "complete":
-                    self._proc_bytes += int(self.download_task.get("totalLength", "0"))
-                    await TorrentManager.aria2_remove(self.download_task)
-                    break
-                await sleep(1)
-            self.download_task = None
+            host = get_host(content["url"])
+            if host not in limiters:
+                limiters[host] = Semaphore(get_host_workers(host))
+            files.append(self._download_file(content, limiters[host]))
+        await gather(*files)
         if self.listener.is_cancelled:
             return
         if self._failed == len(contents):
             await self.listener.on_download_error("All files are failed to download!")
             return
+        if self._failed:
+            LOGGER.warning(
+                f"{self._failed} of {len(contents)} files failed to download: {self.name}"
+            )
         await self.listener.on_download_complete()
         return
 
+    async def _download_file(self, content, limiter):
+        options = self._a2c_opt.copy()
+        if content["path"]:
+            options["dir"] = f"{self._path}/{content['path']}"
+        else:
+            options["dir"] = self._path
+        filename = options["out"] = content["filename"]
+        error = "Cancelled"
+        async with limiter:
+            for attempt in range(MAX_RETRIES + 1):
+                if self.listener.is_cancelled:
+                    return
+                if attempt:
+                    LOGGER.info(f"Retrying {filename} ({attempt}/{MAX_RETRIES})")
+                    # start over, otherwise aria2 renames the new file to name.1
+                    partial = f"{options['dir']}/{filename}"
+                    for file_ in [partial, f"{partial}.aria2"]:
+                        if await aiopath.exists(file_):
+                            await remove(file_)
+                host, profile, tuned = host_profiles.select(content["url"])
+                try:
+                    download = await self._run(
+                        content["url"], {**options, **tuned}, host, profile
+                    )
+                except (TimeoutError, ClientError, Exception) as e:
+                    error = e
+                    continue
+                if self.listener.is_cancelled or download.get("status") == "complete":
+                    return
+                error = download.get("errorMessage") or "Removed"
+        self._failed += 1
+        LOGGER.error(f"Unable to download {filename} due to: {error}")
+
+    async def _run(self, url, options, host, profile):
+        gid = await TorrentManager.aria2.addUri(uris=[url], options=options, position=0)
+        host_profiles.track(gid, host, profile)
+        try:
+            self._downloads[gid] = await TorrentManager.aria2.tellStatus(
+                gid, STATUS_KEYS
+            )
+            while (
+                self._downloads[gid].get("status", "") not in FINISHED_STATES
+                and not self.listener.is_cancelled
+            ):
+                event = aria2_waiters[gid] = get_running_loop().create_future()
+                try:
+                    await wait_for(event, EVENT_TIMEOUT)
+                except TimeoutError:
+                    pass
+                self._downloads[gid] = await TorrentManager.aria2.tellStatus(
+                    gid, STATUS_KEYS
+                )
+            download = self._downloads[gid]
+            host_profiles.record(gid, download)
+            if download.get("status", "") == "complete":
+                self._proc_bytes += int(download.get("totalLength", "0"))
+            return download
+        finally:
+            aria2_waiters.pop(gid, None)
+            host_profiles.discard(gid)
+            if download := self._downloads.pop(gid, None):
+                await TorrentManager.aria2_remove(download)
+
+    async def update(self):
+        if not self._downloads or time() - self._last_snapshot < SNAPSHOT_INTERVAL:
+            return
+        self._last_snapshot = time()
+        gids = list(self._downloads)
+        downloads = await gather(
+            *(TorrentManager.aria2.tellStatus(gid, STATUS_KEYS) for gid in gids),
+            return_exceptions=True,
+        )
+        for gid, download in zip(gids, downloads):
+            if gid in self._downloads and isinstance(download, dict):
+                self._downloads[gid] = download
+
     async def cancel_task(self):
         self.listener.is_cancelled = True
         LOGGER.info(f"Cancelling Download: {self.listener.name}")
         await self.listener.on_download_error("Download Cancelled by User!")
-        if self.download_task:
-            await TorrentManager.aria2_remove(self.download_task)
+        for gid in list(self._downloads):
+            notify_aria2_event(gid)
@@ -0,0 +1,177 @@
+from aiofiles.os import remove, path as aiopath
+from asyncio import sleep, TimeoutError
+from os import walk
+from aiohttp.client_exceptions import ClientError
+from aioqbt.exc import AQError
+
+from ... import LOGGER, excluded_extensions, task_dict
+from ...core.config_manager import Config
+from ...core.torrent_manager import TorrentManager, STATUS_KEYS
+from ..ext_utils.bot_utils import new_task, sync_to_async
+from ..ext_utils.links_utils import is_rclone_path
+
+PROGRESSIVE_INTERVAL = 10
+progressive_uploads = {}
+
+
+def is_progressive(listener):
+    return bool(
+        Config.PROGRESSIVE_UPLOAD
+        and (listener.is_leech or is_rclone_path(listener.up_dest))
+        and not (
+            listener.seed
+            or listener.dests
+            or listener.same_dir
+            or listener.folder_name
+            or listener.compress
+            or listener.extract
+            or listener.join
+            or listener.ffmpeg_cmds
+            or listener.name_sub
+            or listener.screen_shots
+            or listener.convert_audio
+            or listener.convert_video
+            or listener.sample_video
+        )
+    )
+
+
+class ProgressiveUpload:
+    def __init__(self, listener, tool, id_):
+        self._listener = listener
+        self._tool = tool
+        self._id = id_
+        self._task = None
+        self._stopped = False
+        self._uploading = False
+        self._done = set()
+        self._uploaded = []
+        self._unreleased = {}
+
+    async def _get_files(self):
+        if self._tool == "qbit":
+            files = await TorrentManager.qbittorrent.torrents.files(self._id)
+            # pieces on a file boundary are shared with the next file, so a file
+            # can only be removed once every file sharing its pieces is complete
+            pending = [
+                file.piece_range
+                for file in files
+                if file.priority != 0 and file.progress < 1
+            ]
+            return [
+                (
+                    index,
+                    f"{self._listener.dir}/{file.name}",
+                    file.priority != 0 and file.progress == 1,
+                    not any(
+                        start <= file.piece_range[1] and file.piece_range[0] <= end
+                        for start, end in pending
+                    ),
+                )
+                for index, file in enumerate(files)
+            ]
+        download = await TorrentManager.aria2.tellStatus(self._id, STATUS_KEYS)
+        if followed := download.get("followedBy", []):
+            self._id = followed[0]
+            return []
+        return [
+            (
+                int(file["index"]) - 1,
+                file["path"],
+                file.get("selected", "") == "true"
+                and int(file["length"]) > 0
+                and file["completedLength"] == file["length"],
+                False,
+            )
+            for file in download.get("files", [])
+        ]
+
+    async def _release(self, index, path):
+        if self._tool != "qbit":
+            return
+        try:
+            await TorrentManager.qbittorrent.torrents.file_prio(self._id, [index], 0)
+            await remove(path)
+        except (ClientError, TimeoutError, Exception, AQError) as e:
+            LOGGER.error(f"Progressive upload: unable to release {path}: {e}")
+
+    @new_task
+    async def _run(self):
+        while not self._stopped:
+            await sleep(PROGRESSIVE_INTERVAL)
+            if self._listener.is_cancelled or self._listener.mid not in task_dict:
+                break
+            try:
+                files = await self._get_files()
+            except (ClientError, TimeoutError, Exception, AQError) as e:
+                LOGGER.error(f"Progressive upload: {e}")
+                continue
+            if len(files) < 2:
+                continue
+            for index, path, _, releasable in files:
+                if releasable and self._unreleased.pop(index, None):
+                    await self._release(index, path)
+            for index, path, completed, releasable in files:
+                if self._stopped or self._listener.is_cancelled:
+                    break
+                if not completed or path in self._done:
+                    continue
+                if not await aiopath.exists(path):
+                    continue
+                self._done.add(path)
+                self._uploading = True
+                try:
+                    if await self._listener.upload_completed_file(
+                        path, len(self._done)
+                    ):
+                        self._uploaded.append(path)
+                        if releasable:
+                            await self._release(index, path)
+                        else:
+                            self._unreleased[index] = path
+                finally:
+                    self._uploading = False
+        if progressive_uploads.get(self._listener.mid) is self:
+            del progressive_uploads[self._listener.mid]
+
+    async def start(self):
+        self._task = await self._run()
+
+    async def finish(self):
+        self._stopped = True
+        if self._task is not None:
+            if self._uploading:
+                await self._task
+            else:
+                self._task.cancel()
+        if not self._uploaded:
+            return False
+        for path in self._uploaded:
+            if await aiopath.exists(path):
+                await remove(path)
+        LOGGER.info(
+            f"Progressively uploaded {len(self._uploaded)} files of {self._listener.name}"
+        )
+        for _, _, files in await sync_to_async(walk, self._listener.dir):
+            if any(
+                not file.endswith(tuple(f".{ext}" for ext in excluded_extensions))
+                for file in files
+            ):
+                return False
+        return True
+
+
+async def start_progressive(listener, tool, id_):
+    if not listener.progressive or listener.mid in progressive_uploads:
+        return
+    progressive = progressive_uploads[listener.mid] = ProgressiveUpload(
+        listener, tool, id_
+    )
+    await progressive.start()
+    LOGGER.info(f"Progressive upload enabled for: {listener.name}")
+
+
+async def finish_progressive(listener):
+    if (progressive := progressive_uploads.pop(listener.mid, None)) is None:
+        return False
+    return await progressive.finish()
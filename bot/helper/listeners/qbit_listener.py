@@ -5,8 +5,6 @@ from aiohttp.client_exceptions import ClientError
 from aioqbt.exc import AQError
 
 from ... import (
-    task_dict,
-    task_dict_lock,
     intervals,
     qb_torrents,
     qb_listener_lock,
@@ -16,10 +14,12 @@ from ...core.config_manager import Config
 from ...core.torrent_manager import TorrentManager
 from ..ext_utils.bot_utils import new_task
 from ..ext_utils.files_utils import clean_unwanted
-from ..ext_utils.status_utils import get_readable_time, get_task_by_gid
+from ..ext_utils.status_utils import get_task_by_gid
 from ..ext_utils.task_manager import stop_duplicate_check
-from ..mirror_leech_utils.status_utils.qbit_status import QbittorrentStatus
-from ..telegram_helper.message_utils import update_status_message
+from ..ext_utils.torrent_utils import cache_metadata
+from .seed_listener import add_seed
+
+MAX_RECOVERIES = 3
 
 
 async def _remove_torrent(hash_, tag):
@@ -41,14 +41,15 @@ async def _on_download_error(err, tor, button=None):
     await _remove_torrent(ext_hash, tor.tags[0])
 
 
-@new_task
-async def _on_seed_finish(tor):
-    ext_hash = tor.hash
-    LOGGER.info(f"Cancelling Seed: {tor.name}")
-    if task := await get_task_by_gid(ext_hash[:12]):
-        msg = f"Seeding stopped with Ratio: {round(tor.ratio, 3)} and Time: {get_readable_time(int(tor.seeding_time.total_seconds() or "0"))}"
-        await task.listener.on_upload_error(msg)
-    await _remove_torrent(ext_hash, tor.tags[0])
+async def _get_error_reason(tor):
+    try:
+        logs = await TorrentManager.qbittorrent.log.main(
+            normal=False, info=False, warning=True, critical=True
+        )
+    except (ClientError, TimeoutError, Exception, AQError) as e:
+        LOGGER.error(f"Failed to get qBittorrent log: {e}")
+        return ""
+    return next((log.message for log in reversed(logs) if tor.name in log.message), "")
 
 
 @new_task
@@ -63,6 +64,15 @@ async def _stop_duplicate(tor):
                 _on_download_error(msg, tor, button)
 
 
+@new_task
+async def _save_metadata(tor):
+    try:
+        data = await TorrentManager.qbittorrent.torrents.export(tor.hash)
+        await cache_metadata(tor.hash, data)
+    except (ClientError, TimeoutError, Exception, AQError) as e:
+        LOGGER.error(f"Failed to save metadata of {tor.name}: {e}")
+
+
 @new_task
 async def _on_download_complete(tor):
     ext_hash = tor.hash
@@ -84,23 +94,13 @@ async def _on_download_complete(tor):
         if intervals["stopAll"]:
             return
         if task.listener.seed and not task.listener.is_cancelled:
-            async with task_dict_lock:
-                if task.listener.mid in task_dict:
-                    removed = False
-                    task_dict[task.listener.mid] = QbittorrentStatus(
-                        task.listener, True
-                    )
-                else:
-                    removed = True
-            if removed:
-                await _remove_torrent(ext_hash, tag)
-                return
             async with qb_listener_lock:
-                if tag in qb_torrents:
-                    qb_torrents[tag]["seeding"] = True
-                else:
+                if tag not in qb_torrents:
                     return
-            await update_status_message(task.listener.message.chat.id)
+                del qb_torrents[tag]
+            if not await add_seed(task.listener, "qbit", ext_hash, tag):
+                await _remove_torrent(ext_hash, tag)
+                return
             LOGGER.info(f"Seeding started: {tor.name} - Hash: {ext_hash}")
         else:
             await _remove_torrent(ext_hash, tag)
@@ -108,102 +108,148 @@ async def _on_download_complete(tor):
         await _remove_torrent(ext_hash, tag)
 
 
+async def _on_state_change(tor_info):
+    tag = tor_info.tags[0]
+    state = tor_info.state
+    if state == "metaDL":
+        qb_torrents[tag]["stalled_time"] = time()
+        if (
+            Config.TORRENT_TIMEOUT
+            and time() - qb_torrents[tag]["start_time"] >= Config.TORRENT_TIMEOUT
+        ):
+            await _on_download_error("Dead Torrent!", tor_info)
+        else:
+            await TorrentManager.qbittorrent.torrents.reannounce([tor_info.hash])
+    elif state == "downloading":
+        qb_torrents[tag]["stalled_time"] = time()
+        if not qb_torrents[tag]["stop_dup_check"]:
+            qb_torrents[tag]["stop_dup_check"] = True
+            await _save_metadata(tor_info)
+            await _stop_duplicate(tor_info)
+    elif state == "stalledDL":
+        if (
+            not qb_torrents[tag]["rechecked"]
+            and 0.99989999999999999 < tor_info.progress < 1
+        ):
+            msg = f"Force recheck - Name: {tor_info.name} Hash: "
+            msg += f"{tor_info.hash} Downloaded Bytes: {tor_info.downloaded} "
+            msg += f"Size: {tor_info.size} Total Size: {tor_info.total_size}"
+            LOGGER.warning(msg)
+            await TorrentManager.qbittorrent.torrents.recheck([tor_info.hash])
+            qb_torrents[tag]["rechecked"] = True
+        elif (
+            Config.TORRENT_TIMEOUT
+            and time() - qb_torrents[tag]["stalled_time"] >= Config.TORRENT_TIMEOUT
+        ):
+            await _on_download_error("Dead Torrent!", tor_info)
+        else:
+            await TorrentManager.qbittorrent.torrents.reannounce([tor_info.hash])
+    elif state == "missingFiles":
+        await TorrentManager.qbittorrent.torrents.recheck([tor_info.hash])
+    elif state == "error":
+        task = await get_task_by_gid(tor_info.hash[:12])
+        if (
+            task
+            and task.listener.progressive
+            and qb_torrents[tag]["recovered"] < MAX_RECOVERIES
+        ):
+            qb_torrents[tag]["recovered"] += 1
+            LOGGER.warning(f"Rechecking progressive torrent: {tor_info.name}")
+            await TorrentManager.qbittorrent.torrents.recheck([tor_info.hash])
+            await TorrentManager.qbittorrent.torrents.start([tor_info.hash])
+        elif task and task.listener.progressive:
+            reason = await _get_error_reason(tor_info)
+            await _on_download_error(
+                f"Torrent still in error state after {MAX_RECOVERIES} rechecks. {reason}".strip(),
+                tor_info,
+            )
+        else:
+            await _on_download_error(
+                "No enough space for this torrent on device", tor_info
+            )
+    elif (
+        int(tor_info.completion_on.timestamp()) != -1
+        and not qb_torrents[tag]["uploaded"]
+        and state
+        in [
+            "queuedUP",
+            "stalledUP",
+            "uploading",
+            "forcedUP",
+        ]
+    ):
+        qb_torrents[tag]["uploaded"] = True
+        await _on_download_complete(tor_info)
+
+
 @new_task
 async def _qb_listener():
+    rid = 0
+    torrents = {}
     while True:
         async with qb_listener_lock:
             try:
-                torrents = await TorrentManager.qbittorrent.torrents.info()
+                data = await TorrentManager.qbittorrent.sync.maindata(rid)
+                rid = data.rid
+                if data.full_update:
+                    torrents.clear()
+                for hash_ in data.torrents_removed:
+                    torrents.pop(hash_, None)
+                for hash_, delta in data.torrents.items():
+                    torrents.setdefault(hash_, {}).update(delta)
                 if len(torrents) == 0:
                     intervals["qb"] = ""
                     break
-                for tor_info in torrents:
-                    tag = tor_info.tags[0]
+                changed = set()
+                for hash_, info in torrents.items():
+                    tag = info.get("tags", "").split(",", 1)[0].strip()
                     if tag not in qb_torrents:
                         continue
-                    state = tor_info.state
-                    if state == "metaDL":
-                        qb_torrents[tag]["stalled_time"] = time()
-                        if (
-                            Config.TORRENT_TIMEOUT
-                            and time() - qb_torrents[tag]["start_time"]
-                            >= Config.TORRENT_TIMEOUT
-                        ):
-                            await _on_download_error("Dead Torrent!", tor_info)
-                        else:
-                            await TorrentManager.qbittorrent.torrents.reannounce(
-                                [tor_info.hash]
-                            )
-                    elif state == "downloading":
+                    state = info.get("state")
+                    current = (state, info.get("completion_on"))
+                    if qb_torrents[tag]["handled"] != current:
+                        qb_torrents[tag]["handled"] = current
+                        qb_torrents[tag]["timed_out"] = False
+                        changed.add(hash_)
+                        continue
+                    if state in ["metaDL", "downloading"]:
                         qb_torrents[tag]["stalled_time"] = time()
-                        if not qb_torrents[tag]["stop_dup_check"]:
-                            qb_torrents[tag]["stop_dup_check"] = True
-                            await _stop_duplicate(tor_info)
+                    if state == "metaDL":
+                        since = qb_torrents[tag]["start_time"]
                     elif state == "stalledDL":
-                        if (
-                            not qb_torrents[tag]["rechecked"]
-                            and 0.99989999999999999 < tor_info.progress < 1
-                        ):
-                            msg = f"Force recheck - Name: {tor_info.name} Hash: "
-                            msg += f"{tor_info.hash} Downloaded Bytes: {tor_info.downloaded} "
-                            msg += f"Size: {tor_info.size} Total Size: {tor_info.total_size}"
-                            LOGGER.warning(msg)
-                            await TorrentManager.qbittorrent.torrents.recheck(
-                                [tor_info.hash]
-                            )
-                            qb_torrents[tag]["rechecked"] = True
-                        elif (
-                            Config.TORRENT_TIMEOUT
-                            and time() - qb_torrents[tag]["stalled_time"]
-                            >= Config.TORRENT_TIMEOUT
-                        ):
-                            await _on_download_error("Dead Torrent!", tor_info)
-                        else:
-                            await TorrentManager.qbittorrent.torrents.reannounce(
-                                [tor_info.hash]
-                            )
-                    elif state == "missingFiles":
-                        await TorrentManager.qbittorrent.torrents.recheck(
-                            [tor_info.hash]
-                        )
-                    elif state == "error":
-                        await _on_download_error(
-                            "No enough space for this torrent on device", tor_info
-                        )
-                    elif (
-                        int(tor_info.completion_on.timestamp()) != -1
-                        and not qb_torrents[tag]["uploaded"]
-                        and state
-                        in [
-                            "queuedUP",
-                            "stalledUP",
-                            "uploading",
-                            "forcedUP",
-                        ]
+                        since = qb_torrents[tag]["stalled_time"]
+                    else:
+                        since = None
+                    if (
+                        since is not None
+                        and not qb_torrents[tag]["timed_out"]
+                        and Config.TORRENT_TIMEOUT
+                        and time() - since >= Config.TORRENT_TIMEOUT
                     ):
-                        qb_torrents[tag]["uploaded"] = True
-                        await _on_download_complete(tor_info)
-                    elif (
-                        state in ["stoppedUP", "stoppedDL"]
-                        and qb_torrents[tag]["seeding"]
+                        qb_torrents[tag]["timed_out"] = True
+                        changed.add(hash_)
+                if changed:
+                    for tor_info in await TorrentManager.qbittorrent.torrents.info(
+                        hashes=list(changed)
                     ):
-                        qb_torrents[tag]["seeding"] = False
-                        await _on_seed_finish(tor_info)
-                        await sleep(0.5)
+                        if tor_info.tags and tor_info.tags[0] in qb_torrents:
+                            await _on_state_change(tor_info)
             except (ClientError, TimeoutError, Exception, AQError) as e:
                 LOGGER.error(str(e))
         await sleep(3)
 
 
-async def on_download_start(tag):
+async def on_download_start(tag, stop_dup_check=False):
     async with qb_listener_lock:
         qb_torrents[tag] = {
             "start_time": time(),
             "stalled_time": time(),
-            "stop_dup_check": False,
+            "stop_dup_check": stop_dup_check,
             "rechecked": False,
             "uploaded": False,
-            "seeding": False,
+            "recovered": 0,
+            "handled": None,
+            "timed_out": False,
         }
         if not intervals["qb"]:
             intervals["qb"] = await _qb_listener()
@@ -0,0 +1,174 @@
+from asyncio import gather, sleep, TimeoutError
+from html import escape
+from time import time
+from aiohttp.client_exceptions import ClientError
+from aioqbt.exc import AQError
+
+from ... import (
+    task_dict,
+    task_dict_lock,
+    seed_dict,
+    seed_dict_lock,
+    intervals,
+    LOGGER,
+)
+from ...core.torrent_manager import TorrentManager, STATUS_KEYS
+from ..ext_utils.bot_utils import new_task
+from ..ext_utils.files_utils import clean_download
+from ..ext_utils.status_utils import get_readable_time
+from ..telegram_helper.message_utils import send_message, update_status_message
+
+SEED_INTERVAL = 30
+QB_STOPPED_STATES = ["stoppedUP", "stoppedDL", "error", "missingFiles"]
+
+
+def _get_limits(listener):
+    try:
+        ratio = float(listener.seed_ratio) if listener.seed_ratio else None
+    except ValueError:
+        ratio = None
+    try:
+        seconds = int(listener.seed_time) * 60 if listener.seed_time else None
+    except ValueError:
+        seconds = None
+    return ratio, seconds
+
+
+def _limit_reached(entry):
+    return (
+        entry["ratio_limit"] is not None
+        and entry["ratio"] >= entry["ratio_limit"]
+        or entry["time_limit"] is not None
+        and entry["seeding_time"] >= entry["time_limit"]
+    )
+
+
+async def add_seed(listener, tool, id_, tag=""):
+    async with task_dict_lock:
+        if listener.mid not in task_dict:
+            return False
+        del task_dict[listener.mid]
+        count = len(task_dict)
+    ratio_limit, time_limit = _get_limits(listener)
+    gid = id_[:12] if tool == "qbit" else id_
+    async with seed_dict_lock:
+        seed_dict[gid] = {
+            "gid": gid,
+            "tool": tool,
+            "id": id_,
+            "tag": tag,
+            "name": listener.name,
+            "size": listener.size,
+            "dir": listener.dir,
+            "message": listener.message,
+            "user_tag": listener.tag,
+            "user_id": listener.user_id,
+            "ratio_limit": ratio_limit,
+            "time_limit": time_limit,
+            "start": time(),
+            "ratio": 0,
+            "uploaded": 0,
+            "speed": 0,
+            "seeding_time": 0,
+        }
+        if not intervals["seed"]:
+            intervals["seed"] = await _seed_listener()
+    if count == 0:
+        await listener.clean()
+    else:
+        await update_status_message(listener.message.chat.id)
+    return True
+
+
+async def stop_seed(gid, reason=""):
+    async with seed_dict_lock:
+        if (entry := seed_dict.pop(gid, None)) is None:
+            return False
+    LOGGER.info(f"Cancelling Seed: {entry['name']}")
+    try:
+        if entry["tool"] == "qbit":
+            await TorrentManager.qbittorrent.torrents.delete([entry["id"]], True)
+            await TorrentManager.qbittorrent.torrents.delete_tags([entry["tag"]])
+        else:
+            await TorrentManager.aria2_remove(
+                await TorrentManager.aria2.tellStatus(entry["id"], ["gid", "status"])
+            )
+    except (ClientError, TimeoutError, Exception, AQError) as e:
+        LOGGER.error(f"Failed to remove seed {entry['name']}: {e}")
+    msg = (
+        reason
+        or f"Seeding stopped with Ratio: {round(entry['ratio'], 3)} and Time: {get_readable_time(entry['seeding_time'])}"
+    )
+    await send_message(entry["message"], f"{entry['user_tag']} {escape(msg)}")
+    await clean_download(entry["dir"])
+    return True
+
+
+async def _update_qbit(entries):
+    infos = {
+        info.hash: info
+        for info in await TorrentManager.qbittorrent.torrents.info(
+            hashes=[entry["id"] for entry in entries]
+        )
+    }
+    finished = []
+    for entry in entries:
+        if (info := infos.get(entry["id"])) is None:
+            finished.append(entry)
+            continue
+        entry["ratio"] = info.ratio
+        entry["uploaded"] = info.uploaded
+        entry["speed"] = info.upspeed
+        entry["seeding_time"] = int(info.seeding_time.total_seconds())
+        if info.state in QB_STOPPED_STATES:
+            finished.append(entry)
+    return finished
+
+
+async def _update_aria2(entries):
+    results = await gather(
+        *(
+            TorrentManager.aria2.tellStatus(entry["id"], STATUS_KEYS)
+            for entry in entries
+        ),
+        return_exceptions=True,
+    )
+    finished = []
+    for entry, download in zip(entries, results):
+        if isinstance(download, Exception):
+            if "not found" in str(download):
+                finished.append(entry)
+            continue
+        completed = int(download.get("completedLength", "0"))
+        entry["uploaded"] = int(download.get("uploadLength", "0"))
+        entry["ratio"] = entry["uploaded"] / completed if completed else 0
+        entry["speed"] = int(download.get("uploadSpeed", "0"))
+        entry["seeding_time"] = int(time() - entry["start"])
+        if download.get("status", "") != "active":
+            finished.append(entry)
+    return finished
+
+
+@new_task
+async def _seed_listener():
+    while True:
+        async with seed_dict_lock:
+            if not seed_dict:
+                intervals["seed"] = ""
+                break
+            entries = list(seed_dict.values())
+        finished = []
+        for tool, update in [("qbit", _update_qbit), ("aria2", _update_aria2)]:
+            if tool_entries := [entry for entry in entries if entry["tool"] == tool]:
+                try:
+                    finished.extend(await update(tool_entries))
+                except (ClientError, TimeoutError, Exception, AQError) as e:
+                    LOGGER.error(f"Seed listener: {e}")
+        finished.extend(
+            entry
+            for entry in entries
+            if entry not in finished and _limit_reached(entry)
+        )
+        for entry in finished:
+            await stop_seed(entry["gid"])
+        await sleep(SEED_INTERVAL)
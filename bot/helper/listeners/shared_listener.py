@@ -0,0 +1,115 @@
+from aiofiles import open as aiopen
+from aiofiles.os import remove, path as aiopath
+from asyncio import sleep
+
+from ... import LOGGER, bot_loop, task_dict, task_dict_lock
+from ..ext_utils.bot_utils import new_task
+from ..ext_utils.files_utils import create_recursive_hardlink
+from ..ext_utils.links_utils import is_magnet, is_url
+from ..mirror_leech_utils.status_utils.shared_status import SharedStatus
+from ..telegram_helper.message_utils import send_status_message
+
+shared_downloads = {}
+
+
+def register_shared_download(listener, hash_, restart, data=None):
+    if (
+        listener.select
+        or listener.same_dir
+        or listener.progressive
+        or hash_ in shared_downloads
+    ):
+        return
+    shared_downloads[hash_] = {
+        "mid": listener.mid,
+        "listeners": [],
+        "restart": restart,
+        "data": data,
+    }
+
+
+async def _attach(listener, shared):
+    async with task_dict_lock:
+        if shared["mid"] not in task_dict:
+            return False
+        task_dict[listener.mid] = SharedStatus(
+            listener, shared["mid"], shared["listeners"]
+        )
+    shared["listeners"].append(listener)
+    return True
+
+
+async def attach_shared_download(listener, hash_):
+    if listener.select or listener.same_dir:
+        return False
+    if not (shared := shared_downloads.get(hash_)):
+        return False
+    if not await _attach(listener, shared):
+        return False
+    LOGGER.info(f"Attached to running download: {listener.name} - Hash: {hash_}")
+    await listener.on_download_start()
+    if listener.multi <= 1:
+        await send_status_message(listener.message)
+    return True
+
+
+def _pop_shared(mid):
+    for hash_, shared in list(shared_downloads.items()):
+        if shared["mid"] == mid:
+            del shared_downloads[hash_]
+            return hash_, shared
+    return None, None
+
+
+@new_task
+async def _restart_waiters(hash_, shared):
+    # wait for the cancelled owner to remove its torrent before adding it again
+    await sleep(3)
+    for waiter in list(shared["listeners"]):
+        if waiter.is_cancelled:
+            continue
+        if (current := shared_downloads.get(hash_)) and await _attach(waiter, current):
+            LOGGER.info(f"Attached to running download: {waiter.name} - Hash: {hash_}")
+            continue
+        link = ""
+        if (
+            shared["data"] is not None
+            and not is_magnet(waiter.link)
+            and not is_url(waiter.link)
+            and not await aiopath.exists(waiter.link)
+        ):
+            link = waiter.link = f"{waiter.dir}.torrent"
+            async with aiopen(link, "wb") as f:
+                await f.write(shared["data"])
+        LOGGER.info(f"Restarting shared download for: {waiter.name} - Hash: {hash_}")
+        try:
+            await shared["restart"](waiter)
+        finally:
+            if link and await aiopath.exists(link):
+                await remove(link)
+
+
+async def on_shared_download_complete(listener, dl_path):
+    _, shared = _pop_shared(listener.mid)
+    for waiter in shared["listeners"] if shared else []:
+        if waiter.is_cancelled:
+            continue
+        waiter.name = listener.name
+        waiter.seed = False
+        await create_recursive_hardlink(dl_path, f"{waiter.dir}/{listener.name}")
+        LOGGER.info(f"Shared download linked: {dl_path} -> {waiter.dir}")
+        bot_loop.create_task(waiter.on_download_complete())
+
+
+async def on_shared_download_error(listener, error):
+    hash_, shared = _pop_shared(listener.mid)
+    if not shared:
+        return
+    if listener.is_cancelled:
+        await _restart_waiters(hash_, shared)
+        return
+    for waiter in shared["listeners"]:
+        if not waiter.is_cancelled:
+            bot_loop.create_task(
+                waiter.on_download_error(f"Shared download failed: {error}")
+            )
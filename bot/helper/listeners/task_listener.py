@@ -1,7 +1,9 @@
-from aiofiles.os import path as aiopath, listdir, remove
-from asyncio import sleep, gather
+from aiofiles.os import path as aiopath, listdir, makedirs, remove
+from asyncio import create_task, sleep, gather
+from copy import copy
 from html import escape
 from requests import utils as rutils
+from secrets import token_urlsafe
 
 from ... import (
     intervals,
@@ -21,11 +23,13 @@ from ...core.torrent_manager import TorrentManager
 from ..common import TaskConfig
 from ..ext_utils.bot_utils import sync_to_async
 from ..ext_utils.db_handler import database
+from ..ext_utils.download_cache import download_cache
 from ..ext_utils.files_utils import (
     get_path_size,
     clean_download,
     clean_target,
     join_files,
+    create_recursive_hardlink,
     create_recursive_symlink,
     remove_excluded_files,
     move_and_merge,
@@ -46,6 +50,8 @@ from ..telegram_helper.message_utils import (
     delete_status,
     update_status_message,
 )
+from .progressive_listener import finish_progressive
+from .shared_listener import on_shared_download_complete, on_shared_download_error
 
 
 class TaskListener(TaskConfig):
@@ -86,7 +92,7 @@ class TaskListener(TaskConfig):
             and Config.DATABASE_URL
         ):
             await database.add_incomplete_task(
-                self.message.chat.id, self.message.link, self.tag
+                self.message.chat.id, self.message.link, self.tag, self.mid
             )
 
     async def on_download_complete(self):
@@ -133,6 +139,8 @@ class TaskListener(TaskConfig):
             gid = download.gid()
         LOGGER.info(f"Download completed: {self.name}")
 
+        uploaded_all = await finish_progressive(self)
+
         if not (self.is_torrent or self.is_qbit):
             self.seed = False
 
@@ -158,9 +166,18 @@ class TaskListener(TaskConfig):
                 await self.on_upload_error(str(e))
                 return
 
+        if uploaded_all:
+            LOGGER.info(f"All files of {self.name} were uploaded progressively")
+            async with queue_dict_lock:
+                non_queued_dl.discard(self.mid)
+            await self.finalize_upload()
+            return
+
         dl_path = f"{self.dir}/{self.name}"
         self.size = await get_path_size(dl_path)
         self.is_file = await aiopath.isfile(dl_path)
+        await on_shared_download_complete(self, dl_path)
+        await download_cache.store(self, dl_path)
 
         if self.seed:
             up_dir = self.up_dir = f"{self.dir}10000"
@@ -253,7 +270,7 @@ class TaskListener(TaskConfig):
         self.name = up_path.replace(f"{up_dir}/", "").split("/", 1)[0]
         self.size = await get_path_size(up_dir)
 
-        if self.is_leech and not self.compress:
+        if self.is_leech and not self.compress and not self.dests:
             await self.proceed_split(up_path, gid)
             if self.is_cancelled:
                 return
@@ -274,6 +291,104 @@ class TaskListener(TaskConfig):
 
         self.size = await get_path_size(up_dir)
 
+        if self.dests:
+            await self._upload_to_dests(up_path, up_dir, gid)
+        else:
+            await self._upload(up_path, up_dir, gid)
+
+    async def _upload_to_dests(self, up_path, up_dir, gid):
+        listeners = []
+        for index, dest in enumerate([{}, *self.dests]):
+            listener = copy(self)
+            vars(listener).update(dest)
+            listener.main_task = self
+            listener.up_dir = f"{self.dir}{20000 + index}"
+            if index:
+                listener.mid = f"{self.mid}-{index}"
+            await create_recursive_symlink(up_dir, listener.up_dir)
+            listeners.append(listener)
+
+        async def _run(listener, lgid):
+            lup_path = up_path.replace(up_dir, listener.up_dir, 1)
+            if listener.is_leech and not listener.compress:
+                await listener.proceed_split(lup_path, lgid)
+                if listener.is_cancelled:
+                    return
+                listener.clear()
+            await listener._upload(lup_path, listener.up_dir, lgid)
+
+        async def _cancel(listener):
+            async with task_dict_lock:
+                status = task_dict.get(listener.mid)
+            if status is not None and getattr(status, "listener", None) is listener:
+                await status.task().cancel_task()
+            listener.is_cancelled = True
+
+        # cancelling the task or any destination stops all of them
+        async def _sync_cancel():
+            while not (
+                self.is_cancelled
+                or any(listener.is_cancelled for listener in listeners)
+            ):
+                await sleep(1)
+            self.is_cancelled = True
+            await gather(
+                *(
+                    _cancel(listener)
+                    for listener in listeners
+                    if not listener.is_cancelled
+                )
+            )
+
+        LOGGER.info(f"Uploading {self.name} to {len(listeners)} destinations")
+        watcher = create_task(_sync_cancel())
+        try:
+            await gather(
+                *(
+                    _run(listener, gid if index == 0 else token_urlsafe(12))
+                    for index, listener in enumerate(listeners)
+                )
+            )
+        finally:
+            watcher.cancel()
+        await gather(*(clean_target(listener.up_dir) for listener in listeners))
+        if self.is_cancelled:
+            return
+        if any(listener.is_uploaded for listener in listeners):
+            await self.finalize_upload()
+        else:
+            await self.on_upload_error("Upload failed for all destinations!")
+
+    async def upload_completed_file(self, path, index):
+        listener = copy(self)
+        listener.main_task = self
+        listener.mid = f"{self.mid}-p{index}"
+        listener.up_dir = f"{self.dir}{30000 + index}"
+        rel_path = path.replace(f"{self.dir}/", "", 1)
+        listener.name = rel_path.rsplit("/", 1)[-1]
+        listener.is_file = True
+        listener.clear()
+        if not listener.is_leech and "/" in rel_path:
+            folder = rel_path.rsplit("/", 1)[0]
+            if self.up_dest.endswith((":", "/")):
+                listener.up_dest = f"{self.up_dest}{folder}"
+            else:
+                listener.up_dest = f"{self.up_dest}/{folder}"
+        up_path = f"{listener.up_dir}/{listener.name}"
+        await makedirs(listener.up_dir, exist_ok=True)
+        await create_recursive_hardlink(path, up_path)
+        listener.size = await get_path_size(up_path)
+        gid = token_urlsafe(12)
+        LOGGER.info(f"Progressive upload: {rel_path}")
+        if listener.is_leech:
+            await listener.proceed_split(up_path, gid)
+            listener.clear()
+        if not listener.is_cancelled:
+            await listener._upload(up_path, listener.up_dir, gid)
+        await clean_target(listener.up_dir)
+        return listener.is_uploaded
+
+    async def _upload(self, up_path, up_dir, gid):
         if self.is_leech:
             LOGGER.info(f"Leech Name: {self.name}")
             tg = TelegramUploader(self, up_dir)
@@ -304,17 +419,16 @@ class TaskListener(TaskConfig):
                 RCTransfer.upload(up_path),
             )
             del RCTransfer
-        return
+
+    async def remove_dest_status(self):
+        async with task_dict_lock:
+            if self.mid in task_dict:
+                del task_dict[self.mid]
+        await update_status_message(self.message.chat.id)
 
     async def on_upload_complete(
         self, link, files, folders, mime_type, rclone_path="", dir_id=""
     ):
-        if (
-            self.is_super_chat
-            and Config.INCOMPLETE_TASK_NOTIFIER
-            and Config.DATABASE_URL
-        ):
-            await database.rm_complete_task(self.message.link)
         msg = f"<b>Name: </b><code>{escape(self.name)}</code>\n\n<b>Size: </b>{get_readable_file_size(self.size)}"
         LOGGER.info(f"Task Done: {self.name}")
         if self.is_leech:
@@ -397,6 +511,19 @@ class TaskListener(TaskConfig):
                 button = None
             msg += f"\n\n<b>cc: </b>{self.tag}"
             await send_message(self.message, msg, button)
+        if self.main_task is not None:
+            self.is_uploaded = True
+            await self.remove_dest_status()
+            return
+        await self.finalize_upload()
+
+    async def finalize_upload(self):
+        if (
+            self.is_super_chat
+            and Config.INCOMPLETE_TASK_NOTIFIER
+            and Config.DATABASE_URL
+        ):
+            await database.rm_complete_task(self.message.link, self.mid)
         if self.seed:
             await clean_target(self.up_dir)
             async with queue_dict_lock:
@@ -425,6 +552,7 @@ class TaskListener(TaskConfig):
             if self.mid in task_dict:
                 del task_dict[self.mid]
             count = len(task_dict)
+        await on_shared_download_error(self, error)
         await self.remove_from_same_dir()
         msg = f"{self.tag} Download: {escape(str(error))}"
         await send_message(self.message, msg, button)
@@ -438,7 +566,7 @@ class TaskListener(TaskConfig):
             and Config.INCOMPLETE_TASK_NOTIFIER
             and Config.DATABASE_URL
         ):
-            await database.rm_complete_task(self.message.link)
+            await database.rm_complete_task(self.message.link, self.mid)
 
         async with queue_dict_lock:
             if self.mid in queued_dl:
@@ -461,6 +589,10 @@ class TaskListener(TaskConfig):
             await remove(self.thumb)
 
     async def on_upload_error(self, error):
+        if self.main_task is not None:
+            await self.remove_dest_status()
+            await send_message(self.message, f"{self.tag} {escape(str(error))}")
+            return
         async with task_dict_lock:
             if self.mid in task_dict:
                 del task_dict[self.mid]
@@ -476,7 +608,7 @@ class TaskListener(TaskConfig):
             and Config.INCOMPLETE_TASK_NOTIFIER
             and Config.DATABASE_URL
         ):
-            await database.rm_complete_task(self.message.link)
+            await database.rm_complete_task(self.message.link, self.mid)
 
         async with queue_dict_lock:
             if self.mid in queued_dl:
@@ -8,11 +8,29 @@ from .... import task_dict_lock, task_dict, LOGGER
 from ....core.config_manager import Config
 from ....core.torrent_manager import TorrentManager, is_metadata, aria2_name
 from ...ext_utils.bot_utils import bt_selection_buttons
+from ...ext_utils.download_cache import download_cache
+from ...ext_utils.host_profiles import host_profiles
 from ...ext_utils.task_manager import check_running_tasks
+from ...ext_utils.torrent_utils import get_torrent_info
+from ...listeners.progressive_listener import is_progressive, start_progressive
+from ...listeners.shared_listener import (
+    attach_shared_download,
+    register_shared_download,
+)
 from ...mirror_leech_utils.status_utils.aria2_status import Aria2Status
 from ...telegram_helper.message_utils import send_status_message, send_message
 
 
+async def _restart_aria2_download(listener):
+    await add_aria2_download(
+        listener,
+        f"{listener.dir}{listener.folder_name}",
+        None,
+        listener.seed_ratio,
+        listener.seed_time,
+    )
+
+
 async def add_aria2_download(listener, dpath, header, ratio, seed_time):
     a2c_opt = {"dir": dpath}
     if listener.name:
@@ -26,25 +44,46 @@ async def add_aria2_download(listener, dpath, header, ratio, seed_time):
     if TORRENT_TIMEOUT := Config.TORRENT_TIMEOUT:
         a2c_opt["bt-stop-timeout"] = f"{TORRENT_TIMEOUT}"
 
+    data = None
+    if await aiopath.exists(listener.link):
+        async with aiopen(listener.link, "rb") as tf:
+            data = await tf.read()
+    if torrent := await get_torrent_info(listener.link, data):
+        data = torrent["metadata"] or data
+        listener.name = listener.name or torrent["name"]
+        listener.cache_key = f"bt:{torrent['hash']}"
+    if await download_cache.restore(listener) or (
+        torrent and await attach_shared_download(listener, torrent["hash"])
+    ):
+        if await aiopath.exists(listener.link):
+            await remove(listener.link)
+        return
+
+    listener.progressive = bool(torrent) and is_progressive(listener)
     add_to_queue, event = await check_running_tasks(listener)
     if add_to_queue:
-        if listener.link.startswith("magnet:"):
+        if listener.link.startswith("magnet:") and data is None:
             a2c_opt["pause-metadata"] = "true"
         else:
             a2c_opt["pause"] = "true"
 
+    host = profile = None
     try:
-        if await aiopath.exists(listener.link):
-            async with aiopen(listener.link, "rb") as tf:
-                torrent = await tf.read()
-            encoded = b64encode(torrent).decode()
+        if data is not None:
+            encoded = b64encode(data).decode()
             params = [encoded, [], a2c_opt]
             gid = await TorrentManager.aria2.jsonrpc("addTorrent", params)
             """gid = await TorrentManager.aria2.add_torrent(path=listener.link, options=a2c_opt)"""
         else:
+            if listener.link.startswith("magnet:"):
+                a2c_opt["bt-save-metadata"] = "true"
+            host, profile, options = host_profiles.select(listener.link)
+            a2c_opt.update(options)
             gid = await TorrentManager.aria2.addUri(
                 uris=[listener.link], options=a2c_opt
             )
+            if not add_to_queue:
+                host_profiles.track(gid, host, profile)
     except (TimeoutError, ClientError, Exception) as e:
         LOGGER.info(f"Aria2c Download Error: {e}")
         await listener.on_download_error(f"{e}")
@@ -62,6 +101,9 @@ async def add_aria2_download(listener, dpath, header, ratio, seed_time):
     name = aria2_name(download)
     async with task_dict_lock:
         task_dict[listener.mid] = Aria2Status(listener, gid, queued=add_to_queue)
+    if info_hash := download.get("infoHash"):
+        register_shared_download(listener, info_hash, _restart_aria2_download, data)
+    await start_progressive(listener, "aria2", gid)
     if add_to_queue:
         LOGGER.info(f"Added to Queue/Download: {name}. Gid: {gid}")
         if (
@@ -97,4 +139,5 @@ async def add_aria2_download(listener, dpath, header, ratio, seed_time):
             new_gid = task.gid()
 
         await TorrentManager.aria2.unpause(new_gid)
+        host_profiles.track(new_gid, host, profile)
         LOGGER.info(f"Start Queued Download from Aria2c: {name}. Gid: {new_gid}")
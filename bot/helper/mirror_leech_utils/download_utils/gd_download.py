@@ -2,6 +2,7 @@ from secrets import token_urlsafe
 
 from .... import task_dict, task_dict_lock, LOGGER
 from ...ext_utils.bot_utils import sync_to_async
+from ...ext_utils.download_cache import download_cache
 from ...ext_utils.task_manager import check_running_tasks, stop_duplicate_check
 from ...mirror_leech_utils.gdrive_utils.count import GoogleDriveCount
 from ...mirror_leech_utils.gdrive_utils.download import GoogleDriveDownload
@@ -27,6 +28,13 @@ async def add_gd_download(listener, path):
         await listener.on_download_error(msg, button)
         return
 
+    if mime_type != "Folder" and drive.file_version:
+        listener.cache_key = (
+            f"gd:{drive.get_id_from_url(listener.link)}|{drive.file_version}"
+        )
+        if await download_cache.restore(listener, True):
+            return
+
     add_to_queue, event = await check_running_tasks(listener)
     if add_to_queue:
         LOGGER.info(f"Added to Queue/Download: {listener.name}")
@@ -4,18 +4,27 @@ from asyncio import sleep, TimeoutError
 from aioqbt.api import AddFormBuilder
 from aioqbt.exc import AQError
 from aiohttp.client_exceptions import ClientError
+from psutil import disk_usage
 
 from .... import (
     task_dict,
     task_dict_lock,
     LOGGER,
     qb_torrents,
+    DOWNLOAD_DIR,
 )
 from ....core.config_manager import Config
 from ....core.torrent_manager import TorrentManager
 from ...ext_utils.bot_utils import bt_selection_buttons
-from ...ext_utils.task_manager import check_running_tasks
+from ...ext_utils.download_cache import download_cache
+from ...ext_utils.task_manager import check_running_tasks, stop_duplicate_check
+from ...ext_utils.torrent_utils import get_torrent_info
+from ...listeners.progressive_listener import is_progressive, start_progressive
 from ...listeners.qbit_listener import on_download_start
+from ...listeners.shared_listener import (
+    attach_shared_download,
+    register_shared_download,
+)
 from ...mirror_leech_utils.status_utils.qbit_status import QbittorrentStatus
 from ...telegram_helper.message_utils import (
     send_message,
@@ -23,34 +32,58 @@ from ...telegram_helper.message_utils import (
     send_status_message,
 )
 
-"""
-Only v1 torrents
-#from hashlib import sha1
-#from base64 import b16encode, b32decode
-#from bencoding import bencode, bdecode
-#from re import search as re_search
-def _get_hash_magnet(mgt: str):
-    hash_ = re_search(r'(?<=xt=urn:btih:)[a-zA-Z0-9]+', mgt).group(0)
-    if len(hash_) == 32:
-        hash_ = b16encode(b32decode(hash_.upper())).decode()
-    return hash_
 
-def _get_hash_file(fpath):
-    with open(fpath, "rb") as f:
-        decodedDict = bdecode(f.read())
-        return sha1(bencode(decodedDict[b'info'])).hexdigest()
-"""
+async def _restart_qb_torrent(listener):
+    await add_qb_torrent(
+        listener,
+        f"{listener.dir}{listener.folder_name}",
+        listener.seed_ratio,
+        listener.seed_time,
+    )
 
 
 async def add_qb_torrent(listener, path, ratio, seed_time):
     try:
         form = AddFormBuilder.with_client(TorrentManager.qbittorrent)
+        data = None
         if await aiopath.exists(listener.link):
             async with aiopen(listener.link, "rb") as f:
                 data = await f.read()
-                form = form.include_file(data)
-        else:
+        torrent = await get_torrent_info(listener.link, data)
+        if torrent and torrent["metadata"]:
+            data = torrent["metadata"]
+        if data is None:
             form = form.include_url(listener.link)
+        else:
+            form = form.include_file(data)
+        dup_checked = False
+        if torrent:
+            listener.name = listener.name or torrent["name"]
+            listener.cache_key = f"bt:{torrent['hash']}"
+            if await download_cache.restore(listener):
+                return
+            if await attach_shared_download(listener, torrent["hash"]):
+                return
+            if await TorrentManager.qbittorrent.torrents.info(hashes=[torrent["hash"]]):
+                await listener.on_download_error(
+                    "This torrent is already being downloaded by another task!"
+                )
+                return
+            if torrent["files"]:
+                if torrent["size"] > disk_usage(DOWNLOAD_DIR).free:
+                    await listener.on_download_error(
+                        "No enough space for this torrent on device"
+                    )
+                    return
+                listener.name = torrent["name"]
+                msg, button = await stop_duplicate_check(listener)
+                if msg:
+                    await listener.on_download_error(msg, button)
+                    return
+                dup_checked = True
+                LOGGER.info(
+                    f"Parsed torrent: {torrent['name']} - Hash: {torrent['hash']} - Files: {len(torrent['files'])}"
+                )
         form = form.savepath(path).tags([f"{listener.mid}"])
         add_to_queue, event = await check_running_tasks(listener)
         if add_to_queue:
@@ -59,6 +92,9 @@ async def add_qb_torrent(listener, path, ratio, seed_time):
             form = form.ratio_limit(ratio)
         if seed_time:
             form = form.seeding_time_limit(int(seed_time))
+        listener.progressive = is_progressive(listener)
+        if listener.progressive:
+            form = form.sequential_download(True)
         try:
             await TorrentManager.qbittorrent.torrents.add(form.build())
         except (ClientError, TimeoutError, Exception, AQError) as e:
@@ -86,7 +122,9 @@ async def add_qb_torrent(listener, path, ratio, seed_time):
 
         async with task_dict_lock:
             task_dict[listener.mid] = QbittorrentStatus(listener, queued=add_to_queue)
-        await on_download_start(f"{listener.mid}")
+        register_shared_download(listener, ext_hash, _restart_qb_torrent, data)
+        await on_download_start(f"{listener.mid}", dup_checked)
+        await start_progressive(listener, "qbit", ext_hash)
 
         if add_to_queue:
             LOGGER.info(f"Added to Queue/Download: {tor_info.name} - Hash: {ext_hash}")
@@ -138,7 +176,7 @@ async def add_qb_torrent(listener, path, ratio, seed_time):
                 LOGGER.info(
                     f"Start Queued Download from Qbittorrent: {tor_info.name} - Hash: {ext_hash}"
                 )
-            await on_download_start(f"{listener.mid}")
+            await on_download_start(f"{listener.mid}", dup_checked)
             await TorrentManager.qbittorrent.torrents.start([ext_hash])
     except (ClientError, TimeoutError, Exception, AQError) as e:
         if f"{listener.mid}" in qb_torrents:
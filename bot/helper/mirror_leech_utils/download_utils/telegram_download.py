@@ -8,6 +8,7 @@ from .... import (
     task_dict_lock,
 )
 from ....core.telegram_manager import TgClient
+from ...ext_utils.download_cache import download_cache
 from ...ext_utils.task_manager import check_running_tasks, stop_duplicate_check
 from ...mirror_leech_utils.status_utils.queue_status import QueueStatus
 from ...mirror_leech_utils.status_utils.telegram_status import TelegramStatus
@@ -136,6 +137,10 @@ class TelegramDownloadHelper:
                     await self._listener.on_download_error(msg, button)
                     return
 
+                self._listener.cache_key = f"tg:{media.file_unique_id}"
+                if await download_cache.restore(self._listener, True):
+                    return
+
                 add_to_queue, event = await check_running_tasks(self._listener)
                 if add_to_queue:
                     LOGGER.info(f"Added to Queue/Download: {self._listener.name}")
@@ -1,6 +1,8 @@
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 from googleapiclient.errors import HttpError
 from logging import getLogger
 from os import path as ospath
+from random import random
 from tenacity import (
     retry,
     wait_exponential,
@@ -8,8 +10,10 @@ from tenacity import (
     retry_if_exception_type,
     RetryError,
 )
-from time import time
+from threading import local
+from time import sleep, time
 
+from ....core.config_manager import Config
 from ...ext_utils.bot_utils import async_to_sync
 from ...mirror_leech_utils.gdrive_utils.helper import GoogleDriveHelper
 
@@ -17,6 +21,8 @@ LOGGER = getLogger(__name__)
 
 
 class GoogleDriveClone(GoogleDriveHelper):
+    _worker_attrs = ("listener", "_start_time")
+
     def __init__(self, listener):
         self.listener = listener
         self._start_time = time()
@@ -66,11 +72,15 @@ class GoogleDriveClone(GoogleDriveHelper):
                     self.service.files().delete(
                         fileId=dir_id, supportsAllDrives=True
                     ).execute()
+                    self.invalidate_cache(dir_id, children=True)
                     return None, None, None, None, None
+                self.invalidate_cache(self.listener.up_dest)
                 mime_type = "Folder"
                 self.listener.size = self.proc_bytes
             else:
                 file = self._copy_file(meta.get("id"), self.listener.up_dest)
+                self.invalidate_cache(self.listener.up_dest)
+                self.add_sa_usage(int(meta.get("size", 0)))
                 msg += f'<b>Name: </b><code>{file.get("name")}</code>'
                 durl = self.G_DRIVE_BASE_DOWNLOAD_URL.format(file.get("id"))
                 if mime_type is None:
@@ -101,30 +111,79 @@ class GoogleDriveClone(GoogleDriveHelper):
                 msg = f"Error.\n{err}"
             async_to_sync(self.listener.on_upload_error, msg)
             return None, None, None, None, None
+        finally:
+            self.release_service_accounts()
 
     def _clone_folder(self, folder_name, folder_id, dest_id):
-        LOGGER.info(f"Syncing: {folder_name}")
-        files = self.get_files_by_folder_id(folder_id)
-        if len(files) == 0:
-            return dest_id
-        for file in files:
-            if file.get("mimeType") == self.G_DRIVE_DIR_MIME_TYPE:
-                self.total_folders += 1
-                file_path = ospath.join(folder_name, file.get("name"))
-                current_dir_id = self.create_directory(file.get("name"), dest_id)
-                self._clone_folder(file_path, file.get("id"), current_dir_id)
-            elif (
-                not file.get("name")
-                .strip()
-                .lower()
-                .endswith(tuple(self.listener.excluded_extensions))
-            ):
+        thread_data = local()
+
+        def _worker():
+            if (worker := getattr(thread_data, "worker", None)) is None:
+                worker = thread_data.worker = self.add_worker()
+            return worker
+
+        def _create(name, target_id):
+            return _worker().create_directory(name, target_id)
+
+        def _copy(file, target_id):
+            if self.listener.is_cancelled:
+                return None
+            worker = _worker()
+            if worker._copy_file(file.get("id"), target_id) is None:
+                return None
+            worker.add_sa_usage(int(file.get("size", 0)))
+            return file
+
+        def _collect(futures):
+            for future in futures:
+                if (file := future.result()) is None:
+                    continue
                 self.total_files += 1
-                self._copy_file(file.get("id"), dest_id)
                 self.proc_bytes += int(file.get("size", 0))
                 self.total_time = int(time() - self._start_time)
-            if self.listener.is_cancelled:
-                break
+
+        workers = max(Config.GDRIVE_WORKERS, 1)
+        targets = {folder_id: (folder_name, dest_id)}
+        copies = set()
+        with ThreadPoolExecutor(
+            max_workers=workers
+        ) as dir_executor, ThreadPoolExecutor(max_workers=workers) as copy_executor:
+            try:
+                for parent_id, files in self.walk_folder(folder_id, False):
+                    path, target_id = targets.pop(parent_id)
+                    if isinstance(target_id, Future):
+                        target_id = target_id.result()
+                    LOGGER.info(f"Syncing: {path}")
+                    for file in files:
+                        if file.get("mimeType") == self.G_DRIVE_DIR_MIME_TYPE:
+                            self.total_folders += 1
+                            targets[file.get("id")] = (
+                                ospath.join(path, file.get("name")),
+                                dir_executor.submit(
+                                    _create, file.get("name"), target_id
+                                ),
+                            )
+                        elif (
+                            not file.get("name")
+                            .strip()
+                            .lower()
+                            .endswith(tuple(self.listener.excluded_extensions))
+                        ):
+                            copies.add(copy_executor.submit(_copy, file, target_id))
+                    done = {future for future in copies if future.done()}
+                    copies -= done
+                    _collect(done)
+                    if self.listener.is_cancelled:
+                        break
+                if self.listener.is_cancelled:
+                    for future in copies:
+                        future.cancel()
+                else:
+                    _collect(as_completed(copies))
+            except Exception:
+                for future in copies:
+                    future.cancel()
+                raise
 
     @retry(
         wait=wait_exponential(multiplier=2, min=3, max=6),
@@ -133,15 +192,27 @@ class GoogleDriveClone(GoogleDriveHelper):
     )
     def _copy_file(self, file_id, dest_id):
         body = {"parents": [dest_id]}
-        try:
-            return (
-                self.service.files()
-                .copy(fileId=file_id, body=body, supportsAllDrives=True)
-                .execute()
-            )
-        except HttpError as err:
-            if err.resp.get("content-type", "").startswith("application/json"):
-                reason = eval(err.content).get("error").get("errors")[0].get("reason")
+        backoff = 0
+        while True:
+            try:
+                return (
+                    self.service.files()
+                    .copy(fileId=file_id, body=body, supportsAllDrives=True)
+                    .execute()
+                )
+            except HttpError as err:
+                reason = self.get_error_reason(err)
+                if (
+                    reason in ["rateLimitExceeded", "userRateLimitExceeded"]
+                    or err.resp.status == 429
+                ) and backoff < 5:
+                    delay = 2**backoff + random()
+                    backoff += 1
+                    LOGGER.warning(
+                        f"Got: {reason or err.resp.status}, retrying in {delay:.1f}s"
+                    )
+                    sleep(delay)
+                    continue
                 if reason not in [
                     "userRateLimitExceeded",
                     "dailyLimitExceeded",
@@ -150,6 +221,7 @@ class GoogleDriveClone(GoogleDriveHelper):
                     raise err
                 if reason == "cannotCopyFile":
                     LOGGER.error(err)
+                    return
                 elif self.use_sa:
                     if self.sa_count >= self.sa_number:
                         LOGGER.info(
@@ -159,8 +231,8 @@ class GoogleDriveClone(GoogleDriveHelper):
                     else:
                         if self.listener.is_cancelled:
                             return
-                        self.switch_service_account()
-                        return self._copy_file(file_id, dest_id)
+                        self.switch_service_account(reason)
+                        backoff = 0
                 else:
                     LOGGER.error(f"Got: {reason}")
                     raise err
@@ -1,6 +1,7 @@
 from logging import getLogger
 from tenacity import RetryError
 
+from ....core.config_manager import Config
 from ...mirror_leech_utils.gdrive_utils.helper import GoogleDriveHelper
 
 LOGGER = getLogger(__name__)
@@ -9,6 +10,7 @@ LOGGER = getLogger(__name__)
 class GoogleDriveCount(GoogleDriveHelper):
     def __init__(self):
         super().__init__()
+        self.file_version = ""
 
     def count(self, link, user_id):
         try:
@@ -39,6 +41,8 @@ class GoogleDriveCount(GoogleDriveHelper):
                 msg = "File not found."
             else:
                 msg = f"Error.\n{err}"
+        finally:
+            self.release_service_accounts()
         return msg, None, None, None, None
 
     def _proceed_count(self, file_id):
@@ -54,6 +58,8 @@ class GoogleDriveCount(GoogleDriveHelper):
                 mime_type = "File"
             self.total_files += 1
             self._gdrive_file(meta)
+            if Config.DOWNLOAD_CACHE_LIMIT:
+                self.file_version = self.get_file_version(file_id)
         return name, mime_type, self.proc_bytes, self.total_files, self.total_folders
 
     def _gdrive_file(self, filee):
@@ -61,20 +67,10 @@ class GoogleDriveCount(GoogleDriveHelper):
         self.proc_bytes += size
 
     def _gdrive_directory(self, drive_folder):
-        files = self.get_files_by_folder_id(drive_folder["id"])
-        if len(files) == 0:
-            return
-        for filee in files:
-            shortcut_details = filee.get("shortcutDetails")
-            if shortcut_details is not None:
-                mime_type = shortcut_details["targetMimeType"]
-                file_id = shortcut_details["targetId"]
-                filee = self.get_file_metadata(file_id)
-            else:
-                mime_type = filee.get("mimeType")
-            if mime_type == self.G_DRIVE_DIR_MIME_TYPE:
-                self.total_folders += 1
-                self._gdrive_directory(filee)
-            else:
-                self.total_files += 1
-                self._gdrive_file(filee)
+        for _, files in self.walk_folder(drive_folder["id"]):
+            for filee in files:
+                if filee.get("mimeType") == self.G_DRIVE_DIR_MIME_TYPE:
+                    self.total_folders += 1
+                else:
+                    self.total_files += 1
+                    self._gdrive_file(filee)
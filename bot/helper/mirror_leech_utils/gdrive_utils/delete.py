@@ -21,6 +21,7 @@ class GoogleDriveDelete(GoogleDriveHelper):
             self.service.files().delete(
                 fileId=file_id, supportsAllDrives=True
             ).execute()
+            self.invalidate_cache(file_id, children=True)
             msg = "Successfully deleted"
             LOGGER.info(f"Delete Result: {msg}")
         except HttpError as err:
@@ -35,4 +36,5 @@ class GoogleDriveDelete(GoogleDriveHelper):
                 err = "File not found or insufficientFilePermissions!"
             LOGGER.error(f"Delete Result: {err}")
             msg = str(err)
+        self.release_service_accounts()
         return msg
@@ -1,8 +1,21 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from googleapiclient.errors import HttpError
 from googleapiclient.http import MediaIoBaseDownload
 from io import FileIO
 from logging import getLogger
-from os import makedirs, path as ospath
+from math import ceil
+from os import (
+    O_CREAT,
+    O_TRUNC,
+    O_WRONLY,
+    close,
+    ftruncate,
+    makedirs,
+    open as osopen,
+    path as ospath,
+    pwrite,
+)
+from threading import local
 from tenacity import (
     retry,
     wait_exponential,
@@ -10,22 +23,40 @@ from tenacity import (
     retry_if_exception_type,
     RetryError,
 )
+from time import time
 
+from ....core.config_manager import Config
 from ...ext_utils.bot_utils import async_to_sync
 from ...ext_utils.bot_utils import SetInterval
-from ...mirror_leech_utils.gdrive_utils.helper import GoogleDriveHelper
+from ...mirror_leech_utils.gdrive_utils.helper import ChunkSizer, GoogleDriveHelper
 
 LOGGER = getLogger(__name__)
 
+RANGE_MIN_SIZE = 128 * 1024 * 1024
+RANGE_PART_SIZE = 64 * 1024 * 1024
+
 
 class GoogleDriveDownload(GoogleDriveHelper):
+    _worker_attrs = ("listener", "_path", "_start_time")
+
     def __init__(self, listener, path):
         self.listener = listener
         self._updater = None
         self._path = path
+        self._start_time = time()
         super().__init__()
         self.is_downloading = True
 
+    @property
+    def processed_bytes(self):
+        with self._progress_lock:
+            return self.proc_bytes + sum(
+                obj.file_processed_bytes for obj in [self, *self.workers]
+            )
+
+    async def progress(self):
+        self.total_time = int(time() - self._start_time)
+
     def download(self):
         file_id = self.get_id_from_url(self.listener.link, self.listener.user_id)
         self.service = self.authorize()
@@ -33,11 +64,21 @@ class GoogleDriveDownload(GoogleDriveHelper):
         try:
             meta = self.get_file_metadata(file_id)
             if meta.get("mimeType") == self.G_DRIVE_DIR_MIME_TYPE:
-                self._download_folder(file_id, self._path, self.listener.name)
+                files = []
+                self._download_folder(file_id, self._path, self.listener.name, files)
+                self._download_files(files)
             else:
                 makedirs(self._path, exist_ok=True)
-                self._download_file(
-                    file_id, self._path, self.listener.name, meta.get("mimeType")
+                self._download_files(
+                    [
+                        (
+                            file_id,
+                            self._path,
+                            self.listener.name,
+                            meta.get("mimeType"),
+                            int(meta.get("size", 0)),
+                        )
+                    ]
                 )
         except Exception as err:
             if isinstance(err, RetryError):
@@ -58,40 +99,177 @@ class GoogleDriveDownload(GoogleDriveHelper):
             self.listener.is_cancelled = True
         finally:
             self._updater.cancel()
+            self.release_service_accounts()
             if self.listener.is_cancelled:
                 return
             async_to_sync(self.listener.on_download_complete)
             return
 
-    def _download_folder(self, folder_id, path, folder_name):
-        folder_name = folder_name.replace("/", "")
-        if not ospath.exists(f"{path}/{folder_name}"):
-            makedirs(f"{path}/{folder_name}")
-        path += f"/{folder_name}"
-        result = self.get_files_by_folder_id(folder_id)
-        if len(result) == 0:
-            return
-        result = sorted(result, key=lambda k: k["name"])
-        for item in result:
-            file_id = item["id"]
-            filename = item["name"]
-            shortcut_details = item.get("shortcutDetails")
-            if shortcut_details is not None:
-                file_id = shortcut_details["targetId"]
-                mime_type = shortcut_details["targetMimeType"]
-            else:
+    def _download_folder(self, folder_id, path, folder_name, files):
+        paths = {folder_id: f"{path}/{folder_name.replace('/', '')}"}
+        makedirs(paths[folder_id], exist_ok=True)
+        for parent_id, items in self.walk_folder(folder_id):
+            path = paths.pop(parent_id)
+            for item in sorted(items, key=lambda k: k["name"]):
+                filename = item["name"]
                 mime_type = item.get("mimeType")
-            if mime_type == self.G_DRIVE_DIR_MIME_TYPE:
-                self._download_folder(file_id, path, filename)
-            elif not ospath.isfile(
-                f"{path}{filename}"
-            ) and not filename.strip().lower().endswith(
-                tuple(self.listener.excluded_extensions)
-            ):
-                self._download_file(file_id, path, filename, mime_type)
+                if mime_type == self.G_DRIVE_DIR_MIME_TYPE:
+                    paths[item["id"]] = f"{path}/{filename.replace('/', '')}"
+                    makedirs(paths[item["id"]], exist_ok=True)
+                elif not ospath.isfile(
+                    ospath.join(path, filename)
+                ) and not filename.strip().lower().endswith(
+                    tuple(self.listener.excluded_extensions)
+                ):
+                    files.append(
+                        (
+                            item["id"],
+                            path,
+                            filename,
+                            mime_type,
+                            int(item.get("size", 0)),
+                        )
+                    )
             if self.listener.is_cancelled:
                 break
 
+    def _download_files(self, files):
+        thread_data = local()
+
+        def _worker():
+            if (worker := getattr(thread_data, "worker", None)) is None:
+                worker = thread_data.worker = self.add_worker()
+            return worker
+
+        def _download(*args):
+            return _worker()._download_file(*args)
+
+        def _download_range(*args):
+            return _worker()._download_range(*args)
+
+        workers = max(Config.GDRIVE_WORKERS, 1)
+        if workers == 1:
+            for file_id, path, filename, mime_type, _ in files:
+                if self.listener.is_cancelled:
+                    break
+                self.proc_bytes += (
+                    self._download_file(file_id, path, filename, mime_type) or 0
+                )
+            return
+        opened = {}
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = {}
+                try:
+                    for file_id, path, filename, mime_type, size in files:
+                        if self.listener.is_cancelled:
+                            break
+                        if size < RANGE_MIN_SIZE:
+                            futures[
+                                executor.submit(
+                                    _download, file_id, path, filename, mime_type
+                                )
+                            ] = None
+                            continue
+                        filename = self._get_file_name(filename)
+                        fd = osopen(
+                            f"{path}/{filename}", O_WRONLY | O_CREAT | O_TRUNC, 0o644
+                        )
+                        ftruncate(fd, size)
+                        parts = min(workers, size // RANGE_PART_SIZE)
+                        part_size = ceil(size / parts)
+                        opened[fd] = parts
+                        for start in range(0, size, part_size):
+                            end = min(start + part_size, size) - 1
+                            futures[
+                                executor.submit(
+                                    _download_range, file_id, fd, start, end
+                                )
+                            ] = fd
+                    for future in as_completed(futures):
+                        self.proc_bytes += future.result() or 0
+                        if (fd := futures[future]) is not None:
+                            opened[fd] -= 1
+                            if opened[fd] == 0:
+                                del opened[fd]
+                                close(fd)
+                except Exception:
+                    for future in futures:
+                        future.cancel()
+                    raise
+        finally:
+            for fd in opened:
+                close(fd)
+
+    def _get_file_name(self, filename, export=False):
+        filename = filename.replace("/", "")
+        if export:
+            filename = f"{filename}.pdf"
+        if len(filename.encode()) > 255:
+            ext = ospath.splitext(filename)[1]
+            filename = f"{filename[:245]}{ext}"
+
+            if self.listener.name.strip().endswith(ext):
+                self.listener.name = filename
+        return filename
+
+    @retry(
+        wait=wait_exponential(multiplier=2, min=3, max=6),
+        stop=stop_after_attempt(3),
+        retry=retry_if_exception_type(Exception),
+    )
+    def _download_range(self, file_id, fd, start, end):
+        offset = start
+        retries = 0
+        sizer = ChunkSizer()
+        self.file_processed_bytes = 0
+        while offset <= end:
+            if self.listener.is_cancelled:
+                self.file_processed_bytes = 0
+                return
+            if not (size := sizer.acquire(self.listener)):
+                continue
+            request = self.service.files().get_media(
+                fileId=file_id, supportsAllDrives=True, acknowledgeAbuse=True
+            )
+            request.headers["range"] = f"bytes={offset}-{min(offset + size - 1, end)}"
+            try:
+                content = request.execute()
+            except HttpError as err:
+                sizer.release(True)
+                LOGGER.error(err)
+                if err.resp.status in [500, 502, 503, 504, 429] and retries < 10:
+                    retries += 1
+                    continue
+                reason = self.get_error_reason(err)
+                if reason not in [
+                    "downloadQuotaExceeded",
+                    "dailyLimitExceeded",
+                ]:
+                    raise err
+                if not self.use_sa:
+                    LOGGER.error(f"Got: {reason}")
+                    raise err
+                if self.sa_count >= self.sa_number:
+                    LOGGER.info(
+                        f"Reached maximum number of service accounts switching, which is {self.sa_count}"
+                    )
+                    raise err
+                self.switch_service_account(reason)
+                LOGGER.info(f"Got: {reason}, Trying Again...")
+                continue
+            except Exception:
+                sizer.release(True)
+                raise
+            sizer.release()
+            if not content:
+                raise ValueError(f"Empty response for range {offset}-{end}")
+            pwrite(fd, content, offset)
+            offset += len(content)
+            self.file_processed_bytes = offset - start
+        self.file_processed_bytes = 0
+        return end - start + 1
+
     @retry(
         wait=wait_exponential(multiplier=2, min=3, max=6),
         stop=stop_after_attempt(3),
@@ -106,60 +284,66 @@ class GoogleDriveDownload(GoogleDriveHelper):
             request = self.service.files().get_media(
                 fileId=file_id, supportsAllDrives=True, acknowledgeAbuse=True
             )
-        filename = filename.replace("/", "")
-        if export:
-            filename = f"{filename}.pdf"
-        if len(filename.encode()) > 255:
-            ext = ospath.splitext(filename)[1]
-            filename = f"{filename[:245]}{ext}"
-
-            if self.listener.name.strip().endswith(ext):
-                self.listener.name = filename
+        filename = self._get_file_name(filename, export)
         if self.listener.is_cancelled:
             return
+        self.file_processed_bytes = 0
         fh = FileIO(f"{path}/{filename}", "wb")
-        downloader = MediaIoBaseDownload(fh, request, chunksize=100 * 1024 * 1024)
+        sizer = ChunkSizer()
+        downloader = MediaIoBaseDownload(fh, request, chunksize=sizer.size)
         done = False
         retries = 0
         while not done:
             if self.listener.is_cancelled:
                 fh.close()
-                break
+                self.file_processed_bytes = 0
+                return
+            if not (size := sizer.acquire(self.listener)):
+                continue
+            downloader._chunksize = size
             try:
-                self.status, done = downloader.next_chunk()
+                status, done = downloader.next_chunk()
+                self.file_processed_bytes = status.resumable_progress
             except HttpError as err:
+                sizer.release(True)
                 LOGGER.error(err)
                 if err.resp.status in [500, 502, 503, 504, 429] and retries < 10:
                     retries += 1
                     continue
-                if err.resp.get("content-type", "").startswith("application/json"):
-                    reason = (
-                        eval(err.content).get("error").get("errors")[0].get("reason")
-                    )
-                    if "fileNotDownloadable" in reason and "document" in mime_type:
-                        return self._download_file(
-                            file_id, path, filename, mime_type, True
+                reason = self.get_error_reason(err)
+                if not reason:
+                    raise err
+                if "fileNotDownloadable" in reason and "document" in mime_type:
+                    fh.close()
+                    return self._download_file(file_id, path, filename, mime_type, True)
+                if reason not in [
+                    "downloadQuotaExceeded",
+                    "dailyLimitExceeded",
+                ]:
+                    raise err
+                if self.use_sa:
+                    if self.sa_count >= self.sa_number:
+                        LOGGER.info(
+                            f"Reached maximum number of service accounts switching, which is {self.sa_count}"
                         )
-                    if reason not in [
-                        "downloadQuotaExceeded",
-                        "dailyLimitExceeded",
-                    ]:
                         raise err
-                    if self.use_sa:
-                        if self.sa_count >= self.sa_number:
-                            LOGGER.info(
-                                f"Reached maximum number of service accounts switching, which is {self.sa_count}"
-                            )
-                            raise err
-                        else:
-                            if self.listener.is_cancelled:
-                                return
-                            self.switch_service_account()
-                            LOGGER.info(f"Got: {reason}, Trying Again...")
-                            return self._download_file(
-                                file_id, path, filename, mime_type
-                            )
                     else:
-                        LOGGER.error(f"Got: {reason}")
-                        raise err
+                        if self.listener.is_cancelled:
+                            return
+                        fh.close()
+                        self.switch_service_account(reason)
+                        LOGGER.info(f"Got: {reason}, Trying Again...")
+                        return self._download_file(file_id, path, filename, mime_type)
+                else:
+                    LOGGER.error(f"Got: {reason}")
+                    raise err
+            except Exception:
+                sizer.release(True)
+                fh.close()
+                raise
+            else:
+                sizer.release()
+        fh.close()
+        processed = self.file_processed_bytes
         self.file_processed_bytes = 0
+        return processed
@@ -1,12 +1,17 @@
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from google.oauth2 import service_account
 from googleapiclient.discovery import build
 from google_auth_httplib2 import AuthorizedHttp
 from googleapiclient.http import build_http
+from json import loads
 from logging import getLogger, ERROR
-from os import path as ospath, listdir
+from math import ceil
+from os import path as ospath
 from pickle import load as pload
-from random import randrange
 from re import search as re_search
+from threading import Condition, Lock, local
+from time import time
 from urllib.parse import parse_qs, urlparse
 from tenacity import (
     retry,
@@ -17,12 +22,72 @@ from tenacity import (
 
 from ....core.config_manager import Config
 from ...ext_utils.links_utils import is_gdrive_id
+from ...ext_utils.service_accounts import sa_pool
 
 LOGGER = getLogger(__name__)
 getLogger("googleapiclient.discovery").setLevel(ERROR)
 
+FOLDERS_PER_QUERY = 50
+BATCH_LIMIT = 100
+CACHE_LIMIT = 5000
+CHUNK_ALIGN = 256 * 1024
+MIN_CHUNK_SIZE = 8 * 1024 * 1024
+MAX_CHUNK_SIZE = 256 * 1024 * 1024
+CHUNK_TARGET_TIME = 10
+CHUNK_WAIT_TIMEOUT = 60
+
+drive_cache = OrderedDict()
+drive_cache_lock = Lock()
+
+
+class ChunkSizer:
+    _cond = Condition()
+    _used = 0
+
+    def __init__(self, size=32 * 1024 * 1024):
+        self.size = size
+        self._reserved = 0
+        self._start = 0
+
+    def acquire(self, listener=None):
+        budget = max(Config.GDRIVE_CHUNK_MEMORY * 1024 * 1024, MIN_CHUNK_SIZE)
+        deadline = time() + CHUNK_WAIT_TIMEOUT
+        with ChunkSizer._cond:
+            while not ChunkSizer._cond.wait_for(
+                lambda: budget - ChunkSizer._used >= MIN_CHUNK_SIZE, timeout=1
+            ):
+                if listener is not None and listener.is_cancelled:
+                    return 0
+                if time() >= deadline:
+                    LOGGER.warning(
+                        "Timed out waiting for chunk memory, using the minimum chunk size"
+                    )
+                    break
+            size = min(self.size, budget - ChunkSizer._used)
+            size = max(size - size % CHUNK_ALIGN, MIN_CHUNK_SIZE)
+            ChunkSizer._used += size
+        self._reserved = size
+        self._start = time()
+        return size
+
+    def release(self, failed=False):
+        with ChunkSizer._cond:
+            ChunkSizer._used -= self._reserved
+            ChunkSizer._cond.notify_all()
+        elapsed = time() - self._start
+        if failed:
+            self.size //= 2
+        elif self._reserved and elapsed > 0:
+            target = self._reserved / elapsed * CHUNK_TARGET_TIME
+            self.size = int(min(max(target, self.size / 2), self.size * 2))
+        self.size = min(max(self.size, MIN_CHUNK_SIZE), MAX_CHUNK_SIZE)
+        self._reserved = 0
+
 
 class GoogleDriveHelper:
+    # task state shared with the workers of a subclass
+    _worker_attrs = ()
+
     def __init__(self):
         self._OAUTH_SCOPE = ["https://www.googleapis.com/auth/drive"]
         self.token_path = "token.pickle"
@@ -35,6 +100,7 @@ class GoogleDriveHelper:
         self.is_downloading = False
         self.is_cloning = False
         self.sa_index = 0
+        self.sa_name = ""
         self.sa_count = 1
         self.sa_number = 100
         self.alt_auth = False
@@ -47,11 +113,15 @@ class GoogleDriveHelper:
         self.status = None
         self.update_interval = 3
         self.use_sa = Config.USE_SERVICE_ACCOUNTS
+        self.workers = []
+        self._owner = self
+        self._sa_lock = Lock()
+        self._progress_lock = Lock()
 
     @property
     def speed(self):
         try:
-            return self.proc_bytes / self.total_time
+            return self.processed_bytes / self.total_time
         except:
             return 0
 
@@ -60,24 +130,31 @@ class GoogleDriveHelper:
         return self.proc_bytes
 
     async def progress(self):
-        if self.status is not None:
-            chunk_size = (
-                self.status.total_size * self.status.progress()
-                - self.file_processed_bytes
-            )
-            self.file_processed_bytes = self.status.total_size * self.status.progress()
-            self.proc_bytes += chunk_size
+        active = False
+        with self._progress_lock:
+            for obj in [self, *self.workers]:
+                if (status := obj.status) is not None:
+                    chunk_size = (
+                        status.total_size * status.progress() - obj.file_processed_bytes
+                    )
+                    obj.file_processed_bytes = status.total_size * status.progress()
+                    self.proc_bytes += chunk_size
+                    active = True
+        if active:
             self.total_time += self.update_interval
 
-    def authorize(self):
+    def authorize(self, exclude=()):
         credentials = None
         if self.use_sa:
-            json_files = listdir("accounts")
+            json_files = sa_pool.files()
             self.sa_number = len(json_files)
-            self.sa_index = randrange(self.sa_number)
-            LOGGER.info(f"Authorizing with {json_files[self.sa_index]} service account")
+            if self.sa_name:
+                sa_pool.release(self.sa_name)
+            self.sa_name = sa_pool.lease(exclude)
+            self.sa_index = json_files.index(self.sa_name)
+            LOGGER.info(f"Authorizing with {self.sa_name} service account")
             credentials = service_account.Credentials.from_service_account_file(
-                f"accounts/{json_files[self.sa_index]}", scopes=self._OAUTH_SCOPE
+                f"accounts/{self.sa_name}", scopes=self._OAUTH_SCOPE
             )
         elif ospath.exists(self.token_path):
             LOGGER.info(f"Authorize with {self.token_path}")
@@ -89,14 +166,95 @@ class GoogleDriveHelper:
         authorized_http.http.disable_ssl_certificate_validation = True
         return build("drive", "v3", http=authorized_http, cache_discovery=False)
 
-    def switch_service_account(self):
-        if self.sa_index == self.sa_number - 1:
-            self.sa_index = 0
-        else:
-            self.sa_index += 1
-        self.sa_count += 1
-        LOGGER.info(f"Switching to {self.sa_index} index")
-        self.service = self.authorize()
+    def switch_service_account(self, reason=""):
+        owner = self._owner
+        with owner._sa_lock:
+            owner.sa_count += 1
+            self.sa_count = owner.sa_count
+        if self.sa_name:
+            sa_pool.report_error(self.sa_name, reason)
+        self.service = self.authorize({self.sa_name})
+        LOGGER.info(f"Switched to {self.sa_name} service account")
+
+    def add_sa_usage(self, size):
+        if self.use_sa and self.sa_name:
+            sa_pool.add_usage(self.sa_name, size)
+
+    def release_service_accounts(self):
+        for obj in [self, *self.workers]:
+            if obj.sa_name:
+                sa_pool.release(obj.sa_name)
+                obj.sa_name = ""
+
+    def new_worker(self, index):
+        worker = object.__new__(type(self))
+        GoogleDriveHelper.__init__(worker)
+        for attr in (
+            "token_path",
+            "use_sa",
+            "sa_count",
+            "sa_number",
+            "alt_auth",
+            "is_uploading",
+            "is_downloading",
+            "is_cloning",
+            "_owner",
+            "_sa_lock",
+            "_progress_lock",
+            *self._worker_attrs,
+        ):
+            setattr(worker, attr, getattr(self, attr))
+        worker.service = worker.authorize()
+        return worker
+
+    def add_worker(self):
+        worker = self.new_worker(len(self.workers))
+        with self._progress_lock:
+            self.workers.append(worker)
+        return worker
+
+    def cache_key(self, kind, ids, *args):
+        return ("accounts" if self.use_sa else self.token_path, kind, ids, *args)
+
+    def get_cached(self, key):
+        with drive_cache_lock:
+            if (entry := drive_cache.get(key)) is None:
+                return None
+            if entry[0] < time():
+                del drive_cache[key]
+                return None
+            drive_cache.move_to_end(key)
+            return entry[1]
+
+    def set_cached(self, key, value):
+        if Config.GDRIVE_CACHE_TTL <= 0:
+            return
+        with drive_cache_lock:
+            drive_cache[key] = (time() + Config.GDRIVE_CACHE_TTL, value)
+            drive_cache.move_to_end(key)
+            while len(drive_cache) > CACHE_LIMIT:
+                drive_cache.popitem(last=False)
+
+    def invalidate_cache(self, *ids, children=False):
+        ids = set(ids)
+        with drive_cache_lock:
+            for key, (_, value) in list(drive_cache.items()):
+                if (
+                    key[1] in ["search", "drives"]
+                    or ids.intersection(key[2])
+                    or children
+                    and key[1] == "list"
+                    and any(file.get("id") in ids for file in value)
+                ):
+                    del drive_cache[key]
+
+    def get_error_reason(self, err):
+        if err.resp.get("content-type", "").startswith("application/json"):
+            try:
+                return loads(err.content)["error"]["errors"][0]["reason"]
+            except (ValueError, KeyError, IndexError):
+                pass
+        return ""
 
     def get_id_from_url(self, link, user_id=""):
         if user_id and link.startswith("mtp:"):
@@ -138,13 +296,33 @@ class GoogleDriveHelper:
             .execute()
         )
 
+    @retry(
+        wait=wait_exponential(multiplier=2, min=3, max=6),
+        stop=stop_after_attempt(3),
+        retry=retry_if_exception_type(Exception),
+    )
+    def get_file_version(self, file_id):
+        meta = (
+            self.service.files()
+            .get(
+                fileId=file_id,
+                supportsAllDrives=True,
+                fields="md5Checksum, modifiedTime",
+            )
+            .execute()
+        )
+        return meta.get("md5Checksum") or meta.get("modifiedTime", "")
+
     @retry(
         wait=wait_exponential(multiplier=2, min=3, max=6),
         stop=stop_after_attempt(3),
         retry=retry_if_exception_type(Exception),
     )
     def get_file_metadata(self, file_id):
-        return (
+        key = self.cache_key("meta", (file_id,))
+        if (meta := self.get_cached(key)) is not None:
+            return meta
+        meta = (
             self.service.files()
             .get(
                 fileId=file_id,
@@ -153,6 +331,8 @@ class GoogleDriveHelper:
             )
             .execute()
         )
+        self.set_cached(key, meta)
+        return meta
 
     @retry(
         wait=wait_exponential(multiplier=2, min=3, max=6),
@@ -160,6 +340,9 @@ class GoogleDriveHelper:
         retry=retry_if_exception_type(Exception),
     )
     def get_files_by_folder_id(self, folder_id, item_type=""):
+        key = self.cache_key("list", (folder_id,), item_type, "single")
+        if (files := self.get_cached(key)) is not None:
+            return list(files)
         page_token = None
         files = []
         if not item_type:
@@ -187,8 +370,121 @@ class GoogleDriveHelper:
             page_token = response.get("nextPageToken")
             if page_token is None:
                 break
+        self.set_cached(key, list(files))
+        return files
+
+    @retry(
+        wait=wait_exponential(multiplier=2, min=3, max=6),
+        stop=stop_after_attempt(3),
+        retry=retry_if_exception_type(Exception),
+    )
+    def get_files_by_folder_ids(self, folder_ids, item_type=""):
+        key = self.cache_key("list", tuple(folder_ids), item_type)
+        if (files := self.get_cached(key)) is not None:
+            return list(files)
+        parents = " or ".join(f"'{folder_id}' in parents" for folder_id in folder_ids)
+        q = f"({parents}) and trashed = false"
+        if item_type == "folders":
+            q += f" and mimeType = '{self.G_DRIVE_DIR_MIME_TYPE}'"
+        elif item_type:
+            q += f" and mimeType != '{self.G_DRIVE_DIR_MIME_TYPE}'"
+        page_token = None
+        files = []
+        while True:
+            response = (
+                self.service.files()
+                .list(
+                    supportsAllDrives=True,
+                    includeItemsFromAllDrives=True,
+                    q=q,
+                    spaces="drive",
+                    pageSize=1000,
+                    fields="nextPageToken, files(id, name, mimeType, size, shortcutDetails, parents)",
+                    orderBy="folder, name",
+                    pageToken=page_token,
+                )
+                .execute()
+            )
+            files.extend(response.get("files", []))
+            page_token = response.get("nextPageToken")
+            if page_token is None:
+                break
+        self.set_cached(key, list(files))
         return files
 
+    def resolve_shortcuts(self, files):
+        targets = {}
+        for index, file in enumerate(files):
+            if (shortcut_details := file.get("shortcutDetails")) is None:
+                continue
+            target_id = shortcut_details["targetId"]
+            files[index] = {
+                "id": target_id,
+                "name": file["name"],
+                "mimeType": shortcut_details["targetMimeType"],
+                "parents": file.get("parents", []),
+            }
+            if shortcut_details["targetMimeType"] != self.G_DRIVE_DIR_MIME_TYPE:
+                targets.setdefault(target_id, []).append(index)
+
+        def _callback(request_id, response, exception):
+            if exception is not None:
+                LOGGER.error(f"Failed to resolve shortcut {request_id}: {exception}")
+                return
+            for index in targets[request_id]:
+                files[index].update(
+                    {key: value for key, value in response.items() if key != "name"}
+                )
+
+        target_ids = list(targets)
+        for i in range(0, len(target_ids), BATCH_LIMIT):
+            batch = self.service.new_batch_http_request(callback=_callback)
+            for target_id in target_ids[i : i + BATCH_LIMIT]:
+                batch.add(
+                    self.service.files().get(
+                        fileId=target_id,
+                        supportsAllDrives=True,
+                        fields="id, mimeType, size",
+                    ),
+                    request_id=target_id,
+                )
+            batch.execute()
+        return files
+
+    def walk_folder(self, folder_id, resolve_shortcuts=True):
+        thread_data = local()
+
+        def _list(folder_ids):
+            if (worker := getattr(thread_data, "worker", None)) is None:
+                worker = thread_data.worker = self.add_worker()
+            files = worker.get_files_by_folder_ids(folder_ids)
+            if resolve_shortcuts:
+                worker.resolve_shortcuts(files)
+            return folder_ids, files
+
+        workers = max(Config.GDRIVE_WORKERS, 1)
+        visited = {folder_id}
+        level = [folder_id]
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            while level:
+                size = min(FOLDERS_PER_QUERY, ceil(len(level) / workers))
+                chunks = [level[i : i + size] for i in range(0, len(level), size)]
+                level = []
+                for folder_ids, files in executor.map(_list, chunks):
+                    children = {parent_id: [] for parent_id in folder_ids}
+                    for file in files:
+                        for parent_id in file.get("parents", []):
+                            if parent_id in children:
+                                children[parent_id].append(file)
+                        if (
+                            file.get("mimeType") == self.G_DRIVE_DIR_MIME_TYPE
+                            and file["id"] not in visited
+                        ):
+                            visited.add(file["id"])
+                            level.append(file["id"])
+                    for parent_id in folder_ids:
+                        yield parent_id, children[parent_id]
+
     @retry(
         wait=wait_exponential(multiplier=2, min=3, max=6),
         stop=stop_after_attempt(3),
@@ -208,6 +504,7 @@ class GoogleDriveHelper:
             .execute()
         )
         file_id = file.get("id")
+        self.invalidate_cache(dest_id)
         if not Config.IS_TEAM_DRIVE:
             self.set_permission(file_id)
         LOGGER.info(f'Created G-Drive Folder:\nName: {file.get("name")}\nID: {file_id}')
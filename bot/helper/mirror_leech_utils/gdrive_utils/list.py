@@ -227,7 +227,9 @@ class GoogleDriveList(GoogleDriveHelper):
         elif itype:
             self.item_type = itype
         try:
-            files = self.get_files_by_folder_id(self.id, self.item_type)
+            files = self.resolve_shortcuts(
+                self.get_files_by_folder_ids([self.id], self.item_type)
+            )
             if self.listener.is_cancelled:
                 return
         except Exception as err:
@@ -248,8 +250,11 @@ class GoogleDriveList(GoogleDriveHelper):
 
     async def list_drives(self):
         self.service = self.authorize()
+        key = self.cache_key("drives", ())
         try:
-            result = self.service.drives().list(pageSize="100").execute()
+            if (result := self.get_cached(key)) is None:
+                result = self.service.drives().list(pageSize="100").execute()
+                self.set_cached(key, result)
         except Exception as e:
             self.id = str(e)
             self.event.set()
@@ -365,6 +370,7 @@ class GoogleDriveList(GoogleDriveHelper):
             self.use_sa = self.token_path == "accounts"
             await self.list_drives()
         await self._event_handler()
+        self.release_service_accounts()
         if self._reply_to:
             await delete_message(self._reply_to)
         if not self.listener.is_cancelled:
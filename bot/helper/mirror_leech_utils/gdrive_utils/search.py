@@ -1,11 +1,16 @@
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
 from logging import getLogger
+from time import time
 
 from .... import drives_names, drives_ids, index_urls, user_data
+from ....core.config_manager import Config
 from ....helper.ext_utils.status_utils import get_readable_file_size
 from ....helper.mirror_leech_utils.gdrive_utils.helper import GoogleDriveHelper
 
 LOGGER = getLogger(__name__)
 
+SEARCH_WORKERS = 10
+
 
 class GoogleDriveSearch(GoogleDriveHelper):
 
@@ -91,7 +96,66 @@ class GoogleDriveSearch(GoogleDriveHelper):
         except Exception as err:
             err = str(err).replace(">", "").replace("<", "")
             LOGGER.error(err)
-            return {"files": []}
+            return None
+
+    def _search_drive(self, dir_id, file_name):
+        is_recursive = (
+            False if self._is_recursive and len(dir_id) > 23 else self._is_recursive
+        )
+        key = self.cache_key(
+            "search",
+            (dir_id,),
+            file_name,
+            is_recursive,
+            self._stop_dup,
+            self._item_type,
+        )
+        if (response := self.get_cached(key)) is None:
+            response = self._drive_query(dir_id, file_name, is_recursive)
+            if response is None:
+                return {"files": []}
+            self.set_cached(key, response)
+        return response
+
+    def _search_drives(self, file_name, dir_ids):
+        if not dir_ids:
+            return []
+        if len(dir_ids) == 1:
+            self.service = self.authorize()
+            try:
+                return [self._search_drive(dir_ids[0], file_name)]
+            finally:
+                self.release_service_accounts()
+
+        def _search(index, dir_id):
+            worker = self.new_worker(index)
+            try:
+                return worker._search_drive(dir_id, file_name)
+            finally:
+                worker.release_service_accounts()
+
+        timeout = Config.GDRIVE_SEARCH_TIMEOUT
+        deadline = time() + timeout
+        responses = []
+        executor = ThreadPoolExecutor(max_workers=min(len(dir_ids), SEARCH_WORKERS))
+        try:
+            futures = [
+                executor.submit(_search, index, dir_id)
+                for index, dir_id in enumerate(dir_ids)
+            ]
+            for dir_id, future in zip(dir_ids, futures):
+                try:
+                    responses.append(
+                        future.result(
+                            timeout=max(deadline - time(), 0) if timeout > 0 else None
+                        )
+                    )
+                except TimeoutError:
+                    LOGGER.warning(f"Search timed out for drive: {dir_id}")
+                    responses.append({"files": []})
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+        return responses
 
     def drive_list(self, file_name, target_id="", user_id=""):
         msg = ""
@@ -119,13 +183,12 @@ class GoogleDriveSearch(GoogleDriveHelper):
         ):
             self.use_sa = False
 
-        self.service = self.authorize()
+        drives = list(drives)
+        if self._no_multi:
+            drives = drives[:1]
+        responses = self._search_drives(file_name, [drive[1] for drive in drives])
 
-        for drive_name, dir_id, index_url in drives:
-            isRecur = (
-                False if self._is_recursive and len(dir_id) > 23 else self._is_recursive
-            )
-            response = self._drive_query(dir_id, file_name, isRecur)
+        for (drive_name, dir_id, index_url), response in zip(drives, responses):
             if not response["files"]:
                 if self._no_multi:
                     break
@@ -1,7 +1,10 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from googleapiclient.errors import HttpError
 from googleapiclient.http import MediaFileUpload
+from json import loads
 from logging import getLogger
 from os import path as ospath, listdir, remove
+from threading import local
 from tenacity import (
     retry,
     wait_exponential,
@@ -9,21 +12,30 @@ from tenacity import (
     retry_if_exception_type,
     RetryError,
 )
+from time import time
 
 from ....core.config_manager import Config
 from ...ext_utils.bot_utils import async_to_sync, SetInterval
+from ...ext_utils.db_handler import database
 from ...ext_utils.files_utils import get_mime_type
-from ...mirror_leech_utils.gdrive_utils.helper import GoogleDriveHelper
+from ...mirror_leech_utils.gdrive_utils.helper import ChunkSizer, GoogleDriveHelper
 
 LOGGER = getLogger(__name__)
 
+SESSION_MIN_SIZE = 100 * 1024 * 1024
+SESSION_LIFETIME = 6 * 24 * 3600
+
 
 class GoogleDriveUpload(GoogleDriveHelper):
+    _worker_attrs = ("listener", "_path", "_job", "_entries")
+
     def __init__(self, listener, path):
         self.listener = listener
         self._updater = None
         self._path = path
         self._is_errored = False
+        self._job = ""
+        self._entries = {}
         super().__init__()
         self.is_uploading = True
 
@@ -39,9 +51,73 @@ class GoogleDriveUpload(GoogleDriveHelper):
             self.listener.up_dest = self.listener.up_dest.replace("sa:", "", 1)
             self.use_sa = True
 
+    def _get_job(self):
+        source = (
+            self.listener.cache_key
+            or self.listener.link
+            or (self.listener.message.reply_to_message or self.listener.message).link
+        )
+        return f"{self.listener.up_dest}|{source}|{self.listener.name}"
+
+    def _load_job(self):
+        rows = async_to_sync(database.get_upload_job, self._job)
+        entries = {(row["kind"], row["rel"]): row["id"] for row in rows}
+        try:
+            if rows and time() - min(row["time"] for row in rows) > SESSION_LIFETIME:
+                raise ValueError("Upload job expired")
+            if top := entries.get(("dir", "")):
+                meta = (
+                    self.service.files()
+                    .get(fileId=top, fields="trashed", supportsAllDrives=True)
+                    .execute()
+                )
+                if meta.get("trashed"):
+                    raise ValueError("Upload folder trashed")
+        except Exception as e:
+            LOGGER.info(f"Starting a new upload job for {self._job}: {e}")
+            async_to_sync(database.rm_upload_job, self._job)
+            return {}
+        if entries:
+            LOGGER.info(f"Resuming upload job: {self._job}")
+        return entries
+
+    def _register_job(self):
+        self._job = self._get_job()
+        self._entries = self._load_job()
+        if (
+            self.listener.is_super_chat
+            and Config.INCOMPLETE_TASK_NOTIFIER
+            and self.listener.mid == self.listener.message.id
+            and not self.listener.is_ytdlp
+        ):
+            async_to_sync(
+                database.set_task_upload,
+                self.listener.message.link,
+                self.listener.mid,
+                self._job,
+                {
+                    "is_qbit": self.listener.is_qbit,
+                    "is_jd": self.listener.is_jd,
+                    "is_nzb": self.listener.is_nzb,
+                },
+            )
+
+    def _record(self, kind, rel, id_):
+        if self._job:
+            async_to_sync(database.add_upload_job_entry, self._job, kind, rel, id_)
+
+    def _get_directory(self, rel, name, parent_id):
+        if dir_id := self._entries.get(("dir", rel)):
+            return dir_id
+        dir_id = self.create_directory(name, parent_id)
+        self._record("dir", rel, dir_id)
+        return dir_id
+
     def upload(self):
         self.user_setting()
         self.service = self.authorize()
+        if Config.DATABASE_URL:
+            self._register_job()
         LOGGER.info(f"Uploading: {self._path}")
         self._updater = SetInterval(self.update_interval, self.progress)
         try:
@@ -61,7 +137,8 @@ class GoogleDriveUpload(GoogleDriveHelper):
                 LOGGER.info(f"Uploaded To G-Drive: {self._path}")
             else:
                 mime_type = "Folder"
-                dir_id = self.create_directory(
+                dir_id = self._get_directory(
+                    "",
                     ospath.basename(ospath.abspath(self.listener.name)),
                     self.listener.up_dest,
                 )
@@ -82,6 +159,10 @@ class GoogleDriveUpload(GoogleDriveHelper):
             self._is_errored = True
         finally:
             self._updater.cancel()
+            self.invalidate_cache(self.listener.up_dest)
+            self.release_service_accounts()
+            if self._job and (self.listener.is_cancelled or not self._is_errored):
+                async_to_sync(database.rm_upload_job, self._job)
             if self.listener.is_cancelled and not self._is_errored:
                 if mime_type == "Folder" and dir_id:
                     LOGGER.info("Deleting uploaded data from Drive...")
@@ -102,32 +183,103 @@ class GoogleDriveUpload(GoogleDriveHelper):
             return
 
     def _upload_dir(self, input_directory, dest_id):
-        list_dirs = listdir(input_directory)
-        if len(list_dirs) == 0:
-            return dest_id
-        new_id = None
-        for item in list_dirs:
+        files = []
+        self._create_tree(input_directory, dest_id, files)
+        if self.listener.is_cancelled:
+            return None
+        self._upload_files(files)
+        if self.listener.is_cancelled:
+            return None
+        return dest_id
+
+    def _create_tree(self, input_directory, dest_id, files, rel=""):
+        for item in listdir(input_directory):
+            if self.listener.is_cancelled:
+                return
             current_file_name = ospath.join(input_directory, item)
+            item_rel = ospath.join(rel, item)
             if ospath.isdir(current_file_name):
-                current_dir_id = self.create_directory(item, dest_id)
-                new_id = self._upload_dir(current_file_name, current_dir_id)
+                current_dir_id = self._get_directory(item_rel, item, dest_id)
                 self.total_folders += 1
-            else:
-                mime_type = get_mime_type(current_file_name)
-                file_name = current_file_name.split("/")[-1]
-                self._upload_file(current_file_name, file_name, mime_type, dest_id)
+                self._create_tree(current_file_name, current_dir_id, files, item_rel)
+            elif ("done", item_rel) in self._entries:
                 self.total_files += 1
-                new_id = dest_id
+            else:
+                files.append((current_file_name, item, dest_id, item_rel))
+
+    def _upload_files(self, files):
+        thread_data = local()
+
+        def _upload(file_path, file_name, dest_id, rel):
             if self.listener.is_cancelled:
-                break
-        return new_id
+                return False
+            if (worker := getattr(thread_data, "worker", None)) is None:
+                worker = thread_data.worker = self.add_worker()
+            mime_type = get_mime_type(file_path)
+            worker._upload_file(file_path, file_name, mime_type, dest_id, rel=rel)
+            return True
+
+        workers = min(Config.GDRIVE_WORKERS, len(files))
+        if workers <= 1:
+            for file_path, file_name, dest_id, rel in files:
+                if self.listener.is_cancelled:
+                    break
+                mime_type = get_mime_type(file_path)
+                self._upload_file(file_path, file_name, mime_type, dest_id, rel=rel)
+                self.total_files += 1
+            return
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(_upload, *file_) for file_ in files]
+            try:
+                for future in as_completed(futures):
+                    if future.result():
+                        self.total_files += 1
+            except Exception:
+                for future in futures:
+                    future.cancel()
+                raise
+
+    def _resume_session(self, drive_file, session_key, file_size):
+        session = async_to_sync(database.get_upload_session, session_key)
+        if not session:
+            return None
+        if time() - session["time"] > SESSION_LIFETIME:
+            async_to_sync(database.rm_upload_session, session_key)
+            return None
+        try:
+            resp, content = drive_file.http.request(
+                session["uri"],
+                "PUT",
+                headers={
+                    "Content-Range": f"bytes */{file_size}",
+                    "Content-Length": "0",
+                },
+            )
+        except Exception as e:
+            LOGGER.error(f"Failed to query upload session: {e}")
+            return None
+        if resp.status in [200, 201]:
+            LOGGER.info(f"Upload session already completed: {session_key}")
+            return loads(content)
+        if resp.status != 308:
+            async_to_sync(database.rm_upload_session, session_key)
+            return None
+        drive_file.resumable_uri = session["uri"]
+        if committed := resp.get("range"):
+            drive_file.resumable_progress = int(committed.rsplit("-", 1)[1]) + 1
+        LOGGER.info(
+            f"Resuming upload session from {drive_file.resumable_progress} bytes: {session_key}"
+        )
+        return None
 
     @retry(
         wait=wait_exponential(multiplier=2, min=3, max=6),
         stop=stop_after_attempt(3),
         retry=retry_if_exception_type(Exception),
     )
-    def _upload_file(self, file_path, file_name, mime_type, dest_id, in_dir=True):
+    def _upload_file(
+        self, file_path, file_name, mime_type, dest_id, in_dir=True, rel=""
+    ):
         file_metadata = {
             "name": file_name,
             "description": "Uploaded by Mirror-leech-telegram-bot",
@@ -136,7 +288,8 @@ class GoogleDriveUpload(GoogleDriveHelper):
         if dest_id is not None:
             file_metadata["parents"] = [dest_id]
 
-        if ospath.getsize(file_path) == 0:
+        file_size = ospath.getsize(file_path)
+        if file_size == 0:
             media_body = MediaFileUpload(file_path, mimetype=mime_type, resumable=False)
             response = (
                 self.service.files()
@@ -154,19 +307,31 @@ class GoogleDriveUpload(GoogleDriveHelper):
                 .execute()
             )
             return self.G_DRIVE_BASE_DOWNLOAD_URL.format(drive_file.get("id"))
+        sizer = ChunkSizer()
         media_body = MediaFileUpload(
-            file_path, mimetype=mime_type, resumable=True, chunksize=100 * 1024 * 1024
+            file_path, mimetype=mime_type, resumable=True, chunksize=sizer.size
         )
 
         drive_file = self.service.files().create(
             body=file_metadata, media_body=media_body, supportsAllDrives=True
         )
+        session_key = saved_uri = ""
         response = None
+        if self._job and file_size >= SESSION_MIN_SIZE:
+            session_key = f"{self._job}|{rel or file_name}"
+            response = self._resume_session(drive_file, session_key, file_size)
+            saved_uri = drive_file.resumable_uri
         retries = 0
         while response is None and not self.listener.is_cancelled:
+            if not (size := sizer.acquire(self.listener)):
+                continue
+            media_body._chunksize = size
             try:
-                self.status, response = drive_file.next_chunk()
+                status, response = drive_file.next_chunk()
+                with self._progress_lock:
+                    self.status = status
             except HttpError as err:
+                sizer.release(True)
                 if err.resp.status in [500, 502, 503, 504, 429] and retries < 10:
                     retries += 1
                     continue
@@ -188,7 +353,7 @@ class GoogleDriveUpload(GoogleDriveHelper):
                         else:
                             if self.listener.is_cancelled:
                                 return
-                            self.switch_service_account()
+                            self.switch_service_account(reason)
                             LOGGER.info(f"Got: {reason}, Trying Again...")
                             return self._upload_file(
                                 file_path,
@@ -196,17 +361,44 @@ class GoogleDriveUpload(GoogleDriveHelper):
                                 mime_type,
                                 dest_id,
                                 in_dir,
+                                rel,
                             )
                     else:
                         LOGGER.error(f"Got: {reason}")
                         raise err
+            except Exception:
+                sizer.release(True)
+                raise
+            else:
+                sizer.release()
+                # the offset is asked from Drive on resume, so only a new
+                # session uri has to be stored
+                if (
+                    session_key
+                    and response is None
+                    and drive_file.resumable_uri != saved_uri
+                ):
+                    saved_uri = drive_file.resumable_uri
+                    async_to_sync(
+                        database.save_upload_session,
+                        session_key,
+                        self._job,
+                        saved_uri,
+                        drive_file.resumable_progress,
+                    )
+        if session_key:
+            async_to_sync(database.rm_upload_session, session_key)
         if self.listener.is_cancelled:
             return
+        if rel:
+            self._record("done", rel, response["id"])
         try:
             remove(file_path)
         except:
             pass
-        self.file_processed_bytes = 0
+        with self._progress_lock:
+            self.file_processed_bytes = 0
+        self.add_sa_usage(file_size)
         if not Config.IS_TEAM_DRIVE:
             self.set_permission(response["id"])
         if not in_dir:
@@ -1,6 +1,7 @@
 from aiofiles import open as aiopen
 from aiofiles.os import path as aiopath
-from asyncio import wait_for, Event, gather
+from asyncio import current_task, wait_for, Event, gather
+from collections import OrderedDict
 from configparser import RawConfigParser
 from functools import partial
 from json import loads
@@ -8,7 +9,7 @@ from pyrogram.filters import regex, user
 from pyrogram.handlers import CallbackQueryHandler
 from time import time
 
-from .... import LOGGER
+from .... import LOGGER, bot_loop
 from ....core.config_manager import Config
 from ...ext_utils.bot_utils import cmd_exec, update_user_ldata, new_task
 from ...ext_utils.db_handler import database
@@ -19,8 +20,91 @@ from ...telegram_helper.message_utils import (
     edit_message,
     delete_message,
 )
+from .rcd import rclone_rcd
 
 LIST_LIMIT = 6
+CACHE_LIMIT = 500
+PREFETCH_LIMIT = 3
+
+list_cache = OrderedDict()
+list_tasks = {}
+
+
+def _use_rcd(config_path):
+    return config_path == "rclone.conf" and rclone_rcd.running
+
+
+async def _fetch_listing(key):
+    config_path, remote, path = key
+    if _use_rcd(config_path):
+        try:
+            result = await rclone_rcd.list(
+                f"{remote}{path}", noModTime=True, noMimeType=True
+            )
+        except Exception as e:
+            result, err = None, str(e)
+    else:
+        cmd = [
+            "rclone",
+            "lsjson",
+            "--fast-list",
+            "--no-mimetype",
+            "--no-modtime",
+            "--config",
+            config_path,
+            f"{remote}{path}",
+        ]
+        res, err, code = await cmd_exec(cmd)
+        result = loads(res) if code == 0 else None
+    if result is None:
+        return None, err
+    if list_tasks.get(key) is current_task() and Config.RCLONE_CACHE_TTL > 0:
+        list_cache[key] = (time() + Config.RCLONE_CACHE_TTL, result)
+        list_cache.move_to_end(key)
+        while len(list_cache) > CACHE_LIMIT:
+            list_cache.popitem(last=False)
+    return result, ""
+
+
+def _start_fetch(key):
+    if (task := list_tasks.get(key)) is None:
+        task = list_tasks[key] = bot_loop.create_task(_fetch_listing(key))
+        task.add_done_callback(
+            lambda t: list_tasks.pop(key) if list_tasks.get(key) is t else None
+        )
+    return task
+
+
+async def get_listing(config_path, remote, path):
+    key = (config_path, remote, path)
+    if (entry := list_cache.get(key)) is not None:
+        if entry[0] > time():
+            list_cache.move_to_end(key)
+            return entry[1], ""
+        del list_cache[key]
+    return await _start_fetch(key)
+
+
+def prefetch_listing(config_path, remote, path):
+    # without rcd every prefetch would spawn its own rclone process
+    if Config.RCLONE_CACHE_TTL <= 0 or not _use_rcd(config_path):
+        return
+    key = (config_path, remote, path)
+    if key not in list_cache:
+        _start_fetch(key)
+
+
+def invalidate_listing(config_path, destination):
+    destination = destination.rstrip("/")
+    remote, path = destination.split(":", 1)
+    parent = f"{remote}:{path.rsplit('/', 1)[0] if '/' in path else ''}"
+    for cache in [list_cache, list_tasks]:
+        for key in list(cache):
+            fs = f"{key[1]}{key[2]}".rstrip("/")
+            if key[0] == config_path and (
+                fs in [parent, destination] or fs.startswith(f"{destination}/")
+            ):
+                del cache[key]
 
 
 @new_task
@@ -188,6 +272,7 @@ class RcloneList:
             self.iter_start = LIST_LIMIT * (pages - 1)
         page = (self.iter_start / LIST_LIMIT) + 1 if self.iter_start != 0 else 1
         buttons = ButtonMaker()
+        prefetched = 0
         for index, idict in enumerate(
             self.path_list[self.iter_start : LIST_LIMIT + self.iter_start]
         ):
@@ -203,6 +288,13 @@ class RcloneList:
                 ptype = "fi"
                 name = f"[{get_readable_file_size(idict['Size'])}] {name}"
             buttons.data_button(name, f"rcq pa {ptype} {orig_index}")
+            if idict["IsDir"] and prefetched < PREFETCH_LIMIT:
+                prefetched += 1
+                prefetch_listing(
+                    self.config_path,
+                    self.remote,
+                    f"{self.path}/{idict['Path']}" if self.path else idict["Path"],
+                )
         if items_no > LIST_LIMIT:
             for i in [1, 2, 4, 6, 10, 30, 50, 100]:
                 buttons.data_button(i, f"rcq ps {i}", position="header")
@@ -257,22 +349,12 @@ class RcloneList:
             self.item_type = "--dirs-only"
         elif itype:
             self.item_type = itype
-        cmd = [
-            "rclone",
-            "lsjson",
-            self.item_type,
-            "--fast-list",
-            "--no-mimetype",
-            "--no-modtime",
-            "--config",
-            self.config_path,
-            f"{self.remote}{self.path}",
-        ]
         if self.listener.is_cancelled:
             return
-        res, err, code = await cmd_exec(cmd)
-        if code in [0, -9]:
-            result = loads(res)
+        result, err = await get_listing(self.config_path, self.remote, self.path)
+        if result is not None:
+            is_dir = self.item_type == "--dirs-only"
+            result = [item for item in result if item["IsDir"] == is_dir]
             if (
                 len(result) == 0
                 and itype != self.item_type
@@ -0,0 +1,105 @@
+from aiofiles.os import path as aiopath
+from asyncio import create_subprocess_exec, sleep
+from httpx import AsyncClient
+from logging import getLogger
+from secrets import token_urlsafe
+
+from ...ext_utils.exceptions import RcloneRcException
+
+LOGGER = getLogger(__name__)
+
+RCD_ADDR = "127.0.0.1:5572"
+
+
+class RcloneDaemon:
+    def __init__(self):
+        self._proc = None
+        self._client = None
+
+    @property
+    def running(self):
+        return self._proc is not None and self._proc.returncode is None
+
+    async def boot(self):
+        if not await aiopath.exists("rclone.conf"):
+            await self.stop()
+        elif self.running:
+            try:
+                await self.rc("fscache/clear")
+            except Exception as e:
+                LOGGER.error(f"Rclone daemon: {e}")
+        else:
+            await self._start()
+
+    async def _start(self):
+        user, pswd = token_urlsafe(8), token_urlsafe(16)
+        cmd = [
+            "rclone",
+            "rcd",
+            "--config",
+            "rclone.conf",
+            "--rc-addr",
+            RCD_ADDR,
+            "--rc-user",
+            user,
+            "--rc-pass",
+            pswd,
+            "--rc-job-expire-duration",
+            "10m",
+        ]
+        self._proc = await create_subprocess_exec(*cmd)
+        self._client = AsyncClient(
+            base_url=f"http://{RCD_ADDR}", auth=(user, pswd), timeout=60
+        )
+        for _ in range(20):
+            try:
+                await self.rc("rc/noop")
+                LOGGER.info("Rclone daemon started")
+                return
+            except Exception:
+                if not self.running:
+                    break
+                await sleep(0.5)
+        LOGGER.error("Rclone daemon failed to start!")
+        await self.stop()
+
+    async def stop(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        if self.running:
+            try:
+                self._proc.kill()
+                await self._proc.wait()
+            except:
+                pass
+        self._proc = None
+
+    async def rc(self, command, **params):
+        if self._client is None:
+            raise RcloneRcException("Rclone daemon is not running!")
+        resp = await self._client.post(f"/{command}", json=params)
+        try:
+            data = resp.json()
+        except ValueError:
+            data = {"error": resp.text}
+        if resp.status_code != 200:
+            raise RcloneRcException(data.get("error") or resp.text)
+        return data
+
+    async def start_job(self, command, group, **params):
+        result = await self.rc(command, _async=True, _group=group, **params)
+        return result["jobid"]
+
+    async def stop_job(self, jobid):
+        try:
+            await self.rc("job/stop", jobid=jobid)
+        except Exception as e:
+            LOGGER.error(f"Rclone daemon: {e}")
+
+    async def list(self, fs, remote="", **opt):
+        result = await self.rc("operations/list", fs=fs, remote=remote, opt=opt)
+        return result["list"]
+
+
+rclone_rcd = RcloneDaemon()
@@ -1,11 +1,11 @@
 from aiofiles import open as aiopen
 from aiofiles.os import path as aiopath, makedirs, listdir
-from asyncio import create_subprocess_exec, gather, wait_for
+from asyncio import create_subprocess_exec, gather, sleep, wait_for
 from asyncio.subprocess import PIPE
 from configparser import RawConfigParser
 from json import loads
 from logging import getLogger
-from random import randrange
+from os import path as ospath
 from re import findall as re_findall
 
 from ....core.config_manager import Config
@@ -14,6 +14,10 @@ from ...ext_utils.files_utils import (
     get_mime_type,
     count_files_and_folders,
 )
+from ...ext_utils.service_accounts import DAILY_LIMIT_REASONS, sa_pool
+from ...ext_utils.status_utils import get_readable_file_size, get_readable_time
+from .list import invalidate_listing
+from .rcd import rclone_rcd
 
 LOGGER = getLogger(__name__)
 
@@ -22,6 +26,7 @@ class RcloneTransferHelper:
     def __init__(self, listener):
         self._listener = listener
         self._proc = None
+        self._jobid = None
         self._transferred_size = "0 B"
         self._eta = "-"
         self._percentage = "0%"
@@ -31,6 +36,7 @@ class RcloneTransferHelper:
         self._is_upload = False
         self._sa_count = 1
         self._sa_index = 0
+        self._sa_name = ""
         self._sa_number = 0
         self._use_service_accounts = Config.USE_SERVICE_ACCOUNTS
         self._rclone_select = False
@@ -80,13 +86,132 @@ class RcloneTransferHelper:
                     self._eta,
                 ) = data[0]
 
-    def _switch_service_account(self):
-        if self._sa_index == self._sa_number - 1:
-            self._sa_index = 0
-        else:
-            self._sa_index += 1
+    def _update_stats(self, stats):
+        transferred, size = stats.get("bytes", 0), stats.get("totalBytes", 0)
+        self._transferred_size = get_readable_file_size(transferred)
+        self._size = get_readable_file_size(size)
+        self._percentage = f"{transferred / size * 100:.2f}%" if size else "0%"
+        self._speed = f"{get_readable_file_size(stats.get('speed', 0))}/s"
+        self._eta = get_readable_time(eta) if (eta := stats.get("eta")) else "-"
+
+    def _use_rcd(self, config_path):
+        return (
+            rclone_rcd.running
+            and config_path == "rclone.conf"
+            and not self._listener.rc_flags
+        )
+
+    def _get_rc_fs(self, remote, remote_type, path=""):
+        opts = ""
+        if remote_type == "drive":
+            opts += ",acknowledge_abuse=true"
+            if self._sa_name:
+                opts += f",service_account_file='accounts/{self._sa_name}'"
+        return f"{remote}{opts}:{path}"
+
+    def _get_rc_filter(self, path):
+        if path.startswith("rclone_select"):
+            self._rclone_select = True
+            return {"FilesFrom": [self._listener.link]}
+        elif self._listener.excluded_extensions:
+            ext = "*.{" + ",".join(self._listener.excluded_extensions) + "}"
+            return {"ExcludeRule": [ext], "IgnoreCase": True}
+        return {}
+
+    async def _rc_transfer(self, command, params, rc_filter, transfers=None):
+        group = f"mltb-{id(self)}"
+        config = {"LowLevelRetries": 1, "UseListR": True, "Metadata": True}
+        if transfers:
+            config["Transfers"] = transfers
+        try:
+            self._jobid = await rclone_rcd.start_job(
+                command, group, _config=config, _filter=rc_filter, **params
+            )
+            while True:
+                await sleep(2)
+                status, stats = await gather(
+                    rclone_rcd.rc("job/status", jobid=self._jobid),
+                    rclone_rcd.rc("core/stats", group=group),
+                )
+                self._update_stats(stats)
+                if status["finished"]:
+                    return status["success"], status["error"]
+        except Exception as e:
+            return False, str(e)
+        finally:
+            self._jobid = None
+            try:
+                await rclone_rcd.rc("core/stats-delete", group=group)
+            except:
+                pass
+
+    async def _rc_start(self, remote_type, rc_filter, transfers, get_params):
+        while True:
+            success, error = await self._rc_transfer(
+                *get_params(), rc_filter, transfers
+            )
+            if success or self._listener.is_cancelled:
+                return success, error
+            LOGGER.error(error)
+            if (
+                self._sa_name
+                and remote_type == "drive"
+                and ("RATE_LIMIT_EXCEEDED" in error or "rateLimitExceeded" in error)
+            ):
+                if self._sa_count < self._sa_number:
+                    self._switch_service_account(error)
+                    continue
+                LOGGER.info(
+                    f"Reached maximum number of service accounts switching, which is {self._sa_count}"
+                )
+            return False, error
+
+    async def _rc_public_link(self, destination):
+        remote, path = destination.split(":", 1)
+        try:
+            result = await rclone_rcd.rc(
+                "operations/publiclink", fs=f"{remote}:", remote=path
+            )
+            return result["url"]
+        except Exception as e:
+            LOGGER.error(f"while getting link. Path: {destination} | Error: {e}")
+            return ""
+
+    async def _can_use_sa(self, config_path, remote_type, remote_opts):
+        return (
+            remote_type == "drive"
+            and self._use_service_accounts
+            and config_path == "rclone.conf"
+            and await aiopath.isdir("accounts")
+            and not remote_opts.get("service_account_file")
+        )
+
+    def _lease_service_account(self, exclude=()):
+        sa_files = sa_pool.files()
+        self._sa_number = len(sa_files)
+        if self._sa_name:
+            sa_pool.release(self._sa_name)
+        self._sa_name = sa_pool.lease(exclude)
+        self._sa_index = sa_files.index(self._sa_name)
+        return f"sa{self._sa_index:03}"
+
+    def _release_service_account(self):
+        if self._sa_name:
+            sa_pool.release(self._sa_name)
+            self._sa_name = ""
+
+    def _switch_service_account(self, error):
+        reason = next(
+            (
+                reason
+                for reason in [*DAILY_LIMIT_REASONS, "userRateLimitExceeded"]
+                if reason in error
+            ),
+            "rateLimitExceeded",
+        )
+        sa_pool.report_error(self._sa_name, reason)
         self._sa_count += 1
-        remote = f"sa{self._sa_index:03}"
+        remote = self._lease_service_account({self._sa_name})
         LOGGER.info(f"Switching to {remote} remote")
         return remote
 
@@ -105,7 +230,7 @@ class RcloneTransferHelper:
             self._use_service_accounts = False
             return "rclone.conf"
 
-        files = await listdir("accounts")
+        files = [name for name in await listdir("accounts") if name.endswith(".json")]
         text = "".join(
             f"[sa{i:03}]\ntype = drive\nscope = drive\nservice_account_file = accounts/{sa}\n{option} = {gd_id}\n\n"
             for i, sa in enumerate(files)
@@ -138,7 +263,7 @@ class RcloneTransferHelper:
                 and self._use_service_accounts
             ):
                 if self._sa_count < self._sa_number:
-                    remote = self._switch_service_account()
+                    remote = self._switch_service_account(error)
                     cmd[6] = f"{remote}:{cmd[6].split(':', 1)[1]}"
                     if self._listener.is_cancelled:
                         return
@@ -160,19 +285,22 @@ class RcloneTransferHelper:
             return
         remote_type = remote_opts["type"]
 
-        if (
-            remote_type == "drive"
-            and self._use_service_accounts
-            and config_path == "rclone.conf"
-            and await aiopath.isdir("accounts")
-            and not remote_opts.get("service_account_file")
-        ):
+        if self._use_rcd(config_path):
+            if await self._can_use_sa(config_path, remote_type, remote_opts) and (
+                remote_opts.get("team_drive") or remote_opts.get("root_folder_id")
+            ):
+                self._lease_service_account()
+                LOGGER.info(f"Download with service account {self._sa_name}")
+            try:
+                await self._rc_download(remote, remote_type, path)
+            finally:
+                self._release_service_account()
+            return
+
+        if await self._can_use_sa(config_path, remote_type, remote_opts):
             config_path = await self._create_rc_sa(remote, remote_opts)
             if config_path != "rclone.conf":
-                sa_files = await listdir("accounts")
-                self._sa_number = len(sa_files)
-                self._sa_index = randrange(self._sa_number)
-                remote = f"sa{self._sa_index:03}"
+                remote = self._lease_service_account()
                 LOGGER.info(f"Download with service account {remote}")
 
         cmd = self._get_updated_command(
@@ -194,24 +322,80 @@ class RcloneTransferHelper:
                 )
             )
 
-        await self._start_download(cmd, remote_type)
+        try:
+            await self._start_download(cmd, remote_type)
+        finally:
+            self._release_service_account()
+
+    async def _rc_download(self, remote, remote_type, path):
+        link = self._listener.link
+        rc_filter = self._get_rc_filter(link)
+        if self._rclone_select:
+            link = ""
+        is_dir = True
+        if link:
+            try:
+                stat = await rclone_rcd.rc(
+                    "operations/stat",
+                    fs=self._get_rc_fs(remote, remote_type),
+                    remote=link,
+                )
+            except Exception as e:
+                await self._listener.on_download_error(str(e)[:4000])
+                return
+            if stat["item"] is None:
+                await self._listener.on_download_error(f"{remote}:{link} not found!")
+                return
+            is_dir = stat["item"]["IsDir"]
+
+        def get_params():
+            fs = self._get_rc_fs(remote, remote_type)
+            if is_dir:
+                return "sync/copy", {"srcFs": f"{fs}{link}", "dstFs": path}
+            return "operations/copyfile", {
+                "srcFs": fs,
+                "srcRemote": link,
+                "dstFs": path,
+                "dstRemote": ospath.basename(link),
+            }
+
+        success, error = await self._rc_start(
+            remote_type, rc_filter, 1 if remote_type == "drive" else None, get_params
+        )
+        if self._listener.is_cancelled:
+            return
+        if success:
+            await self._listener.on_download_complete()
+        else:
+            if not error and remote_type == "drive" and self._sa_name:
+                error = "Mostly your service accounts don't have access to this drive!"
+            await self._listener.on_download_error(error[:4000])
 
     async def _get_gdrive_link(self, config_path, destination, mime_type):
         epath = destination.rsplit("/", 1)[0] if mime_type == "Folder" else destination
-        cmd = [
-            "rclone",
-            "lsjson",
-            "--fast-list",
-            "--no-mimetype",
-            "--no-modtime",
-            "--config",
-            config_path,
-            epath,
-        ]
-        res, err, code = await cmd_exec(cmd)
+        if self._use_rcd(config_path):
+            try:
+                result = await rclone_rcd.list(epath, noModTime=True, noMimeType=True)
+                err, code = "", 0
+            except Exception as e:
+                err, code = str(e), 1
+        else:
+            res, err, code = await cmd_exec(
+                [
+                    "rclone",
+                    "lsjson",
+                    "--fast-list",
+                    "--no-mimetype",
+                    "--no-modtime",
+                    "--config",
+                    config_path,
+                    epath,
+                ]
+            )
+            if code == 0:
+                result = loads(res)
 
         if code == 0:
-            result = loads(res)
             fid = next(
                 (r["ID"] for r in result if r["Path"] == self._listener.name), "err"
             )
@@ -249,7 +433,7 @@ class RcloneTransferHelper:
                 and self._use_service_accounts
             ):
                 if self._sa_count < self._sa_number:
-                    remote = self._switch_service_account()
+                    remote = self._switch_service_account(error)
                     cmd[7] = f"{remote}:{cmd[7].split(':', 1)[1]}"
                     return (
                         False
@@ -290,21 +474,23 @@ class RcloneTransferHelper:
             return
         remote_type = remote_opts["type"]
 
+        if self._use_rcd(oconfig_path):
+            result = await self._rc_upload(
+                path, oremote, rc_path, remote_type, remote_opts, mime_type
+            )
+            if not result:
+                return
+            await self._upload_complete(
+                oconfig_path, oremote, rc_path, remote_type, mime_type, files, folders
+            )
+            return
+
         fremote = oremote
         fconfig_path = oconfig_path
-        if (
-            remote_type == "drive"
-            and self._use_service_accounts
-            and fconfig_path == "rclone.conf"
-            and await aiopath.isdir("accounts")
-            and not remote_opts.get("service_account_file")
-        ):
+        if await self._can_use_sa(fconfig_path, remote_type, remote_opts):
             fconfig_path = await self._create_rc_sa(oremote, remote_opts)
             if fconfig_path != "rclone.conf":
-                sa_files = await listdir("accounts")
-                self._sa_number = len(sa_files)
-                self._sa_index = randrange(self._sa_number)
-                fremote = f"sa{self._sa_index:03}"
+                fremote = self._lease_service_account()
                 LOGGER.info(f"Upload with service account {fremote}")
 
         cmd = self._get_updated_command(
@@ -322,19 +508,71 @@ class RcloneTransferHelper:
                 )
             )
 
-        result = await self._start_upload(cmd, remote_type)
+        try:
+            result = await self._start_upload(cmd, remote_type)
+            if result and self._sa_name:
+                sa_pool.add_usage(self._sa_name, self._listener.size)
+        finally:
+            self._release_service_account()
         if not result:
             return
+        await self._upload_complete(
+            oconfig_path, oremote, rc_path, remote_type, mime_type, files, folders
+        )
+
+    async def _rc_upload(
+        self, path, remote, rc_path, remote_type, remote_opts, mime_type
+    ):
+        if await self._can_use_sa("rclone.conf", remote_type, remote_opts) and (
+            remote_opts.get("team_drive") or remote_opts.get("root_folder_id")
+        ):
+            self._lease_service_account()
+            LOGGER.info(f"Upload with service account {self._sa_name}")
+
+        def get_params():
+            fs = self._get_rc_fs(remote, remote_type, rc_path)
+            if mime_type == "Folder":
+                return "sync/move", {
+                    "srcFs": f":local,copy_links=true:{path}",
+                    "dstFs": fs,
+                }
+            return "operations/movefile", {
+                "srcFs": f":local,copy_links=true:{ospath.dirname(path)}",
+                "srcRemote": ospath.basename(path),
+                "dstFs": fs,
+                "dstRemote": ospath.basename(path),
+            }
+
+        try:
+            result, error = await self._rc_start(
+                remote_type,
+                self._get_rc_filter(path),
+                1 if remote_type == "drive" else None,
+                get_params,
+            )
+            if result and self._sa_name:
+                sa_pool.add_usage(self._sa_name, self._listener.size)
+        finally:
+            self._release_service_account()
+        if not result and not self._listener.is_cancelled:
+            await self._listener.on_upload_error(error[:4000])
+        return result
 
+    async def _upload_complete(
+        self, oconfig_path, oremote, rc_path, remote_type, mime_type, files, folders
+    ):
         if mime_type == "Folder":
             destination = f"{oremote}:{rc_path}"
         elif rc_path:
             destination = f"{oremote}:{rc_path}/{self._listener.name}"
         else:
             destination = f"{oremote}:{self._listener.name}"
+        invalidate_listing(oconfig_path, destination)
 
         if remote_type == "drive":
             link = await self._get_gdrive_link(oconfig_path, destination, mime_type)
+        elif self._use_rcd(oconfig_path):
+            link = await self._rc_public_link(destination)
         else:
             cmd = [
                 "rclone",
@@ -356,7 +594,6 @@ class RcloneTransferHelper:
         await self._listener.on_upload_complete(
             link, files, folders, mime_type, destination
         )
-        return
 
     async def clone(self, config_path, src_remote, src_path, mime_type, method):
         destination = self._listener.up_dest
@@ -376,6 +613,44 @@ class RcloneTransferHelper:
             dst_remote_opt["type"],
         )
 
+        if self._use_rcd(config_path):
+
+            def get_params():
+                fs = self._get_rc_fs(src_remote, src_remote_type)
+                if mime_type == "Folder":
+                    return f"sync/{method}", {
+                        "srcFs": f"{fs}{src_path}",
+                        "dstFs": destination,
+                    }
+                return "operations/copyfile", {
+                    "srcFs": fs,
+                    "srcRemote": src_path,
+                    "dstFs": destination,
+                    "dstRemote": self._listener.name,
+                }
+
+            success, error = await self._rc_start(
+                src_remote_type,
+                self._get_rc_filter(src_path),
+                3 if src_remote_type == "drive" else None,
+                get_params,
+            )
+            if self._listener.is_cancelled:
+                return None, None
+            if not success:
+                await self._listener.on_upload_error(error[:4000])
+                return None, None
+            if mime_type != "Folder":
+                destination += (
+                    f"/{self._listener.name}" if dst_path else self._listener.name
+                )
+            invalidate_listing(config_path, destination)
+            if dst_remote_type == "drive":
+                link = await self._get_gdrive_link(config_path, destination, mime_type)
+            else:
+                link = await self._rc_public_link(destination) or None
+            return (None, None) if self._listener.is_cancelled else (link, destination)
+
         cmd = self._get_updated_command(
             config_path, f"{src_remote}:{src_path}", destination, method
         )
@@ -407,6 +682,7 @@ class RcloneTransferHelper:
                 destination += (
                     f"/{self._listener.name}" if dst_path else self._listener.name
                 )
+            invalidate_listing(config_path, destination)
             if dst_remote_type == "drive":
                 link = await self._get_gdrive_link(config_path, destination, mime_type)
                 return (
@@ -493,6 +769,8 @@ class RcloneTransferHelper:
 
     async def cancel_task(self):
         self._listener.is_cancelled = True
+        if self._jobid is not None:
+            await rclone_rcd.stop_job(self._jobid)
         if self._proc is not None:
             try:
                 self._proc.kill()
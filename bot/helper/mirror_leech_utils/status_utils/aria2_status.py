@@ -1,7 +1,7 @@
 from time import time
 
 from .... import LOGGER
-from ....core.torrent_manager import TorrentManager, aria2_name
+from ....core.torrent_manager import TorrentManager, aria2_name, STATUS_KEYS
 from ...ext_utils.status_utils import (
     MirrorStatus,
     get_readable_time,
@@ -11,7 +11,7 @@ from ...ext_utils.status_utils import (
 
 async def get_download(gid, old_info=None):
     try:
-        res = await TorrentManager.aria2.tellStatus(gid)
+        res = await TorrentManager.aria2.tellStatus(gid, STATUS_KEYS)
         return res or old_info
     except Exception as e:
         LOGGER.error(f"{e}: Aria2c, Error while getting torrent info")
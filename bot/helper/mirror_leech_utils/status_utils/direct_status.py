@@ -40,11 +40,9 @@ class DirectStatus:
         except:
             return "-"
 
-    def status(self):
-        if (
-            self._obj.download_task
-            and self._obj.download_task.get("status", "") == "waiting"
-        ):
+    async def status(self):
+        await self._obj.update()
+        if self._obj.queued:
             return MirrorStatus.STATUS_QUEUEDL
         return MirrorStatus.STATUS_DOWNLOAD
 
@@ -0,0 +1,57 @@
+from asyncio import iscoroutinefunction
+from secrets import token_urlsafe
+
+from .... import LOGGER, task_dict
+from ...ext_utils.status_utils import MirrorStatus
+
+
+class SharedStatus:
+    def __init__(self, listener, mid, waiters):
+        self.listener = listener
+        self._mid = mid
+        self._waiters = waiters
+        self._gid = token_urlsafe(10)
+        self.tool = "system"
+
+    def _owner(self):
+        return task_dict.get(self._mid)
+
+    def gid(self):
+        return self._gid
+
+    def name(self):
+        if not self.listener.name and (owner := self._owner()):
+            return owner.name()
+        return self.listener.name
+
+    def size(self):
+        return owner.size() if (owner := self._owner()) else "0B"
+
+    async def status(self):
+        if not (owner := self._owner()):
+            return MirrorStatus.STATUS_DOWNLOAD
+        if iscoroutinefunction(owner.status):
+            return await owner.status()
+        return owner.status()
+
+    def processed_bytes(self):
+        return owner.processed_bytes() if (owner := self._owner()) else "0B"
+
+    def progress(self):
+        return owner.progress() if (owner := self._owner()) else "0%"
+
+    def speed(self):
+        return owner.speed() if (owner := self._owner()) else "0B/s"
+
+    def eta(self):
+        return owner.eta() if (owner := self._owner()) else "-"
+
+    def task(self):
+        return self
+
+    async def cancel_task(self):
+        self.listener.is_cancelled = True
+        if self.listener in self._waiters:
+            self._waiters.remove(self.listener)
+        LOGGER.info(f"Cancelling Download: {self.listener.name}")
+        await self.listener.on_download_error("Download Cancelled by User!")
@@ -11,6 +11,7 @@ from aiofiles.os import (
     remove,
     path as aiopath,
     rename,
+    stat,
 )
 from pyrogram.types import (
     InputMediaVideo,
@@ -28,7 +29,12 @@ from tenacity import (
 from ...core.config_manager import Config
 from ...core.telegram_manager import TgClient
 from ..ext_utils.bot_utils import sync_to_async
-from ..ext_utils.files_utils import is_archive, get_base_name
+from ..ext_utils.db_handler import database
+from ..ext_utils.files_utils import (
+    is_archive,
+    get_base_name,
+    get_file_fingerprint,
+)
 from ..telegram_helper.message_utils import delete_message
 from ..ext_utils.media_utils import (
     get_media_info,
@@ -62,6 +68,7 @@ class TelegramUploader:
         self._sent_msg = None
         self._user_session = self._listener.user_transmission
         self._error = ""
+        self._cache_key = ""
 
     async def _upload_progress(self, current, _):
         if self._listener.is_cancelled:
@@ -117,7 +124,8 @@ class TelegramUploader:
                 return False
         elif self._user_session:
             self._sent_msg = await TgClient.user.get_messages(
-                chat_id=self._listener.message.chat.id, message_ids=self._listener.mid
+                chat_id=self._listener.message.chat.id,
+                message_ids=self._listener.message.id,
             )
             if self._sent_msg is None:
                 self._sent_msg = await TgClient.user.send_message(
@@ -214,6 +222,101 @@ class TelegramUploader:
                 self._msgs_dict[m.link] = m.caption
         self._sent_msg = msgs_list[-1]
 
+    async def _add_to_media_group(self, o_path):
+        if (
+            not self._listener.is_cancelled
+            and self._media_group
+            and (self._sent_msg.video or self._sent_msg.document)
+        ):
+            key = "documents" if self._sent_msg.document else "videos"
+            if match := re_match(r".+(?=\.0*\d+$)|.+(?=\.part\d+\..+$)", o_path):
+                pname = match.group(0)
+                if pname in self._media_dict[key].keys():
+                    self._media_dict[key][pname].append(
+                        [self._sent_msg.chat.id, self._sent_msg.id]
+                    )
+                else:
+                    self._media_dict[key][pname] = [
+                        [self._sent_msg.chat.id, self._sent_msg.id]
+                    ]
+                msgs = self._media_dict[key][pname]
+                if len(msgs) == 10:
+                    await self._send_media_group(pname, key, msgs)
+                else:
+                    self._last_msg_in_group = True
+
+    async def _send_from_cache(self, cap_mono, o_path):
+        self._cache_key = ""
+        if not Config.LEECH_CACHE_LIMIT or not Config.DATABASE_URL:
+            return False
+        try:
+            fingerprint = await sync_to_async(get_file_fingerprint, self._up_path)
+        except Exception as e:
+            LOGGER.error(f"Unable to get fingerprint of {self._up_path}. {e}")
+            return False
+        session = "user" if self._user_session else "bot"
+        mode = "doc" if self._listener.as_doc else "media"
+        thumb = self._thumb or ""
+        if thumb and thumb != "none":
+            # a missing thumbnail only drops its part of the key
+            try:
+                thumb_stat = await stat(thumb)
+                thumb = f"{thumb_stat.st_size}.{thumb_stat.st_mtime_ns}"
+            except OSError:
+                thumb = ""
+        layout = self._listener.thumbnail_layout or ""
+        self._cache_key = f"{session}-{mode}-{thumb}-{layout}-{fingerprint}"
+        if (cached := await database.get_leech_cache(self._cache_key)) is None:
+            return False
+        client = TgClient.user if self._user_session else self._listener.client
+        if self._listener.is_cancelled:
+            return False
+        try:
+            self._sent_msg = await client.send_cached_media(
+                chat_id=self._sent_msg.chat.id,
+                file_id=cached["file_id"],
+                caption=cap_mono,
+                reply_to_message_id=self._sent_msg.id,
+                disable_notification=True,
+            )
+        except Exception as e:
+            LOGGER.warning(f"Cached file_id failed: {e}. Trying to copy the message")
+            try:
+                self._sent_msg = await client.copy_message(
+                    chat_id=self._sent_msg.chat.id,
+                    from_chat_id=cached["chat_id"],
+                    message_id=cached["msg_id"],
+                    caption=cap_mono,
+                    reply_to_message_id=self._sent_msg.id,
+                    disable_notification=True,
+                )
+            except Exception as err:
+                LOGGER.warning(f"Leech cache entry removed: {err}")
+                await database.rm_leech_cache(self._cache_key)
+                return False
+        LOGGER.info(f"Sent from leech cache: {self._up_path}")
+        self._processed_bytes += await aiopath.getsize(self._up_path)
+        await self._add_to_media_group(o_path)
+        self._cache_key = ""
+        return True
+
+    async def _save_to_cache(self):
+        if not self._cache_key or self._is_corrupted:
+            return
+        media = (
+            self._sent_msg.document
+            or self._sent_msg.video
+            or self._sent_msg.audio
+            or self._sent_msg.photo
+        )
+        if media is not None:
+            await database.add_leech_cache(
+                self._cache_key,
+                self._sent_msg.chat.id,
+                self._sent_msg.id,
+                media.file_id,
+            )
+
     async def upload(self):
         await self._user_settings()
         res = await self._msg_to_reply()
@@ -268,7 +371,12 @@ class TelegramUploader:
                             )
                     self._last_msg_in_group = False
                     self._last_uploaded = 0
-                    await self._upload_file(cap_mono, file_, f_path)
+                    self._is_corrupted = False
+                    if not await self._send_from_cache(cap_mono, f_path):
+                        await self._upload_file(cap_mono, file_, f_path)
+                        if self._listener.is_cancelled:
+                            return
+                        await self._save_to_cache()
                     if self._listener.is_cancelled:
                         return
                     if (
@@ -432,27 +540,7 @@ class TelegramUploader:
                     progress=self._upload_progress,
                 )
 
-            if (
-                not self._listener.is_cancelled
-                and self._media_group
-                and (self._sent_msg.video or self._sent_msg.document)
-            ):
-                key = "documents" if self._sent_msg.document else "videos"
-                if match := re_match(r".+(?=\.0*\d+$)|.+(?=\.part\d+\..+$)", o_path):
-                    pname = match.group(0)
-                    if pname in self._media_dict[key].keys():
-                        self._media_dict[key][pname].append(
-                            [self._sent_msg.chat.id, self._sent_msg.id]
-                        )
-                    else:
-                        self._media_dict[key][pname] = [
-                            [self._sent_msg.chat.id, self._sent_msg.id]
-                        ]
-                    msgs = self._media_dict[key][pname]
-                    if len(msgs) == 10:
-                        await self._send_media_group(pname, key, msgs)
-                    else:
-                        self._last_msg_in_group = True
+            await self._add_to_media_group(o_path)
 
             if (
                 self._thumb is None
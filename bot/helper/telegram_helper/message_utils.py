@@ -10,6 +10,9 @@ from ..ext_utils.bot_utils import SetInterval
 from ..ext_utils.exceptions import TgLinkException
 from ..ext_utils.status_utils import get_readable_message
 
+TG_CACHE_TTL = 600
+tg_messages_cache = {}
+
 
 async def send_message(message, text, buttons=None, block=True):
     try:
@@ -107,9 +110,7 @@ async def delete_status():
                 LOGGER.error(str(e))
 
 
-async def get_tg_link_message(link):
-    message = None
-    links = []
+def _parse_tg_link(link):
     if link.startswith("https://t.me/"):
         private = False
         msg = re_match(
@@ -122,57 +123,103 @@ async def get_tg_link_message(link):
         )
         if not TgClient.user:
             raise TgLinkException("USER_SESSION_STRING required for this private link!")
-
+    if msg is None:
+        raise TgLinkException("Invalid telegram link!")
     chat = msg[1]
-    msg_id = msg[2]
+    if chat.isdigit():
+        chat = int(chat) if private else int(f"-100{chat}")
+    return chat, msg[2], private
+
+
+async def get_tg_messages(client, chat, msg_ids):
+    now = time()
+    for key, (_, added) in list(tg_messages_cache.items()):
+        if now - added > TG_CACHE_TTL:
+            del tg_messages_cache[key]
+    session = "user" if client is TgClient.user else "bot"
+    missing = [
+        msg_id
+        for msg_id in dict.fromkeys(msg_ids)
+        if (session, chat, msg_id) not in tg_messages_cache
+    ]
+    for i in range(0, len(missing), 200):
+        batch = missing[i : i + 200]
+        messages = await client.get_messages(chat_id=chat, message_ids=batch)
+        if not isinstance(messages, list):
+            messages = [messages]
+        for message in messages:
+            if message is not None:
+                tg_messages_cache[(session, chat, message.id)] = (message, now)
+    return [
+        tg_messages_cache.get((session, chat, msg_id), (None,))[0] for msg_id in msg_ids
+    ]
+
+
+async def prefetch_tg_links(links):
+    groups = {}
+    for link in links:
+        try:
+            chat, msg_id, private = _parse_tg_link(link)
+        except Exception:
+            continue
+        if msg_id.isdigit():
+            groups.setdefault((chat, private), []).append(int(msg_id))
+    for (chat, private), msg_ids in groups.items():
+        try:
+            await get_tg_messages(
+                TgClient.user if private else TgClient.bot, chat, msg_ids
+            )
+        except Exception as e:
+            LOGGER.warning(f"Unable to prefetch messages from {chat}. {e}")
+
+
+async def get_tg_link_message(link):
+    links = []
+    chat, msg_id, private = _parse_tg_link(link)
     if "-" in msg_id:
-        start_id, end_id = msg_id.split("-")
-        msg_id = start_id = int(start_id)
-        end_id = int(end_id)
-        btw = end_id - start_id
+        start_id, end_id = map(int, msg_id.split("-"))
+        msg_ids = list(range(start_id, end_id + 1))
         if private:
             link = link.split("&message_id=")[0]
-            links.append(f"{link}&message_id={start_id}")
-            for _ in range(btw):
-                start_id += 1
-                links.append(f"{link}&message_id={start_id}")
+            links = [f"{link}&message_id={i}" for i in msg_ids]
         else:
             link = link.rsplit("/", 1)[0]
-            links.append(f"{link}/{start_id}")
-            for _ in range(btw):
-                start_id += 1
-                links.append(f"{link}/{start_id}")
+            links = [f"{link}/{i}" for i in msg_ids]
     else:
-        msg_id = int(msg_id)
-
-    if chat.isdigit():
-        chat = int(chat) if private else int(f"-100{chat}")
+        msg_ids = [int(msg_id)]
 
     if not private:
         try:
-            message = await TgClient.bot.get_messages(chat_id=chat, message_ids=msg_id)
-            if message.empty:
+            messages = await get_tg_messages(TgClient.bot, chat, msg_ids)
+            if messages[0] is None or messages[0].empty:
                 private = True
         except Exception as e:
             private = True
             if not TgClient.user:
                 raise e
+        session = "bot"
 
-    if not private:
-        return (links, "bot") if links else (message, "bot")
-    elif TgClient.user:
+    if private:
+        if not TgClient.user:
+            raise TgLinkException("Private: Please report!")
         try:
-            user_message = await TgClient.user.get_messages(
-                chat_id=chat, message_ids=msg_id
-            )
+            messages = await get_tg_messages(TgClient.user, chat, msg_ids)
         except Exception as e:
             raise TgLinkException(
                 f"You don't have access to this chat!. ERROR: {e}"
             ) from e
-        if not user_message.empty:
-            return (links, "user") if links else (user_message, "user")
-    else:
-        raise TgLinkException("Private: Please report!")
+        if messages[0] is None or messages[0].empty:
+            return None
+        session = "user"
+
+    if links:
+        links = [
+            lnk
+            for lnk, message in zip(links, messages)
+            if message is not None and not message.empty
+        ]
+        return links, session
+    return messages[0], session
 
 
 async def temp_download(msg):
@@ -224,7 +271,7 @@ async def update_status_message(sid, force=False):
             status_dict[sid]["time"] = time()
 
 
-async def send_status_message(msg, user_id=0):
+async def send_status_message(msg, user_id=0, status="All"):
     if intervals["stopAll"]:
         return
     sid = user_id or msg.chat.id
@@ -232,7 +279,8 @@ async def send_status_message(msg, user_id=0):
     async with task_dict_lock:
         if sid in status_dict:
             page_no = status_dict[sid]["page_no"]
-            status = status_dict[sid]["status"]
+            if status == "All":
+                status = status_dict[sid]["status"]
             page_step = status_dict[sid]["page_step"]
             text, buttons = await get_readable_message(
                 sid, is_user, page_no, status, page_step
@@ -252,9 +300,11 @@ async def send_status_message(msg, user_id=0):
                 return
             await delete_message(old_message)
             message.text = text
-            status_dict[sid].update({"message": message, "time": time()})
+            status_dict[sid].update(
+                {"message": message, "time": time(), "status": status}
+            )
         else:
-            text, buttons = await get_readable_message(sid, is_user)
+            text, buttons = await get_readable_message(sid, is_user, status=status)
             if text is None:
                 return
             message = await send_message(msg, text, buttons, block=False)
@@ -269,7 +319,7 @@ async def send_status_message(msg, user_id=0):
                 "time": time(),
                 "page_no": 1,
                 "page_step": 1,
-                "status": "All",
+                "status": status,
                 "is_user": is_user,
             }
         if not intervals["status"].get(sid) and not is_user:
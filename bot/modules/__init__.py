@@ -22,6 +22,7 @@ from .mirror_leech import (
 from .restart import (
     restart_bot,
     restart_notification,
+    resume_uploads,
     confirm_restart,
 )
 from .rss import get_rss_menu, rss_listener
@@ -69,6 +70,7 @@ __all__ = [
     "nzb_mirror",
     "restart_bot",
     "restart_notification",
+    "resume_uploads",
     "confirm_restart",
     "get_rss_menu",
     "rss_listener",
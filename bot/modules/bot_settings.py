@@ -41,6 +41,7 @@ from ..core.startup import update_qb_options, update_nzb_options, update_variabl
 from ..helper.ext_utils.db_handler import database
 from ..core.jdownloader_booter import jdownloader
 from ..helper.ext_utils.task_manager import start_from_queued
+from ..helper.mirror_leech_utils.rclone_utils.rcd import rclone_rcd
 from ..helper.mirror_leech_utils.rclone_utils.serve import rclone_serve_booter
 from ..helper.telegram_helper.button_build import ButtonMaker
 from ..helper.telegram_helper.message_utils import (
@@ -63,6 +64,14 @@ DEFAULT_VALUES = {
     "SEARCH_LIMIT": 0,
     "UPSTREAM_BRANCH": "master",
     "DEFAULT_UPLOAD": "rc",
+    "DIRECT_WORKERS": 1,
+    "DOWNLOAD_CACHE_LIMIT": 0,
+    "GDRIVE_WORKERS": 1,
+    "GDRIVE_CACHE_TTL": 300,
+    "GDRIVE_SEARCH_TIMEOUT": 30,
+    "GDRIVE_CHUNK_MEMORY": 1024,
+    "RCLONE_CACHE_TTL": 300,
+    "LEECH_CACHE_LIMIT": 0,
 }
 
 
@@ -508,7 +517,7 @@ async def update_private_file(_, message, pre_message):
         else:
             await delete_message(message)
     if file_name == "rclone.conf":
-        await rclone_serve_booter()
+        await gather(rclone_serve_booter(), rclone_rcd.boot())
     await update_buttons(pre_message)
     await database.update_private_file(file_name)
 
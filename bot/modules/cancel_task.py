@@ -1,6 +1,6 @@
 from asyncio import sleep
 
-from .. import task_dict, task_dict_lock, user_data, multi_tags
+from .. import task_dict, task_dict_lock, seed_dict, user_data, multi_tags
 from ..core.config_manager import Config
 from ..helper.ext_utils.bot_utils import new_task
 from ..helper.ext_utils.status_utils import (
@@ -8,6 +8,7 @@ from ..helper.ext_utils.status_utils import (
     get_all_tasks,
     MirrorStatus,
 )
+from ..helper.listeners.seed_listener import stop_seed
 from ..helper.telegram_helper import button_build
 from ..helper.telegram_helper.bot_commands import BotCommands
 from ..helper.telegram_helper.filters import CustomFilters
@@ -19,6 +20,25 @@ from ..helper.telegram_helper.message_utils import (
 )
 
 
+def _can_cancel(user_id, owner_id):
+    return (
+        Config.OWNER_ID == user_id
+        or owner_id == user_id
+        or user_id in user_data
+        and user_data[user_id].get("SUDO")
+    )
+
+
+async def cancel_seed(message, user_id, gid):
+    if (entry := seed_dict.get(gid)) is None:
+        return False
+    if not _can_cancel(user_id, entry["user_id"]):
+        await send_message(message, "این وظیفه مال شما نیست!")
+    else:
+        await stop_seed(gid)
+    return True
+
+
 @new_task
 async def cancel(_, message, gid=None):
     user_id = message.from_user.id if message.from_user else message.sender_chat.id
@@ -28,23 +48,46 @@ async def cancel(_, message, gid=None):
     if gid:
         task = await get_task_by_gid(gid)
         if task is None:
-            await send_message(message, f"شناسه GID: <code>{gid}</code> پیدا نشد.")
+            if not await cancel_seed(message, user_id, gid):
+                await send_message(message, f"شناسه GID: <code>{gid}</code> پیدا نشد.")
             return
     elif len(msg) > 1:
         gid = msg[1]
         if len(gid) == 4:
-            multi_tags.discard(gid)
+            async with task_dict_lock:
+                tasks = [
+                    tk for tk in task_dict.values() if tk.listener.multi_tag == gid
+                ]
+            allowed = [tk for tk in tasks if _can_cancel(user_id, tk.listener.user_id)]
+            if len(allowed) < len(tasks):
+                await send_message(message, "این وظیفه مال شما نیست!")
+            else:
+                multi_tags.discard(gid)
+            for tk in allowed:
+                await tk.task().cancel_task()
             return
         else:
             task = await get_task_by_gid(gid)
             if task is None:
-                await send_message(message, f"شناسه GID: <code>{gid}</code> پیدا نشد.")
+                if not await cancel_seed(message, user_id, gid):
+                    await send_message(
+                        message, f"شناسه GID: <code>{gid}</code> پیدا نشد."
+                    )
                 return
     elif reply_to_id := message.reply_to_message_id:
         async with task_dict_lock:
             task = task_dict.get(reply_to_id)
         if task is None:
-            await send_message(message, "این یک وظیفه فعال نیست!")
+            gid = next(
+                (
+                    gid
+                    for gid, entry in seed_dict.items()
+                    if entry["message"].id == reply_to_id
+                ),
+                "",
+            )
+            if not await cancel_seed(message, user_id, gid):
+                await send_message(message, "این یک وظیفه فعال نیست!")
             return
     elif len(msg) == 1:
         msg = (
@@ -55,11 +98,7 @@ async def cancel(_, message, gid=None):
         return
 
     # بررسی دسترسی (فقط مالک، سودو یا صاحب تسک)
-    if (
-        Config.OWNER_ID != user_id
-        and task.listener.user_id != user_id
-        and (user_id not in user_data or not user_data[user_id].get("SUDO"))
-    ):
+    if not _can_cancel(user_id, task.listener.user_id):
         await send_message(message, "این وظیفه مال شما نیست!")
         return
 
@@ -85,13 +124,24 @@ async def cancel_multi(_, query):
 
 
 async def cancel_all(status, user_id):
-    matches = await get_all_tasks(status.strip(), user_id)
-    if not matches:
+    status = status.strip()
+    matches = await get_all_tasks(status, user_id)
+    if status in [MirrorStatus.STATUS_SEED, "All"]:
+        seeds = [
+            gid
+            for gid, entry in seed_dict.items()
+            if not user_id or entry["user_id"] == user_id
+        ]
+    else:
+        seeds = []
+    if not matches and not seeds:
         return False
     for task in matches:
         obj = task.task()
         await obj.cancel_task()
         await sleep(2)
+    for gid in seeds:
+        await stop_seed(gid)
     return True
 
 
@@ -139,7 +189,7 @@ def create_cancel_buttons(is_sudo, user_id=""):
 @new_task
 async def cancel_all_buttons(_, message):
     async with task_dict_lock:
-        count = len(task_dict)
+        count = len(task_dict) + len(seed_dict)
     if count == 0:
         await send_message(message, "هیچ وظیفه فعالی وجود ندارد!")
         return
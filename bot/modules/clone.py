@@ -65,7 +65,7 @@ class Clone(TaskListener):
 
         args = {
             "link": "",
-            "-i": 0,
+            "-i": self.multi,
             "-b": False,
             "-n": "",
             "-up": "",
@@ -4,11 +4,12 @@ from re import match as re_match
 
 from .. import LOGGER, bot_loop, task_dict_lock, DOWNLOAD_DIR
 from ..helper.ext_utils.bot_utils import (
-    get_content_type,
+    get_link_headers,
     sync_to_async,
     arg_parser,
     COMMAND_USAGE,
 )
+from ..helper.ext_utils.download_cache import get_url_cache_key
 from ..helper.ext_utils.exceptions import DirectDownloadLinkException
 from ..helper.ext_utils.links_utils import (
     is_url,
@@ -92,12 +93,13 @@ class Mirror(TaskListener):
             "-hl": False,
             "-bt": False,
             "-ut": False,
-            "-i": 0,
+            "-i": self.multi,
             "-sp": 0,
             "link": "",
             "-n": "",
             "-m": "",
             "-up": "",
+            "-ups": "",
             "-rcf": "",
             "-au": "",
             "-ap": "",
@@ -116,6 +118,7 @@ class Mirror(TaskListener):
         self.seed = args["-d"]
         self.name = args["-n"]
         self.up_dest = args["-up"]
+        self.extra_dests = args["-ups"]
         self.rc_flags = args["-rcf"]
         self.link = args["link"]
         self.compress = args["-z"]
@@ -151,7 +154,7 @@ class Mirror(TaskListener):
         seed_time = None
         reply_to = None
         file_ = None
-        session = ""
+        session = self.tg_session
 
         try:
             self.multi = int(args["-i"])
@@ -164,6 +167,7 @@ class Mirror(TaskListener):
             if len(dargs) == 2:
                 seed_time = dargs[1] or None
             self.seed = True
+            self.seed_ratio, self.seed_time = ratio, seed_time
 
         if not isinstance(is_bulk, bool):
             dargs = is_bulk.split(":")
@@ -225,30 +229,11 @@ class Mirror(TaskListener):
                 return
 
         if isinstance(reply_to, list):
-            self.bulk = reply_to
-            b_msg = input_list[:1]
-            self.options = " ".join(input_list[1:])
-            b_msg.append(f"{self.bulk[0]} -i {len(self.bulk)} {self.options}")
-            nextmsg = await send_message(self.message, " ".join(b_msg))
-            nextmsg = await self.client.get_messages(
-                chat_id=self.message.chat.id, message_ids=nextmsg.id
+            self.options = " ".join(x for x in input_list[1:] if x != self.link)
+            await self.run_bulk(
+                [await self._get_bulk_item(input_list[0], link) for link in reply_to],
+                Mirror,
             )
-            if self.message.from_user:
-                nextmsg.from_user = self.user
-            else:
-                nextmsg.sender_chat = self.user
-            await Mirror(
-                self.client,
-                nextmsg,
-                self.is_qbit,
-                self.is_leech,
-                self.is_jd,
-                self.is_nzb,
-                self.same_dir,
-                self.bulk,
-                self.multi_tag,
-                self.options,
-            ).new_event()
             return
 
         if reply_to:
@@ -316,7 +301,8 @@ class Mirror(TaskListener):
             and file_ is None
             and not is_gdrive_id(self.link)
         ):
-            content_type = await get_content_type(self.link)
+            link_headers = await get_link_headers(self.link) or {}
+            content_type = link_headers.get("Content-Type")
             if content_type is None or re_match(r"text/html|text/plain", content_type):
                 try:
                     self.link = await sync_to_async(direct_link_generator, self.link)
@@ -336,6 +322,8 @@ class Mirror(TaskListener):
                     await send_message(self.message, e)
                     await self.remove_from_same_dir()
                     return
+            else:
+                self.cache_key = get_url_cache_key(self.link, link_headers)
 
         if file_ is not None:
             await TelegramDownloadHelper(self).add_download(
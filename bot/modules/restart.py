@@ -5,6 +5,7 @@ from asyncio import gather, create_subprocess_exec
 from os import execl as osexecl
 
 from .. import intervals, scheduler, sabnzbd_client, LOGGER
+from .mirror_leech import Mirror
 from ..helper.ext_utils.bot_utils import new_task
 from ..helper.telegram_helper.message_utils import (
     send_message,
@@ -18,6 +19,8 @@ from ..core.config_manager import Config
 from ..core.jdownloader_booter import jdownloader
 from ..core.torrent_manager import TorrentManager
 
+resumable_uploads = []
+
 
 @new_task
 async def restart_bot(_, message):
@@ -57,6 +60,7 @@ async def restart_notification():
         chat_id, msg_id = 0, 0
 
     if Config.INCOMPLETE_TASK_NOTIFIER and Config.DATABASE_URL:
+        resumable_uploads.extend(await database.get_resumable_uploads())
         if notifier_dict := await database.get_incomplete_tasks():
             for cid, data in notifier_dict.items():
                 msg = "Restarted Successfully!" if cid == chat_id else "Bot Restarted!"
@@ -80,6 +84,22 @@ async def restart_notification():
         await remove(".restartmsg")
 
 
+async def resume_uploads():
+    while resumable_uploads:
+        row = resumable_uploads.pop(0)
+        try:
+            message = await TgClient.bot.get_messages(
+                chat_id=row["cid"], message_ids=row["mid"]
+            )
+        except Exception as e:
+            LOGGER.error(f"Failed to get task message {row['link']}: {e}")
+            continue
+        if message is None or message.empty:
+            continue
+        LOGGER.info(f"Resuming Drive upload of {row['link']}")
+        await Mirror(TgClient.bot, message, **row["flags"]).new_event()
+
+
 @new_task
 async def confirm_restart(_, query):
     await query.answer()
@@ -99,6 +119,8 @@ async def confirm_restart(_, query):
             jd.cancel()
         if nzb := intervals["nzb"]:
             nzb.cancel()
+        if seed := intervals["seed"]:
+            seed.cancel()
         if st := intervals["status"]:
             for intvl in list(st.values()):
                 intvl.cancel()
@@ -6,6 +6,7 @@ from .. import (
     task_dict_lock,
     status_dict,
     task_dict,
+    seed_dict,
     bot_start_time,
     intervals,
     sabnzbd_client,
@@ -34,12 +35,16 @@ from ..helper.telegram_helper.button_build import ButtonMaker
 
 @new_task
 async def task_status(_, message):
+    text = message.text.split()
+    seeds = len(text) > 1 and text[1] == "seeds"
     async with task_dict_lock:
-        count = len(task_dict)
+        count = len(seed_dict) if seeds else len(task_dict)
     if count == 0:
         currentTime = get_readable_time(time() - bot_start_time)
         free = get_readable_file_size(disk_usage(DOWNLOAD_DIR).free)
         msg = f"No Active Tasks!\nEach user can get status for his tasks by adding me or user_id after cmd: /{BotCommands.StatusCommand} me"
+        if seed_dict:
+            msg += f"\n<b>Seeding:</b> {len(seed_dict)} | /{BotCommands.StatusCommand} seeds"
         msg += (
             f"\n<b>CPU:</b> {cpu_percent()}% | <b>FREE:</b> {free}"
             f"\n<b>RAM:</b> {virtual_memory().percent}% | <b>UPTIME:</b> {currentTime}"
@@ -47,8 +52,7 @@ async def task_status(_, message):
         reply_message = await send_message(message, msg)
         await auto_delete_message(message, reply_message)
     else:
-        text = message.text.split()
-        if len(text) > 1:
+        if len(text) > 1 and not seeds:
             user_id = message.from_user.id if text[1] == "me" else int(text[1])
         else:
             user_id = 0
@@ -56,7 +60,9 @@ async def task_status(_, message):
             if obj := intervals["status"].get(sid):
                 obj.cancel()
                 del intervals["status"][sid]
-        await send_status_message(message, user_id)
+        await send_status_message(
+            message, user_id, MirrorStatus.STATUS_SEED if seeds else "All"
+        )
         await delete_message(message)
 
 
@@ -170,6 +176,8 @@ async def status_pages(_, query):
                     case _:
                         tasks["Download"] += 1
 
+        tasks["Seed"] += len(seed_dict)
+
         msg = f"""<b>DL:</b> {tasks['Download']} | <b>UP:</b> {tasks['Upload']} | <b>SD:</b> {tasks['Seed']} | <b>AR:</b> {tasks['Archive']}
 <b>EX:</b> {tasks['Extract']} | <b>SP:</b> {tasks['Split']} | <b>QD:</b> {tasks['QueueDl']} | <b>QU:</b> {tasks['QueueUp']}
 <b>CL:</b> {tasks['Clone']} | <b>CK:</b> {tasks['CheckUp']} | <b>PA:</b> {tasks['Pause']} | <b>SV:</b> {tasks['SamVid']}
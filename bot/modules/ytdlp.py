@@ -299,7 +299,7 @@ class YtDlp(TaskListener):
             "-hl": False,
             "-bt": False,
             "-ut": False,
-            "-i": 0,
+            "-i": self.multi,
             "-sp": 0,
             "link": "",
             "-m": "",
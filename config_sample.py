@@ -17,6 +17,7 @@ FILELION_API = ""
 STREAMWISH_API = ""
 EXCLUDED_EXTENSIONS = ""
 INCOMPLETE_TASK_NOTIFIER = False
+DOWNLOAD_CACHE_LIMIT = 0
 YT_DLP_OPTIONS = ""
 USE_SERVICE_ACCOUNTS = False
 NAME_SUBSTITUTE = ""
@@ -24,12 +25,17 @@ FFMPEG_CMDS = {}
 UPLOAD_PATHS = {}
 # GDrive Tools
 GDRIVE_ID = ""
+GDRIVE_WORKERS = 1  # set above 1 to transfer files of one task in parallel
+GDRIVE_CACHE_TTL = 300
+GDRIVE_SEARCH_TIMEOUT = 30
+GDRIVE_CHUNK_MEMORY = 1024
 IS_TEAM_DRIVE = False
 STOP_DUPLICATE = False
 INDEX_URL = ""
 # Rclone
 RCLONE_PATH = ""
 RCLONE_FLAGS = ""
+RCLONE_CACHE_TTL = 300
 RCLONE_SERVE_URL = ""
 RCLONE_SERVE_PORT = 0
 RCLONE_SERVE_USER = ""
@@ -73,9 +79,15 @@ USER_TRANSMISSION = False
 HYBRID_LEECH = False
 LEECH_FILENAME_PREFIX = ""
 LEECH_DUMP_CHAT = ""
+LEECH_CACHE_LIMIT = 0
 THUMBNAIL_LAYOUT = ""
 # qBittorrent/Aria2c
 TORRENT_TIMEOUT = 0
+PROGRESSIVE_UPLOAD = False
+DIRECT_WORKERS = 1
+DIRECT_HOST_WORKERS = {}
+ARIA2_HOST_TUNING = False
+ARIA2_HOST_OPTIONS = {}
 BASE_URL = ""
 BASE_URL_PORT = 0
 WEB_PINCODE = False
@@ -0,0 +1,77 @@
+from threading import Thread
+from types import SimpleNamespace
+
+import pytest
+
+from bot.core.config_manager import Config
+from bot.helper.mirror_leech_utils.gdrive_utils import helper
+from bot.helper.mirror_leech_utils.gdrive_utils.helper import (
+    CHUNK_ALIGN,
+    MIN_CHUNK_SIZE,
+    ChunkSizer,
+)
+
+MB = 1024 * 1024
+
+
+@pytest.fixture(autouse=True)
+def budget(monkeypatch):
+    monkeypatch.setattr(Config, "GDRIVE_CHUNK_MEMORY", 64)
+    monkeypatch.setattr(ChunkSizer, "_used", 0)
+
+
+def test_acquire_reserves_and_release_returns_budget():
+    sizer = ChunkSizer(32 * MB)
+    assert sizer.acquire() == 32 * MB
+    assert ChunkSizer._used == 32 * MB
+    sizer.release()
+    assert ChunkSizer._used == 0
+
+
+def test_acquire_is_capped_by_remaining_budget():
+    first = ChunkSizer(50 * MB)
+    second = ChunkSizer(32 * MB)
+    first.acquire()
+    size = second.acquire()
+    assert size == 14 * MB
+    assert size % CHUNK_ALIGN == 0
+    assert ChunkSizer._used == 64 * MB
+
+
+def test_acquire_waits_for_release():
+    first = ChunkSizer(60 * MB)
+    second = ChunkSizer(32 * MB)
+    first.acquire()
+    sizes = []
+    waiter = Thread(target=lambda: sizes.append(second.acquire()))
+    waiter.start()
+    waiter.join(0.2)
+    assert waiter.is_alive()
+    first.release()
+    waiter.join(5)
+    assert sizes == [32 * MB]
+
+
+def test_acquire_stops_on_cancel():
+    ChunkSizer(64 * MB).acquire()
+    listener = SimpleNamespace(is_cancelled=True)
+    assert ChunkSizer(32 * MB).acquire(listener) == 0
+    assert ChunkSizer._used == 64 * MB
+
+
+def test_acquire_falls_back_to_minimum_on_timeout(monkeypatch):
+    monkeypatch.setattr(helper, "CHUNK_WAIT_TIMEOUT", 0)
+    ChunkSizer(64 * MB).acquire()
+    assert ChunkSizer(32 * MB).acquire() == MIN_CHUNK_SIZE
+    assert ChunkSizer._used == 64 * MB + MIN_CHUNK_SIZE
+
+
+def test_release_adapts_size():
+    sizer = ChunkSizer(32 * MB)
+    sizer.acquire()
+    sizer.release(failed=True)
+    assert sizer.size == 16 * MB
+    sizer.size = MIN_CHUNK_SIZE
+    sizer.acquire()
+    sizer.release(failed=True)
+    assert sizer.size == MIN_CHUNK_SIZE
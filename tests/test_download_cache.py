@@ -0,0 +1,110 @@
+from asyncio import run
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from bot import task_dict
+from bot.core.config_manager import Config
+from bot.helper.ext_utils import download_cache as module
+from bot.helper.ext_utils.download_cache import (
+    DownloadCache,
+    _normalize_url,
+    get_url_cache_key,
+)
+
+
+def test_normalize_url_sorts_query_and_drops_fragment():
+    assert (
+        _normalize_url("HTTPS://Example.COM/a/File.zip?b=2&a=1&a=0#part")
+        == "https://example.com/a/File.zip?a=0&a=1&b=2"
+    )
+    assert _normalize_url("http://example.com") == "http://example.com/"
+
+
+def test_url_cache_key_uses_version_headers(monkeypatch):
+    monkeypatch.setattr(Config, "DOWNLOAD_CACHE_LIMIT", 1)
+    url = "https://example.com/f?b=1&a=2"
+    assert get_url_cache_key(url, {"ETag": '"x"'}) == (
+        'url:https://example.com/f?a=2&b=1|"x"'
+    )
+    assert get_url_cache_key(
+        url, {"Last-Modified": "Mon", "Content-Length": "5"}
+    ).endswith("|Mon|5")
+    assert get_url_cache_key(url, {"Last-Modified": "Mon"}) == ""
+    monkeypatch.setattr(Config, "DOWNLOAD_CACHE_LIMIT", 0)
+    assert get_url_cache_key(url, {"ETag": '"x"'}) == ""
+
+
+@pytest.fixture
+def cache(monkeypatch, tmp_path):
+    cache_dir = tmp_path / "cache"
+    cache_dir.mkdir()
+    monkeypatch.setattr(module, "CACHE_DIR", str(cache_dir))
+    monkeypatch.setattr(module, "INDEX_FILE", f"{cache_dir}/index.json")
+    # room for two 1000 byte entries
+    monkeypatch.setattr(Config, "DOWNLOAD_CACHE_LIMIT", 2500 / 1024**3)
+    now = [0]
+
+    def tick():
+        now[0] += 1
+        return now[0]
+
+    monkeypatch.setattr(module, "time", tick)
+    return DownloadCache()
+
+
+def _listener(tmp_path, key):
+    async def noop():
+        pass
+
+    return SimpleNamespace(
+        cache_key=key,
+        select=False,
+        folder_name="",
+        progressive=False,
+        size=1000,
+        name="",
+        mid=f"test-{key}",
+        dir=str(tmp_path / f"task-{key}"),
+        on_download_start=noop,
+        on_download_complete=noop,
+    )
+
+
+def _store(cache, tmp_path, key):
+    path = tmp_path / f"{key}.bin"
+    path.write_bytes(b"0" * 1000)
+    run(cache.store(_listener(tmp_path, key), str(path)))
+
+
+def test_store_evicts_least_recently_used(cache, tmp_path):
+    _store(cache, tmp_path, "a")
+    _store(cache, tmp_path, "b")
+    listener = _listener(tmp_path, "a")
+    (tmp_path / "task-a").mkdir()
+    assert run(cache.restore(listener, True))
+    task_dict.pop(listener.mid, None)
+    assert listener.name == "a.bin"
+    assert (tmp_path / "task-a" / "a.bin").read_bytes() == b"0" * 1000
+    _store(cache, tmp_path, "c")
+    assert set(cache._entries) == {"a", "c"}
+    assert not Path(DownloadCache._path("b")).exists()
+
+
+def test_index_is_reloaded(cache, tmp_path):
+    _store(cache, tmp_path, "a")
+    fresh = DownloadCache()
+    run(fresh._load())
+    assert fresh._entries["a"]["size"] == 1000
+
+
+def test_oversized_and_unusable_tasks_are_skipped(cache, tmp_path):
+    listener = _listener(tmp_path, "big")
+    listener.size = 3000
+    run(cache.store(listener, str(tmp_path)))
+    listener = _listener(tmp_path, "sel")
+    listener.select = True
+    run(cache.store(listener, str(tmp_path)))
+    assert cache._entries == {}
+    assert not run(cache.restore(_listener(tmp_path, "missing"), True))
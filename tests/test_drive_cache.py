@@ -0,0 +1,60 @@
+import pytest
+
+from bot.core.config_manager import Config
+from bot.helper.mirror_leech_utils.gdrive_utils import helper
+from bot.helper.mirror_leech_utils.gdrive_utils.helper import GoogleDriveHelper
+
+
+@pytest.fixture
+def drive(monkeypatch):
+    monkeypatch.setattr(Config, "GDRIVE_CACHE_TTL", 300)
+    helper.drive_cache.clear()
+    yield GoogleDriveHelper()
+    helper.drive_cache.clear()
+
+
+def test_get_returns_cached_value(drive):
+    key = drive.cache_key("meta", ("a",))
+    drive.set_cached(key, {"id": "a"})
+    assert drive.get_cached(key) == {"id": "a"}
+
+
+def test_expired_entry_is_dropped(drive, monkeypatch):
+    key = drive.cache_key("meta", ("a",))
+    drive.set_cached(key, {"id": "a"})
+    now = helper.time()
+    monkeypatch.setattr(helper, "time", lambda: now + 301)
+    assert drive.get_cached(key) is None
+    assert key not in helper.drive_cache
+
+
+def test_zero_ttl_disables_cache(drive, monkeypatch):
+    monkeypatch.setattr(Config, "GDRIVE_CACHE_TTL", 0)
+    key = drive.cache_key("meta", ("a",))
+    drive.set_cached(key, {"id": "a"})
+    assert drive.get_cached(key) is None
+
+
+def test_least_recently_used_is_evicted(drive, monkeypatch):
+    monkeypatch.setattr(helper, "CACHE_LIMIT", 2)
+    keys = [drive.cache_key("meta", (name,)) for name in "abc"]
+    drive.set_cached(keys[0], 0)
+    drive.set_cached(keys[1], 1)
+    drive.get_cached(keys[0])
+    drive.set_cached(keys[2], 2)
+    assert list(helper.drive_cache) == [keys[0], keys[2]]
+
+
+def test_invalidate_drops_entries_of_id(drive):
+    meta = drive.cache_key("meta", ("a",))
+    other = drive.cache_key("meta", ("b",))
+    listing = drive.cache_key("list", ("p",))
+    search = drive.cache_key("search", ("q",))
+    drive.set_cached(meta, {"id": "a"})
+    drive.set_cached(other, {"id": "b"})
+    drive.set_cached(listing, [{"id": "a"}])
+    drive.set_cached(search, [])
+    drive.invalidate_cache("a")
+    assert list(helper.drive_cache) == [other, listing]
+    drive.invalidate_cache("a", children=True)
+    assert list(helper.drive_cache) == [other]
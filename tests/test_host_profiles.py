@@ -0,0 +1,82 @@
+import pytest
+
+from bot.core.config_manager import Config
+from bot.helper.ext_utils import host_profiles as module
+from bot.helper.ext_utils.host_profiles import (
+    MIN_SAMPLE_SIZE,
+    MIN_SAMPLES,
+    PROFILES,
+    HostProfiles,
+    match_host,
+)
+
+URL = "https://files.example.com/file.bin"
+
+
+@pytest.fixture
+def profiles(monkeypatch, tmp_path):
+    monkeypatch.setattr(module, "STATE_FILE", str(tmp_path / "host_profiles.json"))
+    monkeypatch.setattr(Config, "ARIA2_HOST_OPTIONS", {})
+    monkeypatch.setattr(Config, "ARIA2_HOST_TUNING", True)
+    monkeypatch.setattr(module, "random", lambda: 1)
+    return HostProfiles()
+
+
+def _run(profiles, gid, profile, status="complete", size=MIN_SAMPLE_SIZE):
+    profiles.track(gid, "files.example.com", profile)
+    profiles.record(gid, {"status": status, "totalLength": str(size)})
+
+
+def test_match_host_covers_subdomains():
+    settings = {"example.com": {"split": 4}}
+    assert match_host("files.example.com", settings) == {"split": 4}
+    assert match_host("example.com", settings) == {"split": 4}
+    assert match_host("badexample.com", settings) is None
+
+
+def test_configured_options_win(profiles, monkeypatch):
+    monkeypatch.setattr(Config, "ARIA2_HOST_OPTIONS", {"example.com": {"split": 4}})
+    assert profiles.select(URL) == ("files.example.com", None, {"split": "4"})
+
+
+def test_tuning_disabled(profiles, monkeypatch):
+    monkeypatch.setattr(Config, "ARIA2_HOST_TUNING", False)
+    assert profiles.select(URL) == ("files.example.com", None, {})
+
+
+def test_untried_profiles_are_sampled_first(profiles):
+    seen = []
+    for index in range(len(PROFILES)):
+        _, profile, options = profiles.select(URL)
+        assert options == PROFILES[profile]
+        seen.append(profile)
+        for run in range(MIN_SAMPLES):
+            _run(profiles, f"{index}-{run}", profile)
+    assert seen == list(PROFILES)
+
+
+def test_fastest_profile_is_selected(profiles, monkeypatch):
+    now = [0]
+    monkeypatch.setattr(module, "time", lambda: now[0])
+    for index, name in enumerate(PROFILES):
+        for run in range(MIN_SAMPLES):
+            profiles.track(f"{index}-{run}", "files.example.com", name)
+            now[0] += 1 if name == "multi" else 10
+            profiles.record(
+                f"{index}-{run}",
+                {"status": "complete", "totalLength": str(MIN_SAMPLE_SIZE)},
+            )
+    assert profiles.select(URL)[1] == "multi"
+
+
+def test_record_counts_errors_and_ignores_untracked(profiles):
+    _run(profiles, "a", "single", status="error")
+    profiles.record("b", {"status": "complete", "totalLength": "1"})
+    stats = profiles._stats("files.example.com", "single")
+    assert stats["runs"] == 1
+    assert stats["errors"] == 1
+    assert stats["bytes"] == 0
+    profiles.track("c", "files.example.com", "single")
+    profiles.discard("c")
+    profiles.record("c", {"status": "complete", "totalLength": "1"})
+    assert stats["runs"] == 1
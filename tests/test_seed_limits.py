@@ -0,0 +1,48 @@
+from types import SimpleNamespace
+
+import pytest
+
+from bot.helper.listeners.seed_listener import _get_limits, _limit_reached
+
+
+@pytest.mark.parametrize(
+    "ratio, time, expected",
+    [
+        (None, None, (None, None)),
+        ("", "", (None, None)),
+        ("1.5", "30", (1.5, 1800)),
+        ("x", "y", (None, None)),
+        ("2", None, (2.0, None)),
+    ],
+)
+def test_get_limits(ratio, time, expected):
+    listener = SimpleNamespace(seed_ratio=ratio, seed_time=time)
+    assert _get_limits(listener) == expected
+
+
+def _entry(ratio_limit=None, time_limit=None, ratio=0, seeding_time=0):
+    return {
+        "ratio_limit": ratio_limit,
+        "time_limit": time_limit,
+        "ratio": ratio,
+        "seeding_time": seeding_time,
+    }
+
+
+def test_no_limits_never_reached():
+    assert not _limit_reached(_entry(ratio=100, seeding_time=10**6))
+
+
+def test_ratio_limit():
+    assert not _limit_reached(_entry(ratio_limit=1.0, ratio=0.9))
+    assert _limit_reached(_entry(ratio_limit=1.0, ratio=1.0))
+
+
+def test_time_limit():
+    assert not _limit_reached(_entry(time_limit=60, seeding_time=59))
+    assert _limit_reached(_entry(time_limit=60, seeding_time=60))
+
+
+def test_either_limit_is_enough():
+    assert _limit_reached(_entry(1.0, 60, ratio=0.1, seeding_time=61))
+    assert _limit_reached(_entry(1.0, 60, ratio=1.1, seeding_time=1))